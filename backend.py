@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""The compute backend: how bulk geometry is computed, and at what precision.
+
+  - python:  numpy64 with SphereSprings' scalar engine by default, the original
+             behaviour; Vec3Array, QuatArray and rot3_array are float64 NumPy
+             arrays exactly as under numpy64
+  - numpy64: NumPy arrays of float64, with SphereSprings' numpy engine by default
+  - numpy32: NumPy arrays of float32, which halves the memory and bandwidth of
+             large arrays, at about 7 significant digits
+
+The scalar classes (Vec3, Quat, Rot3) are plain Python floats under every
+backend. The backend decides the dtype of Vec3Array, QuatArray and the rot3_array
+conversions, the default SphereSprings engine and the precision of its array
+engines, and scales tolerances: a tolerance is never less than the square root
+of the precision's machine epsilon, below which differences are rounding noise.
+For float64 that is 1.5e-8, beneath every default, so only float32 changes them.
+Buffers and geom_io files are float64 regardless, since that is their format.
+
+    set_backend('numpy32')
+    with use_backend('python'):
+        ...
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+from math import sqrt
+
+import numpy as np
+
+
+# dtype:           NumPy dtype of arrays
+# engine:          Default SphereSprings engine
+# tolerance_floor: The least tolerance, the square root of the dtype's machine epsilon
+Backend = namedtuple('Backend', ['name', 'dtype', 'engine', 'tolerance_floor'])
+
+
+def _backend(name, dtype, engine):
+    return Backend(name, np.dtype(dtype), engine, sqrt(float(np.finfo(dtype).eps)))
+
+
+BACKENDS = {
+    'python': _backend('python', np.float64, 'scalar'),
+    'numpy64': _backend('numpy64', np.float64, 'numpy'),
+    'numpy32': _backend('numpy32', np.float32, 'numpy'),
+}
+DEFAULT_BACKEND = 'python'
+
+_current = BACKENDS[DEFAULT_BACKEND]
+
+
+def get_backend():
+    return _current
+
+
+def set_backend(name):
+    """Select the backend by name, one of BACKENDS, and return the previous one."""
+    global _current
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown backend: {name}')
+    previous = _current
+    _current = BACKENDS[name]
+    return previous
+
+
+@contextmanager
+def use_backend(name):
+    """Select a backend for the duration of a with block."""
+    previous = set_backend(name)
+    try:
+        yield _current
+    finally:
+        set_backend(previous.name)
+
+
+def float_dtype():
+    """The dtype of arrays under the current backend."""
+    return _current.dtype
+
+
+def tolerance(value):
+    """Scale a tolerance to the current precision: at least the square root of its machine epsilon."""
+    return max(value, _current.tolerance_floor)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from backend import DEFAULT_BACKEND, get_backend, set_backend, tolerance, use_backend
+from quat_array import QuatArray
+from rot3 import Rot3
+from rot3_array import quats_to_euler
+from sphere_batch import BatchSphereSprings
+from sphere_init import random_points
+from sphere_parallel import ParallelForces
+from sphere_springs import SphereSprings, array_to_points, net_forces_array, points_to_array
+from tolerance import EPSILON, eq_approx
+from vec3 import Vec3
+from vec3_array import Vec3Array
+
+
+class BackendTest(unittest.TestCase):
+    def setUp(self):
+        self.points = random_points(40, seed=2)
+
+    def test_select(self):
+        self.assertEqual(DEFAULT_BACKEND, get_backend().name)
+        with use_backend('numpy32') as backend:
+            self.assertEqual(np.float32, backend.dtype)
+            self.assertEqual('numpy32', get_backend().name)
+        self.assertEqual(DEFAULT_BACKEND, get_backend().name)
+        with self.assertRaises(ValueError):
+            set_backend('cupy')
+        self.assertEqual(DEFAULT_BACKEND, get_backend().name)
+
+    def test_array_dtypes(self):
+        for name, dtype in (('python', np.float64), ('numpy64', np.float64), ('numpy32', np.float32)):
+            with use_backend(name):
+                vs = Vec3Array(self.points)
+                qs = QuatArray.from_quats([Rot3.x_rotatation(0.5).quat] * 3)
+                self.assertEqual(dtype, vs.data.dtype)
+                self.assertEqual(dtype, qs.data.dtype)
+                self.assertEqual(dtype, (vs * 2.0 + Vec3(1, 0, 0)).data.dtype)
+                self.assertEqual(dtype, Rot3.y_rotatation(0.5).rotate_many(vs).data.dtype)
+                self.assertEqual(dtype, quats_to_euler(qs, 'xyz').dtype)
+        # Buffers are float64 whatever the backend.
+        with use_backend('numpy32'):
+            self.assertEqual(np.float64, Vec3Array.from_buffer(self.points.tobytes()).data.dtype)
+
+    def test_float32_halves_memory(self):
+        with use_backend('numpy32'):
+            points32 = points_to_array(array_to_points(self.points))
+        self.assertEqual(self.points.nbytes // 2, points32.nbytes)
+        forces = net_forces_array(0.25, self.points)
+        forces32 = net_forces_array(0.25, points32)
+        self.assertEqual(np.float32, forces32.dtype)
+        self.assertTrue(np.allclose(forces, forces32, atol=1e-4 * np.abs(forces).max()))
+
+    def test_tolerances(self):
+        self.assertEqual(EPSILON, tolerance(EPSILON))
+        with use_backend('numpy32'):
+            self.assertGreater(tolerance(1e-9), 1e-4)
+            self.assertEqual(1.0, tolerance(1.0))
+            # Rounding noise in float32 is not a difference.
+            self.assertTrue(eq_approx(1.0, 1.0 + 1e-4))
+        self.assertFalse(eq_approx(1.0, 1.0 + 1e-4))
+
+    def test_engines(self):
+        with use_backend('python'):
+            self.assertEqual('scalar', SphereSprings(array_to_points(self.points)).engine)
+            self.assertNotIn('backend', SphereSprings(array_to_points(self.points), engine='numpy')._cache_params())
+        with use_backend('numpy32'):
+            springs = SphereSprings(array_to_points(self.points))
+            self.assertEqual('numpy', springs.engine)
+            self.assertEqual('numpy32', springs._cache_params()['backend'])
+        with patch.object(SphereSprings, 'engine', 'tree'), use_backend('numpy32'):
+            self.assertEqual('tree', SphereSprings(array_to_points(self.points)).engine)
+
+    def test_stabilize_float32(self):
+        with patch.object(SphereSprings, 'max_iter_count', 5), patch.object(SphereSprings, 'alpha', 0.01):
+            with use_backend('numpy64'):
+                springs = SphereSprings(array_to_points(self.points))
+                springs.stabilize()
+            with use_backend('numpy32'):
+                springs32 = SphereSprings(array_to_points(self.points))
+                springs32.stabilize()
+                batch = BatchSphereSprings(self.points[np.newaxis])
+                batch.stabilize()
+                with ParallelForces(len(self.points), workers=1, tile_count=2) as parallel:
+                    forces = parallel(0.25, points_to_array(array_to_points(self.points)))
+        expected = points_to_array(springs.points)
+        self.assertTrue(np.allclose(expected, points_to_array(springs32.points), atol=1e-5))
+        self.assertEqual(np.float32, batch.points.dtype)
+        self.assertTrue(np.allclose(expected, batch.points[0], atol=1e-5))
+        self.assertEqual(np.float32, forces.dtype)
+        self.assertTrue(np.allclose(net_forces_array(0.25, self.points), forces, atol=1e-4))
+
+
+if __name__ == '__main__':
+    unittest.main()
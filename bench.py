@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+
+"""Benchmark suite for vec3, quat, rot3 and sphere_springs.
+
+Each benchmark reports operations per second and the peak memory
+allocated (as seen by tracemalloc) during one operation. Results are
+written as JSON, and may be compared against a stored baseline:
+
+    python bench.py --output bench.json
+    python bench.py --baseline bench.json --threshold 0.1
+
+The second command exits with status 1 if any benchmark is slower,
+or allocates more, than the baseline by more than the threshold.
+
+With --iterations, it also reports how many stabilize iterations each
+initializer in sphere_init needs, and how many it saves against the
+random start, with the classic update and with the L-BFGS solver.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+from contextlib import ExitStack, nullcontext
+from functools import partial
+from inspect import isgenerator
+from math import pi
+from unittest.mock import patch
+
+import numpy as np
+
+from backend import DEFAULT_BACKEND, use_backend
+from quat import Quat, qexp, qlog, qslerp
+from rot3 import Rot3
+from rotation_track import RotationTrack
+from sphere_init import INITIALIZERS
+from sphere_solvers import LBFGSSolver
+from sphere_springs import SphereSprings, array_to_points
+from vec3 import Vec3
+
+
+STABILIZE_SIZES = (50, 200, 1000, 5000)
+STABILIZE_ITER_COUNT = 5  # Iterations per timed stabilize run, so sizes are comparable
+SCALAR_MAX_SIZE = 200  # The scalar engine is O(N^2) Python calls per iteration; skip it beyond this
+MIN_TIME = 0.2  # Seconds of timing per benchmark
+MEMORY_FLOOR = 4096  # Bytes of peak memory growth below which compare reports no regression
+ITERATION_SIZES = (50, 200, 1000)
+ITERATION_SOLVERS = {'fixed': lambda: None, 'lbfgs': LBFGSSolver}
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a benchmark. The decorated function does any setup and
+    returns a zero-argument callable that performs one operation, or is a
+    generator that yields it, and cleans up once timing is done."""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def random_points(points_count, seed=0):
+    return array_to_points(np.random.default_rng(seed).normal(0, 1, (points_count, 3)))
+
+
+@benchmark('vec3.add')
+def bench_vec3_add():
+    a = Vec3(1.0, 2.0, 3.0)
+    b = Vec3(-0.5, 0.25, 4.0)
+    return lambda: a + b
+
+
+@benchmark('vec3.cross')
+def bench_vec3_cross():
+    a = Vec3(1.0, 2.0, 3.0)
+    b = Vec3(-0.5, 0.25, 4.0)
+    return lambda: a.cross(b)
+
+
+@benchmark('vec3.normalized')
+def bench_vec3_normalized():
+    a = Vec3(1.0, 2.0, 3.0)
+    return a.normalized
+
+
+@benchmark('quat.mul')
+def bench_quat_mul():
+    a = Quat(1.0, 2.0, 3.0, 4.0)
+    b = Quat(-0.5, 0.25, 2.0, -1.0)
+    return lambda: a * b
+
+
+@benchmark('quat.qexp')
+def bench_qexp():
+    q = Quat(0.1, 0.2, -0.3, 0.4)
+    return lambda: qexp(q)
+
+
+@benchmark('quat.qlog')
+def bench_qlog():
+    q = Quat(1.0, 2.0, 3.0, 4.0)
+    return lambda: qlog(q)
+
+
+@benchmark('quat.qslerp')
+def bench_qslerp():
+    a = Quat(1.0, 2.0, 3.0, 4.0).normalize()
+    b = Quat(-0.5, 0.25, 2.0, -1.0).normalize()
+    return lambda: qslerp(a, b, 0.3)
+
+
+@benchmark('rot3.rotate')
+def bench_rot3_rotate():
+    rot = Rot3(Vec3(1.0, -4.0, 9.0), pi / 3)
+    vec = Vec3(1.0, 2.0, 3.0)
+    return lambda: rot.rotate(vec)
+
+
+def random_track(keys_count, interpolation, seed=0):
+    quats = np.random.default_rng(seed).normal(0, 1, (keys_count, 4))
+    return RotationTrack(np.arange(keys_count, dtype=np.float64), quats, interpolation)
+
+
+@benchmark('rotation_track.sample')
+def bench_track_sample():
+    track = random_track(1000, 'squad')
+    return lambda: track.sample(123.4)
+
+
+@benchmark('rotation_track.sample_many')
+def bench_track_sample_many():
+    track = random_track(1000, 'squad')
+    times = np.linspace(0, 999, 10000)
+    return lambda: track.sample_many(times)
+
+
+def bench_stabilize(engine, points_count, backend=DEFAULT_BACKEND):
+    points = random_points(points_count)
+    with ExitStack() as stack:
+        stack.enter_context(use_backend(backend))
+        stack.enter_context(patch.object(SphereSprings, 'max_iter_count', STABILIZE_ITER_COUNT))
+        springs = SphereSprings(list(points), engine=engine)
+        if engine == 'parallel':
+            # Start the pool once, as a long-running caller would, rather than in every timed run.
+            forces = stack.enter_context(springs._net_forces_engine(points_count))
+            springs._net_forces_engine = lambda points_count: nullcontext(forces)
+
+        def run():
+            springs.points = list(points)
+            springs.stabilize()
+        yield run
+
+
+def register_stabilize_benchmarks():
+    for points_count in STABILIZE_SIZES:
+        for engine in SphereSprings.ENGINES:
+            if engine != 'scalar' or points_count <= SCALAR_MAX_SIZE:
+                benchmark(f'sphere_springs.stabilize[{engine},N={points_count}]')(
+                    partial(bench_stabilize, engine, points_count))
+        benchmark(f'sphere_springs.stabilize[numpy,N={points_count},numpy32]')(
+            partial(bench_stabilize, 'numpy', points_count, 'numpy32'))
+
+
+register_stabilize_benchmarks()
+
+
+def initializer_iterations(sizes=ITERATION_SIZES, seed=0):
+    """Return {'<initializer>,N=<size>,<solver>': {'iterations': ..., 'saved': ...}}, where saved
+    counts the iterations saved against the random initializer with the same size and solver."""
+    results = {}
+    for points_count in sizes:
+        for solver_name, make_solver in ITERATION_SOLVERS.items():
+            iterations = {}
+            for name in INITIALIZERS:
+                springs = SphereSprings.from_initializer(name, points_count, seed, engine='numpy', solver=make_solver())
+                springs.stabilize()
+                iterations[name] = springs.iter_count
+            for name, iter_count in iterations.items():
+                key = f'{name},N={points_count},{solver_name}'
+                results[key] = {'iterations': iter_count, 'saved': iterations['random'] - iter_count}
+                print(f'{key:50s} {iter_count:6d} iterations {results[key]["saved"]:6d} saved', file=sys.stderr)
+    return results
+
+
+def measure(setup, min_time=MIN_TIME):
+    made = setup()
+    op = next(made) if isgenerator(made) else made
+    try:
+        timer = timeit.Timer(op)
+        number, elapsed = timer.autorange()
+        while elapsed < min_time:
+            number *= 2
+            elapsed = timer.timeit(number)
+
+        tracemalloc.start()
+        try:
+            op()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except BaseException:
+        if isgenerator(made):
+            made.close()
+        raise
+    if isgenerator(made):
+        next(made, None)  # Run the cleanup after the yield
+    return {'ops_per_sec': number / elapsed, 'peak_bytes': peak_bytes}
+
+
+def run_benchmarks(pattern=None, min_time=MIN_TIME):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if pattern is not None and pattern not in name:
+            continue
+        results[name] = measure(setup, min_time)
+        print(f'{name:50s} {results[name]["ops_per_sec"]:14.2f} ops/s {results[name]["peak_bytes"]:12d} B',
+              file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold, memory_floor=MEMORY_FLOOR):
+    """Return a list of (name, metric, baseline value, current value) for each regression above threshold.
+    Memory growth of less than memory_floor bytes is never a regression, since small ops vary by that much."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['ops_per_sec'] < (1 - threshold) * previous['ops_per_sec']:
+            regressions.append((name, 'ops_per_sec', previous['ops_per_sec'], current['ops_per_sec']))
+        growth = current['peak_bytes'] - previous['peak_bytes']
+        if growth > threshold * previous['peak_bytes'] and growth >= memory_floor:
+            regressions.append((name, 'peak_bytes', previous['peak_bytes'], current['peak_bytes']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against results previously written with --output')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative slowdown or memory growth reported as a regression (default: 0.10)')
+    parser.add_argument('--memory-floor', type=int, default=MEMORY_FLOOR,
+                        help=f'Bytes of memory growth always ignored (default: {MEMORY_FLOOR})')
+    parser.add_argument('--filter', help='Only run benchmarks whose name contains this string')
+    parser.add_argument('--min-time', type=float, default=MIN_TIME, help='Seconds of timing per benchmark')
+    parser.add_argument('--iterations', action='store_true',
+                        help='Also report the stabilize iterations needed from each initializer')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter, args.min_time)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    if args.iterations:
+        report['iterations'] = initializer_iterations()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold, args.memory_floor)
+        for name, metric, previous, current in regressions:
+            print(f'REGRESSION {name} {metric}: {previous:.6g} -> {current:.6g}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+import bench
+
+
+class BenchTest(unittest.TestCase):
+    def test_compare(self):
+        baseline = {'a': {'ops_per_sec': 100.0, 'peak_bytes': 100}, 'b': {'ops_per_sec': 100.0, 'peak_bytes': 100000}}
+        results = {'a': {'ops_per_sec': 95.0, 'peak_bytes': 500}, 'b': {'ops_per_sec': 80.0, 'peak_bytes': 120000},
+                   'new': {'ops_per_sec': 1.0, 'peak_bytes': 1}}
+        # 'a' grew fivefold, but by fewer bytes than the floor.
+        self.assertEqual([('b', 'ops_per_sec', 100.0, 80.0), ('b', 'peak_bytes', 100000, 120000)],
+                         bench.compare(results, baseline, 0.1))
+        self.assertEqual([('a', 'peak_bytes', 100, 500), ('b', 'ops_per_sec', 100.0, 80.0),
+                          ('b', 'peak_bytes', 100000, 120000)],
+                         bench.compare(results, baseline, 0.1, memory_floor=0))
+
+    def test_measure_generator(self):
+        events = []
+
+        def setup():
+            events.append('setup')
+            yield lambda: None
+            events.append('cleanup')
+
+        result = bench.measure(setup, min_time=0.001)
+        self.assertEqual(['setup', 'cleanup'], events)
+        self.assertGreater(result['ops_per_sec'], 0)
+
+    def test_output_and_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'bench.json')
+            args = ['--filter', 'vec3.add', '--min-time', '0.001']
+            with redirect_stderr(io.StringIO()):
+                self.assertEqual(0, bench.main(args + ['--output', output]))
+            with open(output) as f:
+                report = json.load(f)
+            self.assertEqual(['vec3.add'], list(report['results']))
+            self.assertEqual({'ops_per_sec', 'peak_bytes'}, set(report['results']['vec3.add']))
+
+            report['results']['vec3.add']['ops_per_sec'] *= 1000
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as f:
+                json.dump(report, f)
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                self.assertEqual(1, bench.main(args + ['--output', output, '--baseline', baseline]))
+            self.assertIn('REGRESSION vec3.add ops_per_sec', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+"""Binary files of Vec3 and Quat arrays, read and written through memory maps.
+
+A file is a 32-byte header followed by the array:
+
+    offset  type        field
+    0       8 bytes     magic b'GEOMARR1'
+    8       uint32      width: 3 for Vec3s (x, y, z), 4 for Quats (qr, qi, qj, qk)
+    12      uint32      reserved, 0
+    16      uint64      count of Vec3s or Quats
+    24      uint64      reserved, 0
+    32      float64[count][width]
+
+All fields are little-endian. Loading maps the file rather than reading
+it, so it takes the same time for any size, and pages are read from disk
+only when used.
+"""
+
+import struct
+
+import numpy as np
+
+from quat_array import QuatArray
+from vec3_array import Vec3Array
+
+
+MAGIC = b'GEOMARR1'
+HEADER = struct.Struct('<8sIIQQ')
+DATA_DTYPE = np.dtype('<f8')
+ARRAY_TYPES = {3: Vec3Array, 4: QuatArray}
+
+
+def _wrap(width, data):
+    """A Vec3Array or QuatArray holding data as it is, whatever the backend's dtype, as from_buffer does."""
+    result = ARRAY_TYPES[width]()
+    result.data = data
+    return result
+
+
+def create(path, width, count):
+    """Create a file for count Vec3s (width 3) or Quats (width 4), and return a Vec3Array or QuatArray
+    whose data is mapped onto it, for filling in place. The contents start as zeros."""
+    if width not in ARRAY_TYPES:
+        raise ValueError(f'Width must be 3 (Vec3) or 4 (Quat), not {width}')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, width, 0, count, 0))
+        f.truncate(HEADER.size + count * width * DATA_DTYPE.itemsize)
+    if count == 0:
+        return _wrap(width, np.zeros((0, width), dtype=DATA_DTYPE))
+    return _wrap(width, np.memmap(path, dtype=DATA_DTYPE, mode='r+', offset=HEADER.size, shape=(count, width)))
+
+
+def save(path, values):
+    """Save a Vec3Array, QuatArray, (N, 3) or (N, 4) array, or a list of Vec3s or Quats."""
+    if isinstance(values, (list, tuple)):
+        values = Vec3Array(values) if len(values) == 0 or hasattr(values[0], 'x') else QuatArray(values)
+    data = np.asarray(values, dtype=np.float64)
+    if data.ndim != 2 or data.shape[1] not in ARRAY_TYPES:
+        raise ValueError(f'Expected an array of shape (N, 3) or (N, 4), got {data.shape}')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, data.shape[1], 0, len(data), 0))
+        f.write(np.ascontiguousarray(data, dtype=DATA_DTYPE).data)
+
+
+def load(path, writable=False):
+    """Map a file saved by save or create, returning a Vec3Array or QuatArray backed by it.
+    Unless writable, the array is read-only; if writable, changes are written back to the file."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f'Not a geometry array file: {path}')
+    magic, width, _, count, _ = HEADER.unpack(header)
+    if magic != MAGIC or width not in ARRAY_TYPES:
+        raise ValueError(f'Not a geometry array file: {path}')
+    if count == 0:
+        return _wrap(width, np.zeros((0, width), dtype=DATA_DTYPE))
+    mode = 'r+' if writable else 'r'
+    # The map is wrapped without copying it, so the array stays float64 whatever the backend.
+    return _wrap(width, np.memmap(path, dtype=DATA_DTYPE, mode=mode, offset=HEADER.size, shape=(count, width)))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import geom_io
+from backend import use_backend
+from quat import Quat
+from quat_array import QuatArray
+from vec3 import Vec3
+from vec3_array import Vec3Array
+
+
+class GeomIOTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'points.geom')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        for values, array_type in ((np.random.default_rng(1).normal(0, 1, (100, 3)), Vec3Array),
+                                   (np.random.default_rng(2).normal(0, 1, (10, 4)), QuatArray),
+                                   (np.zeros((0, 4)), QuatArray)):
+            geom_io.save(self.path, array_type(values))
+            loaded = geom_io.load(self.path)
+            self.assertIsInstance(loaded, array_type)
+            self.assertTrue(np.array_equal(values, loaded.data))
+            self.assertEqual(geom_io.HEADER.size + values.nbytes, os.path.getsize(self.path))
+
+    def test_lists(self):
+        geom_io.save(self.path, [Vec3(1.0, 2.0, 3.0)])
+        self.assertTrue(np.array_equal([[1.0, 2.0, 3.0]], geom_io.load(self.path).data))
+        geom_io.save(self.path, [Quat(1.0, 2.0, 3.0, 4.0)])
+        self.assertTrue(np.array_equal([[1.0, 2.0, 3.0, 4.0]], geom_io.load(self.path).data))
+
+    def test_mapped(self):
+        created = geom_io.create(self.path, 3, 5)
+        created.data[2] = (1.0, 2.0, 3.0)
+        loaded = geom_io.load(self.path)
+        self.assertFalse(loaded.data.flags.writeable)
+        self.assertTrue(np.array_equal((1.0, 2.0, 3.0), loaded.data[2]))
+        writable = geom_io.load(self.path, writable=True)
+        writable.data[0] = 7.0
+        self.assertEqual(7.0, loaded.data[0, 1])  # The same pages, so no reload is needed
+
+    def test_mapped_float32(self):
+        # The files are float64, and stay mapped, whatever the backend.
+        with use_backend('numpy32'):
+            created = geom_io.create(self.path, 4, 3)
+            created.data[1] = (0.1, 0.2, 0.3, 0.4)
+            loaded = geom_io.load(self.path, writable=True)
+        self.assertIsInstance(created.data, np.memmap)
+        self.assertIsInstance(loaded.data, np.memmap)
+        self.assertEqual(np.float64, loaded.data.dtype)
+        self.assertTrue(np.array_equal((0.1, 0.2, 0.3, 0.4), loaded.data[1]))
+        loaded.data[2] = 5.0
+        self.assertEqual(5.0, created.data[2, 3])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            geom_io.save(self.path, np.zeros((3, 2)))
+        with self.assertRaises(ValueError):
+            geom_io.create(self.path, 2, 1)
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            geom_io.load(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,22 +1,41 @@
 #!/usr/bin/env python
 
-from math import acos, cos, exp, sin, cos, log, sqrt
+from math import atan2, cos, exp, sin, log, pi, sqrt
 
-from util import is_zero_approx
-from vec3 import Vec3
+from tolerance import EPSILON
+from vec3 import Vec3, as_real
 
 
 class Quat:
+    __slots__ = ('qr', 'qi', 'qj', 'qk')
+
+    @classmethod
+    def from_axis_angle(cls, axis, angle):
+        """Construct the quaternion cos(angle/2) + sin(angle/2) * axis. The axis should be a unit Vec3."""
+        cs = cos(angle / 2)
+        sn = sin(angle / 2)
+        return cls.from_wxyz(cs, sn * axis.x, sn * axis.y, sn * axis.z)
+
+    @classmethod
+    def from_wxyz(cls, w, x, y, z):
+        """Construct from components without the argument dispatch and checks done by __init__."""
+        result = _new(cls)
+        result.qr = w
+        result.qi = x
+        result.qj = y
+        result.qk = z
+        return result
+
     def __init__(self, *args):
         if len(args) == 0:
             self.qr = self.qi = self.qj = self.qk = 0.0
         elif len(args) == 1:
             arg0 = args[0]
-            if type(arg0) == type(self):  # arg0 = a quaternion
-                self.qr = other.qr
-                self.qi = other.qi
-                self.qj = other.qj
-                self.qk = other.qk
+            if isinstance(arg0, Quat):
+                self.qr = arg0.qr
+                self.qi = arg0.qi
+                self.qj = arg0.qj
+                self.qk = arg0.qk
             elif isinstance(arg0, Vec3):
                 self.qr = 0.0
                 self.qi = arg0.x
@@ -26,14 +45,14 @@ class Quat:
                 self.qr = arg0
                 self.qi = self.qj = self.qk = 0.0
             else:
-                assert(False)
-        elif len(args) == 2:  # Axis & angle
-            if type(args[1]).__name__ == 'Quat':
+                raise TypeError('Quat() argument must be a Quat, Vec3, or float')
+        elif len(args) == 2:
+            if isinstance(args[1], Quat):
                 self.qr = args[0]
                 self.qi = args[1].qi
                 self.qj = args[1].qj
                 self.qk = args[1].qk
-            elif type(args[1]).__name__ == 'Vec3':
+            elif isinstance(args[1], Vec3):  # Angle & axis
                 angle = args[0]
                 axis = args[1]
 
@@ -45,7 +64,7 @@ class Quat:
                 self.qj = sn * axis.y
                 self.qk = sn * axis.z
             else:
-                assert(False)
+                raise TypeError('Quat() second argument must be a Quat or Vec3')
         elif len(args) == 4:
             self.qr = args[0]
             self.qi = args[1]
@@ -53,81 +72,150 @@ class Quat:
             self.qk = args[3]
         else:
             raise ValueError('Constructor takes 0, 1, 2, or 4 arguments.')
-        assert(isinstance(self.qr, float))
-        assert(isinstance(self.qi, float))
-        assert(isinstance(self.qj, float))
-        assert(isinstance(self.qk, float))
 
     def __add__(self, other):
-        if type(other) == type(self):
-            return Quat(self.qr + other.qr, self.qi + other.qi, self.qj + other.qj, self.qk + other.qk)
+        if isinstance(other, Quat):
+            return _quat(self.qr + other.qr, self.qi + other.qi, self.qj + other.qj, self.qk + other.qk)
+        else:
+            other = as_real(other)
+            if other is None:
+                return NotImplemented
+            return _quat(self.qr + other, self.qi, self.qj, self.qk)
+
+    def __iadd__(self, other):
+        """Note: In-place operators mutate self, so never apply them to shared constants like QRHAT."""
+        if isinstance(other, Quat):
+            self.qr += other.qr
+            self.qi += other.qi
+            self.qj += other.qj
+            self.qk += other.qk
+        else:
+            other = as_real(other)
+            if other is None:
+                return NotImplemented
+            self.qr += other
+        return self
+
+    def __imul__(self, other):
+        if isinstance(other, Quat):
+            ar, ai, aj, ak = self.qr, self.qi, self.qj, self.qk
+            br, bi, bj, bk = other.qr, other.qi, other.qj, other.qk
+            self.qr = ar * br - ai * bi - aj * bj - ak * bk
+            self.qi = ar * bi + ai * br + aj * bk - ak * bj
+            self.qj = ar * bj + aj * br + ak * bi - ai * bk
+            self.qk = ar * bk + ak * br + ai * bj - aj * bi
+        else:
+            other = as_real(other)
+            if other is None:
+                return NotImplemented
+            self.qr *= other
+            self.qi *= other
+            self.qj *= other
+            self.qk *= other
+        return self
+
+    def __isub__(self, other):
+        if isinstance(other, Quat):
+            self.qr -= other.qr
+            self.qi -= other.qi
+            self.qj -= other.qj
+            self.qk -= other.qk
         else:
-            return Quat(self.qr + other, self.qi, self.qj, self.qk)
+            other = as_real(other)
+            if other is None:
+                return NotImplemented
+            self.qr -= other
+        return self
 
     def __rmul__(self, other):
         return self * other
 
     def __mul__(self, other):
-        if type(other) == type(self):
-            return Quat(
-                self.qr * other.qr - self.qi * other.qi - self.qj * other.qj - self.qk * other.qk,
-                self.qr * other.qi + self.qi * other.qr + self.qj * other.qk - self.qk * other.qj,
-                self.qr * other.qj + self.qj * other.qr + self.qk * other.qi - self.qi * other.qk,
-                self.qr * other.qk + self.qk * other.qr + self.qi * other.qj - self.qj * other.qi)
+        if isinstance(other, Quat):
+            ar, ai, aj, ak = self.qr, self.qi, self.qj, self.qk
+            br, bi, bj, bk = other.qr, other.qi, other.qj, other.qk
+            return _quat(
+                ar * br - ai * bi - aj * bj - ak * bk,
+                ar * bi + ai * br + aj * bk - ak * bj,
+                ar * bj + aj * br + ak * bi - ai * bk,
+                ar * bk + ak * br + ai * bj - aj * bi)
         else:
-            return Quat(other * self.qr, other * self.qi, other * self.qj, other * self.qk)
+            other = as_real(other)
+            if other is None:
+                return NotImplemented
+            return _quat(other * self.qr, other * self.qi, other * self.qj, other * self.qk)
 
     def __pos__(self):
-            return Quat(self.qr, self.qi, self.qj, self.qk)
+        return _quat(self.qr, self.qi, self.qj, self.qk)
 
     def __neg__(self):
-        return Quat(-self.qr, -self.qi, -self.qj, -self.qk)
+        return _quat(-self.qr, -self.qi, -self.qj, -self.qk)
 
-    def __str__():
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
         return '{0:.2f} + {1:.2f}i + {2:.2f}j + {3:.2f}k'.format(self.qr, self.qi, self.qj, self.qk)
 
     def __sub__(self, other):
-        if type(other) == type(self):
-            return Quat(self.qr - other.qr, self.qi - other.qi, self.qj - other.qj, self.qk - other.qk)
+        if isinstance(other, Quat):
+            return _quat(self.qr - other.qr, self.qi - other.qi, self.qj - other.qj, self.qk - other.qk)
         else:
-            return Quat(self.qr - other, self.qi, self.qj, self.qk)
+            other = as_real(other)
+            if other is None:
+                return NotImplemented
+            return _quat(self.qr - other, self.qi, self.qj, self.qk)
 
     def __truediv__(self, other):
-        if type(other) == type(self):
-            return Quat(self * other.inverse())
+        if isinstance(other, Quat):
+            return self * other.inverse()
         else:
-            return Quat(self.qr / other, self.qi / other, self.qj / other, self.qk / other)
+            inv = 1 / other
+            return _quat(inv * self.qr, inv * self.qi, inv * self.qj, inv * self.qk)
 
     def as_vec3(self):
         '''Return a 3D vector representing the non-real components of the argument.
         Note: This should only be called on vector quaternion.'''
-        return Vec3(self.qi, self.qj, self.qk)
+        return Vec3.from_xyz(self.qi, self.qj, self.qk)
 
     def conjugate(self):
-        return Quat(self.qr, -self.qi, -self.qj, -self.qk)
+        return _quat(self.qr, -self.qi, -self.qj, -self.qk)
 
     def diffnorm(self, other):
-        return (self - other).length()
+        return (self - other).norm()
 
     def imag(self):
-        return Quat(0.0, self.qi, self.qj, self.qk)
+        return _quat(0.0, self.qi, self.qj, self.qk)
 
     def inverse(self):
-        return self.conjugate() / self.norm2()
+        inv_n2 = 1 / (self.qr * self.qr + self.qi * self.qi + self.qj * self.qj + self.qk * self.qk)
+        return _quat(inv_n2 * self.qr, -inv_n2 * self.qi, -inv_n2 * self.qj, -inv_n2 * self.qk)
 
     def norm(self):
-        norm2 = self.norm2()
-        return sqrt(norm2)
+        return sqrt(self.qr * self.qr + self.qi * self.qi + self.qj * self.qj + self.qk * self.qk)
 
     def norm2(self):
-        norm2 = self.qr**2 + self.qi**2 + self.qj**2 + self.qk**2
-        return norm2
+        return self.qr * self.qr + self.qi * self.qi + self.qj * self.qj + self.qk * self.qk
 
     def normalize(self):
         n = self.norm()
-        assert(not is_zero_approx(n))
-        # return Quat(self.qr / n, self.qi / n, self.qj / n, self.qk / n)
-        return (1/self.norm()) * self
+        if n < EPSILON:
+            raise ValueError('Cannot normalize a quaternion with (nearly) zero norm')
+        inv_n = 1 / n
+        return _quat(inv_n * self.qr, inv_n * self.qi, inv_n * self.qj, inv_n * self.qk)
+
+
+_new = object.__new__
+
+
+def _quat(qr, qi, qj, qk):
+    """Fast internal constructor used on hot paths."""
+    result = _new(Quat)
+    result.qr = qr
+    result.qi = qi
+    result.qj = qj
+    result.qk = qk
+    return result
 
 # ----------------------------------------
 
@@ -139,43 +227,43 @@ QKHAT = Quat(0.0, 0.0, 0.0, 1.0)
 
 # ----------------------------------------
 
+SMALL_ANGLE = 1e-3  # Below this, sin(x)/x and atan(x)/x are evaluated by their Taylor series
+
+
 def qexp(q):
-    """Just as e ** (i * pi) == -1, it's also true that e ** (v * PI) == -1 for any unit vector Quaternion, v."""
-    qimag = q.imag()
-    qimagnorm = qimag.norm()
-    if is_zero_approx(qimagnorm):
-        return exp(q.qr) * QRHAT
+    """Just as e ** (i * pi) == -1, it's also true that e ** (v * PI) == -1 for any unit vector Quaternion, v.
+    In general, exp(r + v * theta) = e ** r * (cos theta + v * sin theta) for a unit vector quaternion v."""
+    theta = sqrt(q.qi * q.qi + q.qj * q.qj + q.qk * q.qk)
+    if theta < SMALL_ANGLE:
+        theta2 = theta * theta
+        sinc = 1 - theta2 / 6 + theta2 * theta2 / 120
     else:
-        qimaghat = qimag.normalize()
-        theta = qimag.norm()
-        cos_theta = cos(theta) * QRHAT
-        sin_theta_vhat = sin(theta) * qimaghat
-        return cos_theta + sin_theta_vhat
+        sinc = sin(theta) / theta
+    scale = exp(q.qr)
+    s = scale * sinc
+    return Quat.from_wxyz(scale * cos(theta), s * q.qi, s * q.qj, s * q.qk)
 
 def qlog(q):
     """Given a non-zero quaternion q, q = |q| * qhat, where qhat is a unit quaternion.
     qhat = (cos theta) + (sin theta) * qijkhat = exp(qijkhat * theta),
         where qijkhat is a pure imaginary unit quaternion.
     log(qhat) = qijkhat * theta
-    So log(q) = log(|q|) + qijkhat * theta
-    """
-    """TODO: Document the cut point for the complex log function.
-    If q = r (cos A + v * sin A), then Log(q) = r + v * A,
-    where r is the norm of q, and v is a vector quaternion---one with zero real component."""
+    So log(q) = log(|q|) + qijkhat * theta, with theta in [0, pi].
+    The angle is found with atan2, which stays accurate near the identity, where acos does not.
+    On the cut, the negative real axis, qijkhat is taken to be i."""
     qnorm = q.norm()
-    assert(not is_zero_approx(qnorm))
-    qhat = (1/qnorm) * q
-    theta = acos(qhat.qr)
-    qijk = qhat.imag()
-    qijknorm = qijk.norm()
-    if is_zero_approx(qijk):
-        def sgn(x):
-            return 1 if x > 0 else (-1 if x < 0 else 0)
-        sgn_r = sgn(qijknorm)
-        qijkhat = sgn_r * QRHAT
+    if qnorm < EPSILON:
+        raise ValueError('Cannot take the log of a zero quaternion')
+    imag_norm = sqrt(q.qi * q.qi + q.qj * q.qj + q.qk * q.qk)
+    if q.qr > 0 and imag_norm < SMALL_ANGLE * q.qr:
+        # theta / imag_norm = atan(x) / (x * qr) for x = imag_norm / qr
+        x2 = (imag_norm / q.qr) ** 2
+        factor = (1 - x2 / 3 + x2 * x2 / 5) / q.qr
+    elif imag_norm == 0:
+        return Quat.from_wxyz(log(qnorm), pi, 0.0, 0.0)
     else:
-        qijkhat = qhat.imag().normalize()
-    return Quat(log(qnorm), theta * qijkhat)
+        factor = atan2(imag_norm, q.qr) / imag_norm
+    return Quat.from_wxyz(log(qnorm), factor * q.qi, factor * q.qj, factor * q.qk)
 
 
 def qpow(q1, q2):
@@ -186,9 +274,29 @@ def qpow(q1, q2):
     return qexp(q2 * qlog(q1))
 
 
+SLERP_EPSILON = 1e-9
+
+
 def qslerp(a, b, t):
     """Spherical Linear Interpolation ("Slerp") of quaternions yeilds natural transitions from one rotation to another.
-    x = Starting quaternion
-    y = Ending quaternion
-    z = Time, which goes from 0 to 1"""
-    return qpow(a, 1-t) * qpow(b, t)
+    a = Starting quaternion
+    b = Ending quaternion
+    t = Time, which goes from 0 to 1
+    Uses the closed form (sin((1-t)W) a + sin(tW) b) / sin(W) on the unit quaternions,
+    where W is the angle between them, scaled by |a|**(1-t) * |b|**t.
+    This is a * (a^(-1) * b)**t, the great-circle arc from a to b."""
+    na = a.norm()
+    nb = b.norm()
+    ahat = (1/na) * a
+    bhat = (1/nb) * b
+    # atan2 of the chord lengths keeps the angle accurate near 0 and near pi, unlike acos.
+    omega = 2 * atan2((ahat - bhat).norm(), (ahat + bhat).norm())
+    sin_omega = sin(omega)
+    if sin_omega >= SLERP_EPSILON:
+        result = (sin((1-t) * omega) / sin_omega) * ahat + (sin(t * omega) / sin_omega) * bhat
+    elif omega < pi / 2:  # Nearly parallel: slerp and normalized lerp agree to O(W^2)
+        result = ((1-t) * ahat + t * bhat).normalize()
+    else:  # Nearly antipodal: any great circle will do, so take one through a unit quaternion perpendicular to a
+        perp = Quat(-ahat.qi, ahat.qr, -ahat.qk, ahat.qj)
+        result = cos(pi * t) * ahat + sin(pi * t) * perp
+    return (na ** (1-t) * nb ** t) * result
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+from backend import float_dtype, tolerance
+from quat import SLERP_EPSILON, SMALL_ANGLE, Quat
+from vec3_array import Vec3Array, as_scalars, is_raw_buffer, rows_from_buffer
+
+
+class QuatArray:
+    """A batch of quaternions stored as one contiguous (N, 4) array of the backend's float_dtype
+    with columns (qr, qi, qj, qk). Products broadcast against a single Quat,
+    a scalar, or an (N,) array of scalars."""
+    __array_ufunc__ = None  # Make ndarray operands defer to our reflected operators
+
+    @staticmethod
+    def from_buffer(buffer, offset=0, count=-1):
+        """View count quaternions of native float64s (qr, qi, qj, qk) in buffer, starting offset bytes in,
+        without copying; as Vec3Array.from_buffer."""
+        result = QuatArray()
+        result.data = rows_from_buffer(buffer, 4, offset, count)
+        return result
+
+    @staticmethod
+    def from_quats(qs):
+        return QuatArray(np.array([(q.qr, q.qi, q.qj, q.qk) for q in qs], dtype=float_dtype()).reshape(-1, 4))
+
+    def __init__(self, *args):
+        if len(args) == 0:
+            self.data = np.empty((0, 4), dtype=float_dtype())
+        elif len(args) == 1:
+            arg0 = args[0]
+            if isinstance(arg0, QuatArray):
+                self.data = arg0.data.copy()
+            elif isinstance(arg0, (list, tuple)) and len(arg0) > 0 and isinstance(arg0[0], Quat):
+                self.data = QuatArray.from_quats(arg0).data
+            elif is_raw_buffer(arg0):
+                self.data = rows_from_buffer(arg0, 4)
+            else:
+                self.data = np.ascontiguousarray(arg0, dtype=float_dtype()).reshape(-1, 4)
+        elif len(args) == 4:
+            self.data = np.ascontiguousarray(np.stack(np.broadcast_arrays(*args), axis=-1), dtype=float_dtype())
+        else:
+            raise ValueError('QuatArray() requires 0, 1, or 4 arguments')
+
+    def __add__(self, other):
+        return QuatArray(self.data + _as_array(other))
+
+    def __array__(self, dtype=None, copy=None):
+        """np.asarray(qs) is the underlying (N, 4) array, not a copy."""
+        if dtype is not None and np.dtype(dtype) != self.data.dtype:
+            return self.data.astype(dtype)
+        return self.data.copy() if copy else self.data
+
+    def __buffer__(self, flags):
+        """memoryview(qs) exports the underlying array (Python 3.12 and later; see as_memoryview)."""
+        return memoryview(self.data)
+
+    def __radd__(self, other):
+        return QuatArray(_as_array(other) + self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            qr, qi, qj, qk = self.data[index]
+            return Quat(float(qr), float(qi), float(qj), float(qk))
+        return QuatArray(self.data[index])
+
+    def __iter__(self):
+        for qr, qi, qj, qk in self.data.tolist():
+            yield Quat(qr, qi, qj, qk)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __mul__(self, other):
+        if isinstance(other, (Quat, QuatArray)):
+            return QuatArray(hamilton_product(self.data, _as_array(other)))
+        return QuatArray(self.data * as_scalars(other))
+
+    def __neg__(self):
+        return QuatArray(-self.data)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __rmul__(self, other):
+        if isinstance(other, Quat):
+            return QuatArray(hamilton_product(_as_array(other), self.data))
+        return QuatArray(as_scalars(other) * self.data)
+
+    def __rsub__(self, other):
+        return QuatArray(_as_array(other) - self.data)
+
+    def __str__(self):
+        return '[' + ', '.join('{0:.2f} + {1:.2f}i + {2:.2f}j + {3:.2f}k'.format(*row)
+                               for row in self.data.tolist()) + ']'
+
+    def __sub__(self, other):
+        return QuatArray(self.data - _as_array(other))
+
+    def __truediv__(self, other):
+        if isinstance(other, (Quat, QuatArray)):
+            return self * QuatArray(_as_array(other)).inverse()
+        return QuatArray(self.data / as_scalars(other))
+
+    def as_memoryview(self):
+        """A memoryview of the underlying (N, 4) array, sharing its memory."""
+        return memoryview(self.data)
+
+    def as_vec3(self):
+        """Return the non-real components as a Vec3Array.
+        Note: This should only be called on vector quaternions."""
+        return Vec3Array(self.data[:, 1:])
+
+    def conjugate(self):
+        return QuatArray(self.data * _CONJUGATE_SIGNS)
+
+    def imag(self):
+        result = self.data.copy()
+        result[:, 0] = 0.0
+        return QuatArray(result)
+
+    def inverse(self):
+        return QuatArray(self.data * _CONJUGATE_SIGNS / self.norm2()[:, np.newaxis])
+
+    def norm(self):
+        return np.sqrt(self.norm2())
+
+    def norm2(self):
+        return np.einsum('ij,ij->i', self.data, self.data)
+
+    def normalize(self):
+        """Zero quaternions normalize to NaN, where Quat.normalize would raise."""
+        return QuatArray(self.data / self.norm()[:, np.newaxis])
+
+    def to_quats(self):
+        return list(self)
+
+
+_CONJUGATE_SIGNS = np.array((1.0, -1.0, -1.0, -1.0))
+
+
+def hamilton_product(a, b):
+    """Hamilton product of two (..., 4) arrays of (qr, qi, qj, qk), broadcasting over leading axes."""
+    ar, ai, aj, ak = np.moveaxis(a, -1, 0)
+    br, bi, bj, bk = np.moveaxis(b, -1, 0)
+    return np.stack((
+        ar * br - ai * bi - aj * bj - ak * bk,
+        ar * bi + ai * br + aj * bk - ak * bj,
+        ar * bj + aj * br + ak * bi - ai * bk,
+        ar * bk + ak * br + ai * bj - aj * bi), axis=-1)
+
+
+def _as_array(q):
+    """Return an (N, 4) or (4,) array view of a QuatArray, Quat, list of Quats, or array-like."""
+    if isinstance(q, QuatArray):
+        return q.data
+    if isinstance(q, Quat):
+        return np.array((q.qr, q.qi, q.qj, q.qk), dtype=float_dtype())
+    if isinstance(q, (list, tuple)) and len(q) > 0 and isinstance(q[0], Quat):
+        return QuatArray.from_quats(q).data
+    return np.asarray(q, dtype=float_dtype())
+
+
+def slerp(a, b, t, outer=False):
+    """Vectorized qslerp.
+    a and b are Quats or QuatArrays, and t is a scalar or an (M,) array; all three broadcast against each
+    other, so one pair can be sampled at many times, many pairs at one time, or N pairs at N times, one each.
+    With outer, each of N pairs is sampled at each of M times instead: the result has M * N rows, with pair n
+    at time t[m] in row m * N + n, so its data reshapes to (M, N, 4).
+    The angle between the endpoints is computed once per pair, not once per sample."""
+    a = _as_array(a)
+    b = _as_array(b)
+    na = np.sqrt(np.einsum('...i,...i->...', a, a))
+    nb = np.sqrt(np.einsum('...i,...i->...', b, b))
+    ahat = a / na[..., np.newaxis]
+    bhat = b / nb[..., np.newaxis]
+    # atan2 of the chord lengths keeps the angle accurate near 0 and near pi, unlike arccos.
+    omega = 2 * np.arctan2(np.linalg.norm(ahat - bhat, axis=-1), np.linalg.norm(ahat + bhat, axis=-1))
+    sin_omega = np.sin(omega)
+    t = np.asarray(t, dtype=float_dtype())
+    if outer:
+        t = t.reshape(-1, *(1,) * omega.ndim)
+    elif t.ndim > 0 and omega.ndim > 0 and len(t) not in (1, len(omega)):
+        raise ValueError(f'Cannot pair {len(omega)} quaternion pairs with {len(t)} times; pass outer=True to '
+                         'sample every pair at every time')
+    regular = sin_omega >= tolerance(SLERP_EPSILON)
+    safe_sin_omega = np.where(regular, sin_omega, 1.0)
+    ca = np.where(regular, np.sin((1 - t) * omega) / safe_sin_omega, 1 - t)
+    cb = np.where(regular, np.sin(t * omega) / safe_sin_omega, t)
+    result = ca[..., np.newaxis] * ahat + cb[..., np.newaxis] * bhat
+
+    parallel = ~regular & (omega < np.pi / 2)
+    if np.any(parallel):
+        lerp_norms = np.sqrt(np.einsum('...i,...i->...', result, result))
+        result = np.where(parallel[..., np.newaxis], result / lerp_norms[..., np.newaxis], result)
+    antipodal = ~regular & (omega >= np.pi / 2)
+    if np.any(antipodal):
+        ahat, t = np.broadcast_arrays(ahat, t[..., np.newaxis])
+        t = t[..., 0]
+        perp = np.stack((-ahat[..., 1], ahat[..., 0], -ahat[..., 3], ahat[..., 2]), axis=-1)
+        arc = np.cos(np.pi * t)[..., np.newaxis] * ahat + np.sin(np.pi * t)[..., np.newaxis] * perp
+        result = np.where(antipodal[..., np.newaxis], arc, result)
+    scale = na ** (1 - t) * nb ** t
+    return QuatArray((scale[..., np.newaxis] * result).reshape(-1, 4))
+
+
+def exp(q):
+    """Vectorized qexp over a QuatArray, Quat or (..., 4) array."""
+    q = _as_array(q)
+    r, v = q[..., 0], q[..., 1:]
+    theta = np.sqrt(np.einsum('...i,...i->...', v, v))
+    theta2 = theta * theta
+    small = theta < SMALL_ANGLE
+    sinc = np.where(small, 1 - theta2 / 6 + theta2 * theta2 / 120, np.sin(theta) / np.where(small, 1.0, theta))
+    scale = np.exp(r)
+    return QuatArray(np.concatenate(((scale * np.cos(theta))[..., np.newaxis], (scale * sinc)[..., np.newaxis] * v),
+                                    axis=-1))
+
+
+def log(q):
+    """Vectorized qlog over a QuatArray, Quat or (..., 4) array, with the same branch cut.
+    Zero quaternions give a real part of -inf."""
+    q = _as_array(q)
+    r, v = q[..., 0], q[..., 1:]
+    imag_norm = np.sqrt(np.einsum('...i,...i->...', v, v))
+    qnorm = np.sqrt(r * r + imag_norm * imag_norm)
+    near_identity = (r > 0) & (imag_norm < SMALL_ANGLE * r)
+    cut = ~near_identity & (imag_norm == 0)
+    safe_r = np.where(near_identity, r, 1.0)
+    x2 = (imag_norm / safe_r) ** 2
+    factor = np.where(near_identity, (1 - x2 / 3 + x2 * x2 / 5) / safe_r,
+                      np.arctan2(imag_norm, r) / np.where(near_identity | cut, 1.0, imag_norm))
+    imag = factor[..., np.newaxis] * v
+    if np.any(cut):
+        imag[cut] = (np.pi, 0.0, 0.0)
+    with np.errstate(divide='ignore'):
+        real = np.log(qnorm)
+    return QuatArray(np.concatenate((real[..., np.newaxis], imag), axis=-1))
+
+
+def power(q, t):
+    """Vectorized qpow for real exponents: exp(t * log(q)), where t is a scalar or an array
+    broadcasting against the quaternions."""
+    return exp(as_scalars(t) * log(q).data)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from quat import Quat, QRHAT, QIHAT, QJHAT, QKHAT, qexp, qlog, qpow, qslerp
+from quat_array import QuatArray, exp, log, power, slerp
+from tolerance import eq_approx
+
+
+class QuatArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.qs = [Quat(1.0, 2.0, 3.0, 4.0), Quat(-0.5, 0.25, 2.0, -1.0), QIHAT, QKHAT]
+        self.qa = QuatArray(self.qs)
+
+    def assert_matches(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        self.assertTrue(np.all(eq_approx(expected, actual)))
+
+    def test_add(self):
+        self.assert_matches([q + QJHAT for q in self.qs], self.qa + QJHAT)
+        self.assert_matches([QJHAT + q for q in self.qs], QJHAT + self.qa)
+
+    def test_as_vec3(self):
+        for q, v in zip(self.qs, self.qa.as_vec3()):
+            self.assertTrue(eq_approx(q.as_vec3(), v))
+
+    def test_conjugation(self):
+        self.assert_matches([q.conjugate() for q in self.qs], self.qa.conjugate())
+
+    def test_conversions(self):
+        self.assert_matches(self.qs, QuatArray.from_quats(self.qs).to_quats())
+        self.assertTrue(eq_approx(self.qs[1], self.qa[1]))
+        self.assertEqual((4, 4), self.qa.data.shape)
+
+    def test_buffers(self):
+        raw = self.qa.data.tobytes()
+        self.assert_matches(self.qs, QuatArray(raw))
+        self.assert_matches(self.qs[2:3], QuatArray.from_buffer(bytearray(raw), offset=64, count=1))
+        self.assertIs(self.qa.data, np.asarray(self.qa))
+        self.assertTrue(np.shares_memory(np.asarray(self.qa.as_memoryview()), self.qa.data))
+
+    def test_exp_log_pow(self):
+        quats = [Quat(*row) for row in np.random.default_rng(5).normal(0, 1, (20, 4))]
+        quats += [QRHAT, -QRHAT, 2.5 * QJHAT, Quat(1.0, 1e-5, -2e-5, 0.0), Quat(-3.0, 0.0, 1e-12, 0.0)]
+        qs = QuatArray(quats)
+        for actual, expected in ((exp(qs), [qexp(q) for q in quats]),
+                                 (log(qs), [qlog(q) for q in quats]),
+                                 (power(qs, 0.3), [qpow(q, 0.3) for q in quats])):
+            for a, e in zip(actual, expected):
+                self.assertTrue(eq_approx(a, e))
+        self.assertTrue(np.allclose(qs.data, exp(log(qs)).data))
+        exponents = np.linspace(-1.0, 2.0, len(quats))
+        for a, q, t in zip(power(qs, exponents), quats, exponents):
+            self.assertTrue(eq_approx(a, qpow(q, t)))
+
+    def test_log_near_identity(self):
+        # acos(1 - 5e-19) would round to an angle of zero
+        self.assertEqual(1e-9, log(Quat(1.0, 1e-9, 0.0, 0.0)).data[0, 1])
+        self.assertEqual(1e-9, qlog(Quat(1.0, 1e-9, 0.0, 0.0)).qi)
+
+    def test_inverse(self):
+        self.assert_matches([q.inverse() for q in self.qs], self.qa.inverse())
+        self.assert_matches([QRHAT] * len(self.qs), self.qa * self.qa.inverse())
+
+    def test_mul(self):
+        self.assert_matches([p * q for p, q in zip(self.qs, reversed(self.qs))],
+                            self.qa * QuatArray(list(reversed(self.qs))))
+        self.assert_matches([q * QJHAT for q in self.qs], self.qa * QJHAT)
+        self.assert_matches([QJHAT * q for q in self.qs], QJHAT * self.qa)
+        self.assert_matches([2.0 * q for q in self.qs], 2.0 * self.qa)
+
+    def test_norm(self):
+        self.assertTrue(np.allclose([q.norm() for q in self.qs], self.qa.norm()))
+        self.assert_matches([q.normalize() for q in self.qs], self.qa.normalize())
+
+    def test_slerp(self):
+        a = Quat(1.0, 2.0, 3.0, 4.0)
+        b = Quat(-0.5, 0.25, 2.0, -1.0)
+        ts = np.linspace(0.0, 1.0, 11)
+        self.assert_matches([qslerp(a, b, t) for t in ts], slerp(a, b, ts))
+
+        bs = QuatArray([b, a, QRHAT, -QIHAT])
+        self.assert_matches([qslerp(QIHAT, q, 0.3) for q in bs], slerp(QIHAT, bs, 0.3))
+        self.assert_matches([qslerp(p, q, t) for p, q, t in zip(self.qa, bs, ts)], slerp(self.qa, bs, ts[:4]))
+
+        # Every pair at every time.
+        samples = slerp(self.qa, bs, ts[:3], outer=True)
+        self.assertEqual((3, 4, 4), samples.data.reshape(3, len(bs), 4).shape)
+        self.assert_matches([qslerp(p, q, t) for t in ts[:3] for p, q in zip(self.qa, bs)], samples)
+        self.assert_matches([qslerp(a, b, t) for t in ts], slerp(a, b, ts, outer=True))
+        with self.assertRaises(ValueError):
+            slerp(self.qa, bs, ts[:3])
+
+    def test_sub(self):
+        self.assert_matches([q - QIHAT for q in self.qs], self.qa - QIHAT)
+
+    def test_truediv(self):
+        self.assert_matches([q / 2 for q in self.qs], self.qa / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
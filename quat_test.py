@@ -1,10 +1,16 @@
 #!/usr/bin/env python
 
 import unittest
+from decimal import Decimal
+from fractions import Fraction
+from math import cos, e, pi, sin
+
+import numpy as np
 
 from quat import Quat, QRHAT, QIHAT, QJHAT, QKHAT
 from quat import qexp, qlog, qpow, qslerp
 from util import eq_approx
+from vec3 import XHAT, ZHAT
 
 
 class QuatTest(unittest.TestCase):
@@ -17,7 +23,22 @@ class QuatTest(unittest.TestCase):
         pass
 
     def test_constructors(self):
-        pass
+        self.assertTrue(eq_approx(Quat(1.0, 2.0, 3.0, 4.0), Quat.from_wxyz(1.0, 2.0, 3.0, 4.0)))
+        self.assertTrue(eq_approx(Quat(0.5, ZHAT), Quat.from_axis_angle(ZHAT, 0.5)))
+        self.assertTrue(eq_approx(QIHAT, Quat(QIHAT)))
+        self.assertTrue(eq_approx(QIHAT, Quat(XHAT)))
+
+    def test_in_place(self):
+        q = Quat(QIHAT)
+        alias = q
+        q *= QJHAT
+        self.assertIs(alias, q)
+        self.assertTrue(eq_approx(QKHAT, q))
+        q += QRHAT
+        q -= 2.0
+        q *= 2.0
+        self.assertTrue(eq_approx(Quat(-2.0, 0.0, 0.0, 2.0), q))
+        self.assertTrue(eq_approx(Quat(0.0, 1.0, 0.0, 0.0), QIHAT))
 
     def test_exp_and_log(self):
         ii = qpow(QIHAT, 2.0)
@@ -38,6 +59,13 @@ class QuatTest(unittest.TestCase):
         assert_el_eq_le(QJHAT)
         assert_el_eq_le(QKHAT)
 
+        # exp and log are inverse for non-unit quaternions too.
+        for q in (Quat(2.0, 0.5, -1.0, 0.25), Quat(-3.0, 0.0, 0.0, 0.0), Quat(0.5, 1e-6, 0.0, 0.0)):
+            self.assertTrue(eq_approx(qexp(qlog(q)), q))
+        self.assertTrue(eq_approx(qexp(Quat(1.0, pi, 0.0, 0.0)), -e * QRHAT))
+        with self.assertRaises(ValueError):
+            qlog(Quat())
+
     def test_inverse(self):
         pass
 
@@ -66,11 +94,32 @@ class QuatTest(unittest.TestCase):
         self.assertTrue(eq_approx(kj, -QIHAT))
         self.assertTrue(eq_approx(kk, -QRHAT))
 
+    def test_real_scalars(self):
+        q = Quat(1.0, 2.0, 3.0, 4.0)
+        self.assertTrue(eq_approx(Quat(2.0, 4.0, 6.0, 8.0), q * np.float32(2.0)))
+        self.assertTrue(eq_approx(Quat(2.0, 4.0, 6.0, 8.0), np.float32(2.0) * q))
+        self.assertTrue(eq_approx(Quat(2.5, 2.0, 3.0, 4.0), q + Decimal('1.5')))
+        self.assertTrue(eq_approx(Quat(0.5, 2.0, 3.0, 4.0), q - Fraction(1, 2)))
+        with self.assertRaises(TypeError):
+            q * 1j
+
     def test_sub(self):
         pass
 
     def test_slerp(self):
-        pass
+        # Rotations about a common axis commute, so slerp just interpolates the angle.
+        a = Quat(cos(0.15), 0.0, 0.0, sin(0.15))
+        b = Quat(cos(0.6), 0.0, 0.0, sin(0.6))
+        for t in (0.0, 0.25, 0.5, 1.0):
+            half_angle = 0.15 + t * 0.45
+            self.assertTrue(eq_approx(qslerp(a, b, t), Quat(cos(half_angle), 0.0, 0.0, sin(half_angle))))
+            self.assertTrue(eq_approx(qslerp(a, b, t), qpow(a, 1-t) * qpow(b, t)))
+
+        # Endpoints are reproduced, including the degenerate parallel and antipodal cases.
+        for b in (Quat(1.0, 2.0, -1.0, 0.5), QJHAT, -QJHAT, 2.0 * QJHAT):
+            self.assertTrue(eq_approx(qslerp(QJHAT, b, 0.0), QJHAT))
+            self.assertTrue(eq_approx(qslerp(QJHAT, b, 1.0), b))
+        self.assertTrue(eq_approx(qslerp(QRHAT, -QRHAT, 0.5).norm(), 1.0))
 
     def test_str(self):
         pass
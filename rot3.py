@@ -1,18 +1,22 @@
 #!/usr/bin/env python
 
-from math import cos, pi, sin
+from math import pi
+
+import numpy as np
 
 from quat import Quat
+from rot3_array import euler_to_quats, matrices_to_quats, quats_to_axis_angles, quats_to_euler
 from vec3 import Vec3, XHAT, YHAT, ZHAT
+from vec3_array import Vec3Array
 
 
-# TODO: JMC: Support conversion to and from matrices
-# TODO: JMC: Support representation via Euler angles
 # TODO: JMC: Support angular velocity (vector Quaternion class)
 # TODO: JMC: Support distinguishing between body & space coordinates
 # TODO: JMC: Add abs, add, floordiv, matmul, mul, neg, pow, sub, radd, rfloordiv,
 #                rmatmul, rmul, rpow, rsub, rtruediv, truediv
 class Rot3:
+    __slots__ = ('quat', '_matrix', '_matrix_key')
+
     @staticmethod
     def degrees_to_radians(degs):
         return degs * pi / 180
@@ -33,7 +37,33 @@ class Rot3:
     def z_rotatation(angle):
         return Rot3(ZHAT, angle)
 
+    @classmethod
+    def from_axis_angle(cls, axis, angle):
+        return cls.from_quat(Quat.from_axis_angle(axis.normalized(), angle))
+
+    @classmethod
+    def from_euler(cls, angles, seq):
+        """Construct from three Euler angles in one of the rot3_array.EULER_SEQUENCES
+        (lower case for extrinsic, upper case for intrinsic)."""
+        return cls.from_quat(Quat.from_wxyz(*euler_to_quats(angles, seq).data[0].tolist()))
+
+    @classmethod
+    def from_matrix(cls, m):
+        """Construct from a 3x3 rotation matrix."""
+        return cls.from_quat(Quat.from_wxyz(*matrices_to_quats(m).data[0].tolist()))
+
+    @classmethod
+    def from_quat(cls, quat):
+        """Construct from a quaternion (used as is, not copied) without the argument dispatch done by __init__."""
+        result = _new(cls)
+        result.quat = quat
+        result._matrix = None
+        result._matrix_key = None
+        return result
+
     def __init__(self, *args):
+        self._matrix = None
+        self._matrix_key = None
         if len(args) == 0:
             self.quat = Quat()
         elif len(args) == 1:
@@ -45,19 +75,10 @@ class Rot3:
             else:
                 assert(False)
         elif len(args) == 2:
-            def axis_angle_to_quat(axis, angle):
-                cs = cos(angle/2)
-                sn = sin(angle/2)
-                return Quat(cs, sn * axis.x, sn * axis.y, sn * axis.z)
-
-            if (type(args[0]) == Vec3):
-                axis = args[0].normalized()
-                angle = args[1]
-                self.quat = axis_angle_to_quat(axis, angle)
-            elif (type(args[1]) == Vec3):
-                axis = args[1].normalized()
-                angle = args[0]
-                self.quat = axis_angle_to_quat(axis, angle)
+            if isinstance(args[0], Vec3):
+                self.quat = Quat.from_axis_angle(args[0].normalized(), args[1])
+            elif isinstance(args[1], Vec3):
+                self.quat = Quat.from_axis_angle(args[1].normalized(), args[0])
             else:
                 assert(False)
 
@@ -65,19 +86,74 @@ class Rot3:
         return self.rotate(vec)
 
     def __str__(self):
-        return "Rot3-" + _quat.__str__()
+        return "Rot3-" + self.quat.__str__()
+
+    def axis_angle(self):
+        """Return (axis, angle), with a unit Vec3 axis and an angle in [0, pi]."""
+        axes, angles = quats_to_axis_angles(self._quat_array())
+        return Vec3.from_xyz(*axes.tolist()), float(angles)
+
+    def euler(self, seq):
+        """Return the three Euler angles of this rotation in the given sequence, as for Rot3.from_euler."""
+        return tuple(quats_to_euler(self._quat_array(), seq).tolist())
+
+    def _quat_array(self):
+        q = self.quat
+        return np.array((q.qr, q.qi, q.qj, q.qk))
+
+    def matrix(self):
+        """Return the 3x3 matrix of this rotation.
+        It is cached, and only recomputed if the components of self.quat change."""
+        q = self.quat
+        key = (q.qr, q.qi, q.qj, q.qk)
+        if key != self._matrix_key:
+            self._matrix = quat_to_matrix(q)
+            self._matrix_key = key
+        return self._matrix
+
+    def rotate_many(self, points):
+        """Rotate many vectors with a single matrix multiply.
+        points may be an (N, 3) array, a Vec3Array or a list of Vec3s;
+        the result is of the same kind, and arrays keep their precision."""
+        m = self.matrix()
+        if isinstance(points, np.ndarray):
+            return points @ m.T.astype(np.result_type(points, np.float32))
+        if isinstance(points, Vec3Array):
+            return Vec3Array(points.data @ m.T.astype(points.data.dtype))
+        return Vec3Array(Vec3Array(points).data @ m.T).to_vec3s()
 
     def rotate(self, vec: Vec3) -> Vec3:
         """The result of rotating a vector using a quaternion is
             q * v * q^(-1),
         where R^3 is identified with the imaginary subspace of H (the quaternions)."""
-        qv = Quat(vec)
-        qinv = self.quat.inverse()
-        assert(isinstance(self.quat, Quat))
-        assert(isinstance(qv, Quat))
-        assert(isinstance(qinv, Quat))
-        result = self.quat * qv * qinv
-        return result.as_vec3()
+        # Expanded in components: with q = w + u, the product is
+        #     v + (2 / |q|^2) (w (u x v) + u x (u x v)),
+        # which saves the inverse and both Hamilton products.
+        q = self.quat
+        w, x, y, z = q.qr, q.qi, q.qj, q.qk
+        s = 2 / (w * w + x * x + y * y + z * z)
+        vx, vy, vz = vec.x, vec.y, vec.z
+        tx = y * vz - z * vy
+        ty = z * vx - x * vz
+        tz = x * vy - y * vx
+        return Vec3.from_xyz(
+            vx + s * (w * tx + y * tz - z * ty),
+            vy + s * (w * ty + z * tx - x * tz),
+            vz + s * (w * tz + x * ty - y * tx))
+
+
+_new = object.__new__
+
+
+def quat_to_matrix(q):
+    """Return the 3x3 matrix of the rotation v -> q * v * q^(-1).
+    q need not be a unit quaternion."""
+    s = 2 / q.norm2()
+    r, i, j, k = q.qr, q.qi, q.qj, q.qk
+    return np.array((
+        (1 - s * (j * j + k * k), s * (i * j - k * r), s * (i * k + j * r)),
+        (s * (i * j + k * r), 1 - s * (i * i + k * k), s * (j * k - i * r)),
+        (s * (i * k - j * r), s * (j * k + i * r), 1 - s * (i * i + j * j))))
 
 
 XROT90 = Rot3.x_rotatation(Rot3.degrees_to_radians(90))
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+"""Vectorized conversions between representations of many rotations.
+
+Quaternions are the hub: each representation converts to and from them.
+Quaternions are (..., 4) arrays or QuatArrays with columns (qr, qi, qj, qk),
+and need not be unit; those returned are unit, with qr >= 0.
+Matrices are (..., 3, 3) arrays that act on column vectors.
+Axis-angle pairs are (..., 3) unit axes and (...) angles in radians.
+
+Euler angles are (..., 3) arrays of angles in radians, for a sequence
+of three axes named as in EULER_SEQUENCES: the 6 Tait-Bryan sequences,
+such as 'xyz', and the 6 proper Euler sequences, such as 'zxz'.
+Lower case names rotate about the fixed (extrinsic) axes, so 'xyz' is
+the rotation about x, then y, then z. Upper case names rotate about the
+rotating (intrinsic) axes, so 'XYZ' is the matrix product Rx Ry Rz.
+"""
+
+import numpy as np
+
+from backend import float_dtype, tolerance
+from quat_array import QuatArray, hamilton_product
+
+
+EULER_SEQUENCES = ('xyz', 'xzy', 'yxz', 'yzx', 'zxy', 'zyx',
+                   'xyx', 'xzx', 'yxy', 'yzy', 'zxz', 'zyz')
+GIMBAL_EPSILON = 1e-7  # Middle angles this close to 0 or pi (proper) or +-pi/2 (Tait-Bryan) are gimbal locked
+
+_AXES = {'x': 0, 'y': 1, 'z': 2}
+
+
+def _quat_data(q):
+    return q.data if isinstance(q, QuatArray) else np.asarray(q, dtype=float_dtype())
+
+
+def _canonical(q):
+    """Normalize, and flip the sign where needed so that qr >= 0."""
+    q = q / np.sqrt(np.einsum('...i,...i->...', q, q))[..., np.newaxis]
+    return np.where(q[..., :1] < 0, -q, q)
+
+
+def quats_to_matrices(q):
+    """Return the (..., 3, 3) matrices of the rotations v -> q v q^(-1)."""
+    q = _quat_data(q)
+    r, i, j, k = np.moveaxis(q, -1, 0)
+    s = 2 / np.einsum('...i,...i->...', q, q)
+    return np.stack((
+        np.stack((1 - s * (j * j + k * k), s * (i * j - k * r), s * (i * k + j * r)), axis=-1),
+        np.stack((s * (i * j + k * r), 1 - s * (i * i + k * k), s * (j * k - i * r)), axis=-1),
+        np.stack((s * (i * k - j * r), s * (j * k + i * r), 1 - s * (i * i + j * j)), axis=-1)), axis=-2)
+
+
+def matrices_to_quats(m):
+    """Return the unit quaternions of (..., 3, 3) rotation matrices, by Shepperd's method:
+    each is recovered from whichever of 1 + trace and 1 + 2 m_ii - trace is largest,
+    so the square root and the division are always well conditioned."""
+    m = np.asarray(m, dtype=float_dtype())
+    trace = np.trace(m, axis1=-2, axis2=-1)
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+    # Row c holds 4 q_c times the quaternion, where q_c is the component taken from the diagonal.
+    candidates = np.stack((
+        np.stack((1 + trace, m[..., 2, 1] - m[..., 1, 2], m[..., 0, 2] - m[..., 2, 0], m[..., 1, 0] - m[..., 0, 1]), -1),
+        np.stack((m[..., 2, 1] - m[..., 1, 2], 1 + 2 * m00 - trace, m[..., 0, 1] + m[..., 1, 0], m[..., 0, 2] + m[..., 2, 0]), -1),
+        np.stack((m[..., 0, 2] - m[..., 2, 0], m[..., 0, 1] + m[..., 1, 0], 1 + 2 * m11 - trace, m[..., 1, 2] + m[..., 2, 1]), -1),
+        np.stack((m[..., 1, 0] - m[..., 0, 1], m[..., 0, 2] + m[..., 2, 0], m[..., 1, 2] + m[..., 2, 1], 1 + 2 * m22 - trace), -1)),
+        axis=-2)
+    best = np.argmax(np.stack((trace, m00, m11, m22), axis=-1), axis=-1)
+    q = np.take_along_axis(candidates, best[..., np.newaxis, np.newaxis], axis=-2)[..., 0, :]
+    return QuatArray(_canonical(q))
+
+
+def axis_angles_to_quats(axes, angles):
+    """Return the unit quaternions of rotations by angles about (..., 3) axes, which need not be unit.
+    angles broadcasts against the axes."""
+    axes = np.asarray(axes, dtype=float_dtype())
+    angles = np.broadcast_to(np.asarray(angles, dtype=float_dtype()), axes.shape[:-1])
+    axes = axes / np.sqrt(np.einsum('...i,...i->...', axes, axes))[..., np.newaxis]
+    half = angles / 2
+    return QuatArray(np.concatenate((np.cos(half)[..., np.newaxis], np.sin(half)[..., np.newaxis] * axes), axis=-1))
+
+
+def quats_to_axis_angles(q):
+    """Return (axes, angles), with unit axes and angles in [0, pi].
+    The identity rotation is given the x axis."""
+    q = _canonical(_quat_data(q))
+    imag = q[..., 1:]
+    imag_norms = np.sqrt(np.einsum('...i,...i->...', imag, imag))
+    angles = 2 * np.arctan2(imag_norms, q[..., 0])
+    identity = imag_norms == 0
+    axes = imag / np.where(identity, 1.0, imag_norms)[..., np.newaxis]
+    axes[identity] = (1.0, 0.0, 0.0)
+    return axes, angles
+
+
+def _parse_sequence(seq):
+    if seq.lower() not in EULER_SEQUENCES:
+        raise ValueError(f'Unknown Euler angle sequence: {seq}')
+    if seq not in (seq.lower(), seq.upper()):
+        raise ValueError(f'Euler angle sequence must be all lower case (extrinsic) or all upper case (intrinsic): {seq}')
+    return [_AXES[axis] for axis in seq.lower()], seq.islower()
+
+
+def euler_to_quats(angles, seq):
+    """Return the unit quaternions of (..., 3) Euler angles in the given sequence."""
+    axes, extrinsic = _parse_sequence(seq)
+    angles = np.asarray(angles, dtype=float_dtype())
+    quats = []
+    for n, axis in enumerate(axes):
+        q = np.zeros(angles.shape[:-1] + (4,))
+        q[..., 0] = np.cos(angles[..., n] / 2)
+        q[..., 1 + axis] = np.sin(angles[..., n] / 2)
+        quats.append(q)
+    if extrinsic:
+        quats.reverse()  # The first rotation is applied first, so it is the rightmost factor
+    return QuatArray(_canonical(hamilton_product(hamilton_product(quats[0], quats[1]), quats[2])))
+
+
+def quats_to_euler(q, seq):
+    """Return (..., 3) Euler angles in the given sequence, with the middle angle in [0, pi] for proper
+    Euler sequences or [-pi/2, pi/2] for Tait-Bryan sequences, and the others in [-pi, pi).
+    Where the first and third axes line up (gimbal lock), the third angle is set to zero.
+    This is the direct method of Bernardes and Viollet (2022), which needs no matrix."""
+    axes, extrinsic = _parse_sequence(seq)
+    if not extrinsic:
+        axes = axes[::-1]  # An intrinsic sequence is the reversed extrinsic one
+    i, j, k = axes
+    proper = i == k
+    if proper:
+        k = 3 - i - j
+    sign = (i - j) * (j - k) * (k - i) // 2  # +1 if (i, j, k) is a cyclic permutation of (x, y, z), else -1
+    q = _canonical(_quat_data(q))
+    w, v = q[..., 0], q[..., 1:]
+    if proper:
+        a, b, c, d = w, v[..., i], v[..., j], sign * v[..., k]
+    else:
+        a, b, c, d = w - v[..., j], v[..., i] + sign * v[..., k], v[..., j] + w, sign * v[..., k] - v[..., i]
+
+    middle = 2 * np.arctan2(np.hypot(c, d), np.hypot(a, b))
+    half_sum = np.arctan2(b, a)  # Half of first + third
+    half_diff = np.arctan2(d, c)  # Half of third - first
+    first = half_sum - half_diff
+    third = half_sum + half_diff
+    # In gimbal lock only the sum (middle = 0) or difference (middle = pi) of first and third is determined;
+    # the angle that ends up last is set to zero.
+    gimbal_epsilon = tolerance(GIMBAL_EPSILON)
+    at_zero = np.abs(middle) <= gimbal_epsilon
+    at_pi = np.abs(middle - np.pi) <= gimbal_epsilon
+    locked = at_zero | at_pi
+    if extrinsic:
+        first = np.where(at_zero, 2 * half_sum, np.where(at_pi, -2 * half_diff, first))
+        third = np.where(locked, 0.0, third)
+    else:
+        first = np.where(locked, 0.0, first)
+        third = np.where(at_zero, 2 * half_sum, np.where(at_pi, 2 * half_diff, third))
+    if not proper:
+        third = sign * third
+        middle = middle - np.pi / 2
+    angles = np.stack((first, middle, third), axis=-1)
+    if not extrinsic:
+        angles = angles[..., ::-1]
+    angles[..., 0::2] = (angles[..., 0::2] + np.pi) % (2 * np.pi) - np.pi
+    return angles
+
+
+def euler_to_matrices(angles, seq):
+    return quats_to_matrices(euler_to_quats(angles, seq))
+
+
+def matrices_to_euler(m, seq):
+    return quats_to_euler(matrices_to_quats(m), seq)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from quat_array import QuatArray
+from rot3_array import (EULER_SEQUENCES, axis_angles_to_quats, euler_to_matrices, euler_to_quats, matrices_to_euler,
+                        matrices_to_quats, quats_to_axis_angles, quats_to_euler, quats_to_matrices)
+
+
+def axis_matrix(axis, angle):
+    c, s = np.cos(angle), np.sin(angle)
+    m = np.eye(3)
+    i, j = [n for n in range(3) if n != axis]
+    m[i, i], m[i, j], m[j, i], m[j, j] = c, -s, s, c
+    if axis == 1:
+        m = m.T  # Keep the right-handed sense about y
+    return m
+
+
+class Rot3ArrayTest(unittest.TestCase):
+    def setUp(self):
+        q = np.random.default_rng(1).normal(0, 1, (100, 4))
+        q /= np.linalg.norm(q, axis=1)[:, np.newaxis]
+        self.quats = np.where(q[:, :1] < 0, -q, q)
+
+    def assert_same_rotations(self, a, b):
+        # q and -q are the same rotation
+        self.assertTrue(np.allclose(1.0, np.abs(np.einsum('ij,ij->i', a, b))))
+
+    def test_matrices(self):
+        matrices = quats_to_matrices(self.quats)
+        self.assertTrue(np.allclose(np.eye(3), matrices @ matrices.transpose(0, 2, 1)))
+        self.assertTrue(np.allclose(1.0, np.linalg.det(matrices)))
+        self.assertTrue(np.allclose(self.quats, matrices_to_quats(matrices).data))
+        # Non-unit quaternions give the same rotation
+        self.assertTrue(np.allclose(matrices, quats_to_matrices(QuatArray(3.0 * self.quats))))
+
+    def test_matrices_near_half_turn(self):
+        # Where the trace is near -1, Shepperd's method switches to the diagonal entries.
+        axes = np.random.default_rng(2).normal(0, 1, (50, 3))
+        quats = axis_angles_to_quats(axes, np.pi - 1e-12).data
+        self.assert_same_rotations(quats, matrices_to_quats(quats_to_matrices(quats)).data)
+
+    def test_axis_angles(self):
+        axes, angles = quats_to_axis_angles(self.quats)
+        self.assertTrue(np.all((0 <= angles) & (angles <= np.pi)))
+        self.assertTrue(np.allclose(self.quats, axis_angles_to_quats(axes, angles).data))
+        axes, angles = quats_to_axis_angles(np.array([[1.0, 0.0, 0.0, 0.0]]))
+        self.assertTrue(np.array_equal([[1.0, 0.0, 0.0]], axes))
+        self.assertEqual(0.0, angles[0])
+
+    def test_euler_matrices(self):
+        angles = np.array([0.3, -0.7, 1.9])
+        for seq in EULER_SEQUENCES:
+            axes = ['xyz'.index(axis) for axis in seq]
+            rotations = [axis_matrix(axis, angle) for axis, angle in zip(axes, angles)]
+            extrinsic = rotations[2] @ rotations[1] @ rotations[0]
+            intrinsic = rotations[0] @ rotations[1] @ rotations[2]
+            self.assertTrue(np.allclose(extrinsic, euler_to_matrices(angles, seq)), seq)
+            self.assertTrue(np.allclose(intrinsic, euler_to_matrices(angles, seq.upper())), seq)
+
+    def test_euler_round_trip(self):
+        for seq in EULER_SEQUENCES + tuple(seq.upper() for seq in EULER_SEQUENCES):
+            angles = quats_to_euler(self.quats, seq)
+            self.assertTrue(np.allclose(self.quats, euler_to_quats(angles, seq).data), seq)
+            middle = angles[:, 1]
+            if seq[0].lower() == seq[2].lower():
+                self.assertTrue(np.all((0 <= middle) & (middle <= np.pi)))
+            else:
+                self.assertTrue(np.all(np.abs(middle) <= np.pi / 2))
+            self.assertTrue(np.allclose(angles, matrices_to_euler(quats_to_matrices(self.quats), seq)), seq)
+
+    def test_gimbal_lock(self):
+        rng = np.random.default_rng(3)
+        for seq in EULER_SEQUENCES + tuple(seq.upper() for seq in EULER_SEQUENCES):
+            proper = seq[0].lower() == seq[2].lower()
+            for middle in ((0.0, np.pi) if proper else (np.pi / 2, -np.pi / 2)):
+                angles = np.stack((rng.uniform(-3, 3, 10), np.full(10, middle), rng.uniform(-3, 3, 10)), axis=1)
+                quats = euler_to_quats(angles, seq).data
+                recovered = quats_to_euler(quats, seq)
+                self.assertTrue(np.allclose(0.0, recovered[:, 2]), seq)
+                self.assert_same_rotations(quats, euler_to_quats(recovered, seq).data)
+
+    def test_bad_sequence(self):
+        for seq in ('xxy', 'xYz', 'abc'):
+            with self.assertRaises(ValueError):
+                euler_to_quats(np.zeros(3), seq)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,9 @@
 import unittest
 
 from math import pi
+from unittest.mock import patch
+
+import numpy as np
 
 from quat import Quat
 from rot3 import Rot3
@@ -12,7 +15,21 @@ from vec3 import Vec3, XHAT, YHAT, ZHAT
 
 class Rot3Test(unittest.TestCase):
     def test_constructors(self):
-        pass
+        axis = Vec3(1.0, -4.0, 9.0)
+        expected = Rot3(axis, pi / 3)
+        for actual in (Rot3(pi / 3, axis), Rot3.from_axis_angle(axis, pi / 3), Rot3.from_quat(expected.quat)):
+            self.assertTrue(eq_approx(expected.quat, actual.quat))
+
+    def test_conversions(self):
+        rot = Rot3(Vec3(1.0, -4.0, 9.0), pi / 3)
+        axis, angle = rot.axis_angle()
+        self.assertTrue(eq_approx(Vec3(1.0, -4.0, 9.0).normalized(), axis))
+        self.assertTrue(eq_approx(pi / 3, angle))
+        self.assertTrue(eq_approx(rot.quat, Rot3.from_matrix(rot.matrix()).quat))
+        for seq in ('xyz', 'ZYX', 'zxz'):
+            self.assertTrue(eq_approx(rot.quat, Rot3.from_euler(rot.euler(seq), seq).quat))
+        # Intrinsic x, then y, then z is extrinsic z, then y, then x.
+        self.assertTrue(eq_approx(Rot3.from_euler((0.1, 0.2, 0.3), 'XYZ').quat, Rot3.from_euler((0.3, 0.2, 0.1), 'zyx').quat))
 
     def test_noncommutativity(self):
         axis1 = Vec3(1.0, -4.0, 9.0)
@@ -58,7 +75,36 @@ class Rot3Test(unittest.TestCase):
         self.assertTrue(eq_approx(vec, zvec))
 
     def test_rotate(self):
-        pass
+        rot = Rot3(Vec3(1.0, -4.0, 9.0), pi / 3)
+        vec = Vec3(1.0, 2.0, 3.0)
+        q = rot.quat
+        expected = (q * Quat(vec) * q.inverse()).as_vec3()
+        self.assertTrue(eq_approx(expected, rot(vec)))
+
+        # Rotation by a non-unit quaternion is the same as by its normalization.
+        scaled = Rot3.from_quat(3.0 * q)
+        self.assertTrue(eq_approx(expected, scaled(vec)))
+
+    def test_rotate_many(self):
+        rot = Rot3(Vec3(1.0, -4.0, 9.0), pi / 3)
+        vecs = [Vec3(1.0, 2.0, 3.0), XHAT, YHAT, ZHAT, Vec3(-2.0, 0.5, 0.0)]
+        expected = [rot(v) for v in vecs]
+        actual = rot.rotate_many(vecs)
+        self.assertEqual(len(expected), len(actual))
+        for e, a in zip(expected, actual):
+            self.assertTrue(eq_approx(e, a))
+
+        array = np.array([(v.x, v.y, v.z) for v in vecs])
+        self.assertTrue(np.allclose(np.array([(v.x, v.y, v.z) for v in expected]), rot.rotate_many(array)))
+        # Lists take the matrix path too, on every backend.
+        with patch.object(Rot3, 'rotate', side_effect=AssertionError):
+            self.assertTrue(eq_approx(expected[0], rot.rotate_many(vecs)[0]))
+
+    def test_rotate_many_cache(self):
+        rot = Rot3(ZHAT, pi / 2)
+        self.assertTrue(eq_approx(YHAT, rot.rotate_many([XHAT])[0]))
+        rot.quat = Rot3(XHAT, pi / 2).quat
+        self.assertTrue(eq_approx(ZHAT, rot.rotate_many([YHAT])[0]))
 
 
 if __name__ == '__main__':
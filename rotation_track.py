@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+
+"""Keyframed rotations, compiled once for fast sampling.
+
+A RotationTrack takes sorted key times and unit quaternions (Quats, Rot3s
+or a QuatArray). It precomputes everything that depends only on the keys:
+each segment's angle and slerp denominators, and for 'squad' interpolation
+the inner control points (tangents) at each key. A single sample finds
+its segment in O(1) through a lookup table over uniform time cells, and
+sample_many evaluates many times at once with numpy.
+
+Keys are chained so that each is on the same side of the 4D sphere as
+the one before it, so every segment takes the short way round.
+Times before the first key or after the last are clamped.
+"""
+
+from bisect import bisect_right
+from math import atan2, floor, sin, sqrt
+
+import numpy as np
+
+from quat import SLERP_EPSILON, Quat
+from quat_array import QuatArray, exp, hamilton_product, log
+from rot3 import Rot3
+
+
+INTERPOLATIONS = ('slerp', 'squad')
+LOOKUP_CELLS_PER_KEY = 2  # Lookup table cells per key; more cells, fewer segments per cell
+
+
+def _key_array(quats):
+    if isinstance(quats, QuatArray):
+        return quats.data.copy()
+    if isinstance(quats, np.ndarray):
+        return np.array(quats, dtype=np.float64).reshape(-1, 4)
+    return np.array([(q.qr, q.qi, q.qj, q.qk) for q in (r.quat if isinstance(r, Rot3) else r for r in quats)],
+                    dtype=np.float64).reshape(-1, 4)
+
+
+def _conjugate(q):
+    return q * np.array((1.0, -1.0, -1.0, -1.0))
+
+
+def _slerp_weights(a, b):
+    """Per-pair angle and whether it is large enough for the slerp formula, for (K, 4) unit a and b."""
+    omega = 2 * np.arctan2(np.linalg.norm(a - b, axis=-1), np.linalg.norm(a + b, axis=-1))
+    return omega, np.sin(omega) >= SLERP_EPSILON
+
+
+def _slerp_rows(a, b, omega, regular, u):
+    """Slerp between rows of a and b at parameters u, given each pair's angle; nearly parallel pairs use lerp."""
+    sin_omega = np.where(regular, np.sin(omega), 1.0)
+    ca = np.where(regular, np.sin((1 - u) * omega) / sin_omega, 1 - u)
+    cb = np.where(regular, np.sin(u * omega) / sin_omega, u)
+    result = ca[:, np.newaxis] * a + cb[:, np.newaxis] * b
+    return result / np.linalg.norm(result, axis=-1)[:, np.newaxis]
+
+
+def _slerp4(a, b, omega, regular, u):
+    """Scalar slerp between 4-tuples a and b, given their angle."""
+    if regular:
+        s = sin(omega)
+        ca = sin((1 - u) * omega) / s
+        cb = sin(u * omega) / s
+    else:
+        ca, cb = 1 - u, u
+    r = (ca * a[0] + cb * b[0], ca * a[1] + cb * b[1], ca * a[2] + cb * b[2], ca * a[3] + cb * b[3])
+    n = sqrt(r[0] * r[0] + r[1] * r[1] + r[2] * r[2] + r[3] * r[3])
+    return (r[0] / n, r[1] / n, r[2] / n, r[3] / n)
+
+
+def _angle4(a, b):
+    d = [a[k] - b[k] for k in range(4)]
+    s = [a[k] + b[k] for k in range(4)]
+    return 2 * atan2(sqrt(sum(x * x for x in d)), sqrt(sum(x * x for x in s)))
+
+
+class RotationTrack:
+    def __init__(self, times, quats, interpolation='slerp'):
+        """times is a strictly increasing sequence of key times; quats the rotation at each,
+        as Quats, Rot3s, a QuatArray or a (K, 4) array. interpolation is one of INTERPOLATIONS."""
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f'Unknown interpolation: {interpolation}')
+        times = np.array(times, dtype=np.float64)
+        keys = _key_array(quats)
+        if len(times) == 0 or len(times) != len(keys):
+            raise ValueError('Expected one or more keys, with one time per key')
+        if np.any(np.diff(times) <= 0):
+            raise ValueError('Key times must be strictly increasing')
+        keys /= np.linalg.norm(keys, axis=1)[:, np.newaxis]
+        flips = np.cumsum(np.einsum('ij,ij->i', keys[1:], keys[:-1]) < 0) % 2  # Sign changes accumulate
+        keys[1:][flips == 1] *= -1
+
+        self.interpolation = interpolation
+        self.times = times
+        self.keys = keys
+        self.durations = np.diff(times)
+        self.omegas, self.regular = _slerp_weights(keys[:-1], keys[1:])
+        if interpolation == 'squad':
+            self.tangents = self._squad_tangents(keys, self.durations)
+            self.tangent_omegas, self.tangent_regular = _slerp_weights(self.tangents[:-1], self.tangents[1:])
+        self._build_lookup()
+
+        # Python copies of the per-key data, for sample, which would spend most of its time indexing arrays.
+        self._times = times.tolist()
+        self._keys = [tuple(q) for q in keys.tolist()]
+        self._omegas = self.omegas.tolist()
+        self._regular = self.regular.tolist()
+        if interpolation == 'squad':
+            self._tangents = [tuple(q) for q in self.tangents.tolist()]
+            self._tangent_omegas = self.tangent_omegas.tolist()
+            self._tangent_regular = self.tangent_regular.tolist()
+
+    @staticmethod
+    def _squad_tangents(keys, durations):
+        """s_i = q_i exp(-(d_i log(q_i^-1 q_(i-1)) + d_(i-1) log(q_i^-1 q_(i+1))) / (2 (d_(i-1) + d_i))),
+        with s_i = q_i at the ends, where d_i is the duration of segment i. With equal durations
+        this is Shoemake's s_i = q_i exp(-(log(q_i^-1 q_(i+1)) + log(q_i^-1 q_(i-1))) / 4); weighting
+        by duration keeps the angular velocity, not just the derivative in u, continuous at each key."""
+        tangents = keys.copy()
+        if len(keys) > 2:
+            inner = keys[1:-1]
+            inverse = _conjugate(inner)
+            before, after = durations[:-1, np.newaxis], durations[1:, np.newaxis]
+            logs = (after * log(hamilton_product(inverse, keys[:-2])).data
+                    + before * log(hamilton_product(inverse, keys[2:])).data) / (2 * (before + after))
+            tangents[1:-1] = hamilton_product(inner, exp(-logs).data)
+            # Keep each tangent on its key's side of the sphere, so the outer slerps are short too.
+            tangents[1:-1] *= np.sign(np.einsum('ij,ij->i', tangents[1:-1], inner))[:, np.newaxis]
+        return tangents
+
+    def _build_lookup(self):
+        """For each of a uniform grid of time cells, the segments that overlap it."""
+        segment_count = len(self.durations)
+        self._cell_count = max(1, LOOKUP_CELLS_PER_KEY * segment_count)
+        span = self.times[-1] - self.times[0]
+        self._cell_width = span / self._cell_count if span > 0 else 1.0
+        edges = self.times[0] + self._cell_width * np.arange(self._cell_count + 1)
+        first = np.clip(np.searchsorted(self.times, edges[:-1], side='right') - 1, 0, max(segment_count - 1, 0))
+        last = np.clip(np.searchsorted(self.times, edges[1:], side='left') - 1, 0, max(segment_count - 1, 0))
+        self._cell_first = first.tolist()
+        self._cell_last = last.tolist()
+
+    def segment(self, t):
+        """Return the index of the segment containing time t (clamped to the track)."""
+        times = self._times
+        if len(times) < 2 or t <= times[0]:
+            return 0
+        if t >= times[-1]:
+            return len(times) - 2
+        cell = min(int(floor((t - times[0]) / self._cell_width)), self._cell_count - 1)
+        lo, hi = self._cell_first[cell], self._cell_last[cell]
+        if lo == hi:
+            return lo
+        return min(max(bisect_right(times, t, lo, hi + 2) - 1, lo), hi)
+
+    def sample(self, t):
+        """Return the rotation at time t as a unit Quat."""
+        if len(self._times) < 2:
+            return Quat.from_wxyz(*self._keys[0])
+        i = self.segment(t)
+        t0, t1 = self._times[i], self._times[i + 1]
+        u = min(max((t - t0) / (t1 - t0), 0.0), 1.0)
+        q = _slerp4(self._keys[i], self._keys[i + 1], self._omegas[i], self._regular[i], u)
+        if self.interpolation == 'squad':
+            s = _slerp4(self._tangents[i], self._tangents[i + 1], self._tangent_omegas[i], self._tangent_regular[i], u)
+            omega = _angle4(q, s)
+            q = _slerp4(q, s, omega, sin(omega) >= SLERP_EPSILON, 2 * u * (1 - u))
+        return Quat.from_wxyz(*q)
+
+    def sample_many(self, ts):
+        """Return the rotations at each of the times in ts as a QuatArray."""
+        ts = np.asarray(ts, dtype=np.float64).reshape(-1)
+        if len(self.times) < 2:
+            return QuatArray(np.repeat(self.keys, len(ts), axis=0))
+        i = np.clip(np.searchsorted(self.times, ts, side='right') - 1, 0, len(self.durations) - 1)
+        u = np.clip((ts - self.times[i]) / self.durations[i], 0.0, 1.0)
+        q = _slerp_rows(self.keys[i], self.keys[i + 1], self.omegas[i], self.regular[i], u)
+        if self.interpolation == 'squad':
+            s = _slerp_rows(self.tangents[i], self.tangents[i + 1], self.tangent_omegas[i], self.tangent_regular[i], u)
+            omega, regular = _slerp_weights(q, s)
+            q = _slerp_rows(q, s, omega, regular, 2 * u * (1 - u))
+        return QuatArray(q)
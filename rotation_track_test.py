@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from quat import qslerp
+from quat_array import QuatArray
+from rot3 import Rot3
+from rotation_track import RotationTrack
+
+
+class RotationTrackTest(unittest.TestCase):
+    def setUp(self):
+        self.times = np.array([0.0, 0.5, 2.0, 2.1, 4.0, 7.5])
+        q = np.random.default_rng(2).normal(0, 1, (len(self.times), 4))
+        self.quats = q / np.linalg.norm(q, axis=1)[:, np.newaxis]
+
+    def assert_same_rotation(self, a, b, tolerance=1e-9):
+        # q and -q are the same rotation
+        self.assertAlmostEqual(1.0, abs(a.qr * b.qr + a.qi * b.qi + a.qj * b.qj + a.qk * b.qk), delta=tolerance)
+
+    def test_keys(self):
+        for interpolation in ('slerp', 'squad'):
+            track = RotationTrack(self.times, self.quats, interpolation)
+            for t, q in zip(self.times, QuatArray(self.quats)):
+                self.assert_same_rotation(q, track.sample(t))
+
+    def test_clamping(self):
+        track = RotationTrack(self.times, self.quats)
+        self.assert_same_rotation(QuatArray(self.quats)[0], track.sample(-3.0))
+        self.assert_same_rotation(QuatArray(self.quats)[-1], track.sample(100.0))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            RotationTrack([0.0, 1.0, 1.0], self.quats[:3])
+        with self.assertRaises(ValueError):
+            RotationTrack([0.0, 1.0], self.quats[:3])
+        with self.assertRaises(ValueError):
+            RotationTrack(self.times, self.quats, 'cubic')
+
+    def test_keyframe_types(self):
+        quats = QuatArray(self.quats).to_quats()
+        expected = RotationTrack(self.times, self.quats).sample(1.0)
+        self.assert_same_rotation(expected, RotationTrack(self.times, quats).sample(1.0))
+        self.assert_same_rotation(expected, RotationTrack(self.times, [Rot3.from_quat(q) for q in quats]).sample(1.0))
+
+    def test_segment(self):
+        track = RotationTrack(self.times, self.quats)
+        for t in np.linspace(-1.0, 8.0, 200):
+            expected = min(max(np.searchsorted(self.times, t, side='right') - 1, 0), len(self.times) - 2)
+            self.assertEqual(expected, track.segment(t))
+
+    def test_sample_many(self):
+        ts = np.linspace(-1.0, 8.0, 500)
+        for interpolation in ('slerp', 'squad'):
+            track = RotationTrack(self.times, self.quats, interpolation)
+            for t, q in zip(ts, track.sample_many(ts)):
+                self.assert_same_rotation(track.sample(t), q)
+
+    def test_single_key(self):
+        track = RotationTrack([1.0], self.quats[:1])
+        self.assert_same_rotation(QuatArray(self.quats)[0], track.sample(5.0))
+        self.assertEqual(3, len(track.sample_many([0.0, 1.0, 2.0])))
+
+    def test_slerp(self):
+        track = RotationTrack(self.times, self.quats)
+        a, b = QuatArray(self.quats)[2], QuatArray(self.quats)[3]
+        if a.qr * b.qr + a.qi * b.qi + a.qj * b.qj + a.qk * b.qk < 0:
+            b = -b
+        self.assert_same_rotation(qslerp(a, b, 0.25), track.sample(2.025))
+
+    def test_squad_smooth(self):
+        # Unlike slerp, squad's angular velocity is continuous across keys.
+        def velocity_jump(track, t, h=1e-6):
+            before, at, after = track.sample_many([t - h, t, t + h])
+            return ((at.conjugate() * after).as_vec3() + (at.conjugate() * before).as_vec3()).norm() / h
+
+        slerp = RotationTrack(self.times, self.quats, 'slerp')
+        squad = RotationTrack(self.times, self.quats, 'squad')
+        for t in self.times[1:-1]:
+            self.assertLess(velocity_jump(squad, t), 1e-3)
+            self.assertGreater(velocity_jump(slerp, t), 1e-2)
+
+    def test_unit_results(self):
+        track = RotationTrack(self.times, 3 * self.quats, 'squad')
+        self.assertTrue(np.allclose(1.0, track.sample_many(np.linspace(0, 7.5, 50)).norm()))
+        self.assertAlmostEqual(1.0, track.sample(3.0).norm())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+"""Stabilize many independent SphereSprings problems at once.
+
+The problems are held as one (B, N, 3) array, and each iteration advances
+all of them with the same vectorized kernels, so the Python overhead is
+paid once per iteration rather than once per problem. Problems with
+fewer than N points are padded, and padding takes no part in the forces.
+Each problem stops on its own, under the stopping conditions of
+SphereSprings, after which it is left out of the computation.
+"""
+
+import numpy as np
+
+from backend import float_dtype, tolerance
+from sphere_kernels import DEFAULT_KERNEL, pair_weights, weighted_forces
+from sphere_springs import (STOP_FORCE_THRESHOLD, STOP_MAX_ITER_COUNT, STOP_MOVEMENT_THRESHOLD, SphereSprings,
+                            new_point_locations)
+
+
+BLOCK_ELEMENTS = 1 << 18  # Pairwise temporaries are computed for this many (problem, pair) entries at a time
+
+
+def batch_net_forces(alpha, points, counts=None, kernel=DEFAULT_KERNEL):
+    """Net forces for a (B, N, 3) stack of problems, as net_forces_array computes for each one.
+    If counts is given, only the first counts[b] points of problem b take part, and the forces on the rest are zero."""
+    batch_count, points_count, _ = points.shape
+    valid = None
+    if counts is not None and np.any(np.asarray(counts) < points_count):
+        valid = np.arange(points_count)[np.newaxis, :] < np.asarray(counts)[:, np.newaxis]
+    norm2s = np.einsum('bij,bij->bi', points, points)
+    net_forces = np.empty_like(points)
+    step = max(1, BLOCK_ELEMENTS // max(points_count * points_count, 1))
+    diagonal = np.arange(points_count)
+    for start in range(0, batch_count, step):
+        stop = min(start + step, batch_count)
+        block, block_norm2s = points[start:stop], norm2s[start:stop]
+        dots = block @ block.transpose(0, 2, 1)
+        _, weights = pair_weights(kernel, alpha, dots, block_norm2s, block_norm2s)
+        weights[:, diagonal, diagonal] = 0.0
+        if valid is not None:
+            # Padding points coincide, so their weights may be infinite; assign rather than multiply by zero.
+            weights[~(valid[start:stop, :, np.newaxis] & valid[start:stop, np.newaxis, :])] = 0.0
+        net_forces[start:stop] = weighted_forces(kernel, weights, dots, block, block, block_norm2s, block_norm2s)
+    net_forces -= np.einsum('bij,bij->bi', net_forces, points)[:, :, np.newaxis] * points
+    return net_forces
+
+
+class BatchSphereSprings:
+    """A stack of SphereSprings problems, stabilized together. Settings are read from SphereSprings."""
+
+    def __init__(self, points, counts=None):
+        """points is a (B, N, 3) array; counts, if given, holds the number of points in each problem,
+        which occupy the first counts[b] rows of points[b]."""
+        self.points = np.array(points, dtype=float_dtype())
+        if self.points.ndim != 3 or self.points.shape[2] != 3:
+            raise ValueError(f'Expected points of shape (B, N, 3), got {self.points.shape}')
+        batch_count, points_count, _ = self.points.shape
+        self.counts = np.full(batch_count, points_count) if counts is None else np.asarray(counts, dtype=np.int64)
+        if self.counts.shape != (batch_count,) or np.any((self.counts < 0) | (self.counts > points_count)):
+            raise ValueError('Expected one count per problem, each at most N')
+        padding = np.arange(points_count)[np.newaxis, :] >= self.counts[:, np.newaxis]
+        self.points[padding] = (1.0, 0.0, 0.0)
+        self.iter_counts = np.zeros(batch_count, dtype=np.int64)
+        self.stop_conditions = [None] * batch_count
+
+    @classmethod
+    def from_point_sets(cls, point_sets):
+        """Stack (N_b, 3) arrays of different sizes, padding each to the largest."""
+        counts = [len(points) for points in point_sets]
+        stacked = np.zeros((len(point_sets), max(counts, default=0), 3))
+        for b, points in enumerate(point_sets):
+            stacked[b, :len(points)] = points
+        return cls(stacked, counts)
+
+    def point_sets(self):
+        """Return each problem's points as an (N_b, 3) array, without padding."""
+        return [self.points[b, :count] for b, count in enumerate(self.counts)]
+
+    def stabilize(self):
+        """Relax every problem until it meets one of the stopping conditions, recorded in
+        self.iter_counts and self.stop_conditions."""
+        alpha = SphereSprings.alpha
+        kernel = SphereSprings.kernel
+        # The kernel's fixed step depends on the number of points, so each problem has its own.
+        fixed_steps = [kernel.fixed_step(alpha, count) for count in self.counts]
+        steps, max_angles = np.array(fixed_steps, dtype=self.points.dtype).reshape(-1, 2).T
+        active = np.arange(len(self.points))
+        iter_count = 0
+        while len(active) > 0:
+            if iter_count >= SphereSprings.max_iter_count:
+                self._stop(active, iter_count, STOP_MAX_ITER_COUNT)
+                return
+
+            points = self.points[active]
+            counts = self.counts[active]
+            net_forces = batch_net_forces(alpha, points, counts, kernel)
+            max_forces = np.sqrt(np.einsum('bij,bij->bi', net_forces, net_forces)).max(axis=1, initial=0.0)
+            settled = max_forces < tolerance(SphereSprings.force_threshold)
+            self._stop(active[settled], iter_count, STOP_FORCE_THRESHOLD)
+
+            moving = ~settled
+            points, net_forces = points[moving], net_forces[moving]
+            point_steps, point_max_angles = (np.repeat(values[active[moving]], points.shape[1])
+                                             for values in (steps, max_angles))
+            new_points = new_point_locations(point_steps, points.reshape(-1, 3), net_forces.reshape(-1, 3),
+                                             point_max_angles).reshape(points.shape)
+            sum_movements = np.linalg.norm(points - new_points, axis=2).sum(axis=1)
+            still = sum_movements < tolerance(SphereSprings.movement_threshold)
+            self._stop(active[moving][still], iter_count, STOP_MOVEMENT_THRESHOLD)
+
+            active = active[moving][~still]
+            self.points[active] = new_points[~still]
+            iter_count += 1
+
+    def _stop(self, problems, iter_count, stop_condition):
+        self.iter_counts[problems] = iter_count
+        for b in problems:
+            self.stop_conditions[b] = stop_condition
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_batch import BatchSphereSprings, batch_net_forces
+from sphere_init import random_points
+from sphere_springs import STOP_MAX_ITER_COUNT, SphereSprings, array_to_points, net_forces_array, points_to_array
+
+
+class SphereBatchTest(unittest.TestCase):
+    def test_net_forces(self):
+        point_sets = [random_points(points_count, seed) for seed, points_count in enumerate((5, 9, 1, 0, 9))]
+        batch = BatchSphereSprings.from_point_sets(point_sets)
+        with patch('sphere_batch.BLOCK_ELEMENTS', 100):  # Several problems per block, and blocks of one
+            net_forces = batch_net_forces(0.25, batch.points, batch.counts)
+        for b, points in enumerate(point_sets):
+            self.assertTrue(np.allclose(net_forces_array(0.25, points), net_forces[b, :len(points)]))
+            self.assertTrue(np.all(net_forces[b, len(points):] == 0.0))
+
+    def test_matches_sphere_springs(self):
+        # The relaxation is chaotic over long runs, so compare a short one.
+        point_sets = [random_points(points_count, seed) for seed, points_count in enumerate((12, 30, 3, 20))]
+        with patch.object(SphereSprings, 'max_iter_count', 10):
+            batch = BatchSphereSprings.from_point_sets(point_sets)
+            batch.stabilize()
+            for b, points in enumerate(point_sets):
+                springs = SphereSprings(array_to_points(points), engine='numpy')
+                springs.stabilize()
+                self.assertTrue(np.allclose(points_to_array(springs.points), batch.point_sets()[b]))
+                self.assertEqual(springs.iter_count, batch.iter_counts[b])
+                self.assertEqual(springs.stop_condition, batch.stop_conditions[b])
+
+    def test_stop_conditions(self):
+        # Two antipodal points feel no tangential force, and stop at once; the random problem does not.
+        point_sets = [np.array([(0.0, 0.0, 1.0), (0.0, 0.0, -1.0)]), random_points(10, 4)]
+        batch = BatchSphereSprings.from_point_sets(point_sets)
+        with patch.object(SphereSprings, 'max_iter_count', 5):
+            batch.stabilize()
+        self.assertEqual([0, 5], list(batch.iter_counts))
+        self.assertEqual(STOP_MAX_ITER_COUNT, batch.stop_conditions[1])
+        self.assertNotEqual(STOP_MAX_ITER_COUNT, batch.stop_conditions[0])
+
+    def test_bad_shapes(self):
+        with self.assertRaises(ValueError):
+            BatchSphereSprings(np.zeros((4, 3)))
+        with self.assertRaises(ValueError):
+            BatchSphereSprings(np.zeros((2, 4, 3)), counts=[4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
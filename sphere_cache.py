@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""An on-disk cache of stabilized SphereSprings configurations.
+
+Each entry is one file, named by the SHA-256 key of the run's parameters
+and initial points, holding a 48-byte header (magic number, N, iteration
+count, stop condition and a CRC-32 of the rest of the file) followed by
+the final points as little-endian float64s. Entries are written
+atomically, checked on load (a damaged entry is deleted and treated as
+a miss), and evicted least recently used first, by modification time,
+once the directory holds more than max_bytes of entries.
+
+    SphereSprings.cache = ResultCache('~/.cache/sphere_springs')
+    springs.stabilize()  # Returns the cached result if this run has been done before
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+
+
+MAGIC = b'SPHCACH1'
+HEADER = struct.Struct('<8sQQ20sI')  # Magic, N, iteration count, stop condition (ASCII), CRC-32
+POINTS_DTYPE = np.dtype('<f8')
+SUFFIX = '.sphc'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ResultCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(params, points):
+        """Return the key for a run with the given JSON-serializable params from the given (N, 3) initial points."""
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+        digest.update(np.ascontiguousarray(points, dtype=POINTS_DTYPE).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key):
+        """Return (points, iter_count, stop_condition) stored under key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        result = _decode(data)
+        if result is None:
+            os.remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)  # Mark as recently used
+        self.hits += 1
+        return result
+
+    def put(self, key, points, iter_count, stop_condition):
+        """Store a result under key, then evict entries until the cache fits in max_bytes."""
+        data = _encode(points, iter_count, stop_condition)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the total size is at most max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                os.remove(entry.path)
+
+
+def _encode(points, iter_count, stop_condition):
+    points = np.ascontiguousarray(points, dtype=POINTS_DTYPE).reshape(-1, 3)
+    payload = points.tobytes()
+    stop = (stop_condition or '').encode('ascii')
+    crc = zlib.crc32(payload, zlib.crc32(HEADER.pack(MAGIC, len(points), iter_count, stop, 0)))
+    return HEADER.pack(MAGIC, len(points), iter_count, stop, crc) + payload
+
+
+def _decode(data):
+    """Return (points, iter_count, stop_condition) from an entry's bytes, or None if they are damaged."""
+    if len(data) < HEADER.size:
+        return None
+    magic, points_count, iter_count, stop, crc = HEADER.unpack_from(data)
+    payload = data[HEADER.size:]
+    if magic != MAGIC or len(payload) != points_count * 3 * POINTS_DTYPE.itemsize:
+        return None
+    if zlib.crc32(payload, zlib.crc32(HEADER.pack(magic, points_count, iter_count, stop, 0))) != crc:
+        return None
+    points = np.frombuffer(payload, dtype=POINTS_DTYPE).reshape(points_count, 3)
+    return points, iter_count, stop.rstrip(b'\0').decode('ascii') or None
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_cache import HEADER, ResultCache
+from sphere_solvers import AdaptiveStepSolver
+from sphere_springs import STOP_MAX_ITER_COUNT, SphereSprings, array_to_points, points_to_array
+
+
+class SphereCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        points = np.random.default_rng(1).normal(0, 1, (10, 3))
+        key = ResultCache.key({'alpha': 0.25}, points)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, points, 7, STOP_MAX_ITER_COUNT)
+        cached_points, iter_count, stop_condition = self.cache.get(key)
+        self.assertTrue(np.array_equal(points, cached_points))
+        self.assertEqual((7, STOP_MAX_ITER_COUNT), (iter_count, stop_condition))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertNotEqual(key, ResultCache.key({'alpha': 0.5}, points))
+        self.assertNotEqual(key, ResultCache.key({'alpha': 0.25}, points[:-1]))
+
+    def test_damaged_entry(self):
+        points = np.ones((4, 3))
+        key = ResultCache.key({}, points)
+        self.cache.put(key, points, 1, None)
+        path = os.path.join(self.directory.name, key + '.sphc')
+        with open(path, 'r+b') as f:
+            f.seek(HEADER.size + 5)
+            f.write(b'\xff')
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(os.path.exists(path))
+
+    def test_eviction(self):
+        entry_size = HEADER.size + 10 * 3 * 8
+        cache = ResultCache(self.directory.name, max_bytes=3 * entry_size)
+        keys = [str(k) for k in range(4)]
+        for k, key in enumerate(keys[:3]):
+            cache.put(key, np.zeros((10, 3)), k, None)
+            os.utime(os.path.join(self.directory.name, key + '.sphc'), ns=(k * 10 ** 9, k * 10 ** 9))
+        self.assertIsNotNone(cache.get(keys[0]))  # Now the most recently used
+        cache.put(keys[3], np.zeros((10, 3)), 3, None)
+        self.assertIsNone(cache.get(keys[1]))
+        for key in (keys[0], keys[2], keys[3]):
+            self.assertIsNotNone(cache.get(key))
+
+    def test_stabilize(self):
+        points = array_to_points(np.random.default_rng(2).normal(0, 1, (12, 3)))
+        with patch.object(SphereSprings, 'max_iter_count', 5):
+            first = SphereSprings(list(points), engine='numpy')
+            first.cache = self.cache
+            first.stabilize()
+            records = []
+            second = SphereSprings(list(points), engine='numpy', observer=records.append)
+            second.cache = self.cache
+            second.stabilize()
+            self.assertEqual([], records)
+            self.assertEqual(1, self.cache.hits)
+            self.assertTrue(np.array_equal(points_to_array(first.points), points_to_array(second.points)))
+            self.assertEqual((first.iter_count, first.stop_condition), (second.iter_count, second.stop_condition))
+            # Different settings make a different key.
+            third = SphereSprings(list(points), engine='numpy', solver=AdaptiveStepSolver(grow=2.0))
+            third.cache = self.cache
+            third.stabilize()
+            self.assertEqual(1, self.cache.hits)
+
+
+if __name__ == '__main__':
+    unittest.main()
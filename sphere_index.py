@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+
+"""Approximate O(N log N) force evaluation for SphereSprings, Barnes-Hut style.
+
+The sphere is divided into cells by projecting a cube onto it, with each
+face split into a 2^level by 2^level grid (an equal-angle cube-sphere),
+and every level down to the leaves forms a quadtree. For each leaf cell,
+the other cells are classified once, from the geometry alone:
+
+  - far cells, whose angular radius is small compared to their angular
+    distance from the leaf (and from its antipode, near which the force
+    direction changes quickly), act as one pseudo-point at the centroid
+    direction of their points, weighted by the number of points;
+  - near leaf cells contribute exactly, pair by pair.
+
+The opening_angle parameter sets the accuracy: a cell is far when its
+radius is less than opening_angle times its distance, so 0 is exact.
+Because the classification depends only on geometry, it is computed once;
+each iteration only re-bins the points and re-sums the cells, which is
+O(N log N) and cheaper still when the points have moved only slightly.
+"""
+
+from math import pi
+
+import numpy as np
+
+from sphere_kernels import DEFAULT_KERNEL
+
+
+DEFAULT_OPENING_ANGLE = 0.3
+DEFAULT_LEAF_SIZE = 8  # Target mean points per leaf cell
+MAX_LEVEL = 9
+PAIR_CHUNK_SIZE = 1 << 20  # Point pairs evaluated per vectorized block
+
+
+def level_for(points_count, leaf_size=DEFAULT_LEAF_SIZE):
+    """Return the leaf level whose 6 * 4^level cells hold about leaf_size points each."""
+    level = 0
+    while level < MAX_LEVEL and 6 * 4 ** level * leaf_size < points_count:
+        level += 1
+    return level
+
+
+def pair_forces(alpha, targets, sources, kernel=DEFAULT_KERNEL):
+    """The force on each unit vector in targets from the corresponding unit vector in sources,
+    before the tangential projection: alpha times the kernel's magnitude, along source - cos(angle) * target,
+    or for kernels in the 'source' frame (such as the springs), cos(angle) * source - target.
+    This equals the per-pair force in sphere_springs.net_forces_array."""
+    cos_angles = np.clip(np.einsum('ij,ij->i', targets, sources), -1.0, 1.0)
+    if kernel.frame == 'source':
+        directions = cos_angles[:, np.newaxis] * sources - targets
+    else:
+        directions = sources - cos_angles[:, np.newaxis] * targets
+    direction_norms = np.sqrt(np.einsum('ij,ij->i', directions, directions))
+    weights = np.divide(alpha * kernel.magnitudes(np.arccos(cos_angles)), direction_norms,
+                        out=np.zeros_like(cos_angles), where=direction_norms > 0)
+    return weights[:, np.newaxis] * directions
+
+
+def _face_coordinates(units, level):
+    """Return the face, row and column of the level's cell containing each unit vector."""
+    rows = np.arange(len(units))
+    abs_units = np.abs(units)
+    axes = np.argmax(abs_units, axis=1)
+    faces = 2 * axes + (units[rows, axes] < 0)
+    major = abs_units[rows, axes]
+    side = 1 << level
+    coords = []
+    for offset in (1, 2):
+        # Equal-angle coordinate in [-1, 1] across the face
+        angle = np.arctan(units[rows, (axes + offset) % 3] / major) * (4 / pi)
+        coords.append(np.clip(((angle + 1) * (side / 2)).astype(np.int64), 0, side - 1))
+    return faces, coords[0], coords[1]
+
+
+def _cell_directions(level, i_offsets, j_offsets):
+    """Unit vectors at fractional grid positions (i + i_offset, j + j_offset) of every cell of a level,
+    in cell-id order."""
+    side = 1 << level
+    faces, i, j = np.meshgrid(np.arange(6), np.arange(side), np.arange(side), indexing='ij')
+    faces, i, j = faces.ravel(), i.ravel(), j.ravel()
+    axes = faces // 2
+    result = np.zeros((len(faces), 3))
+    rows = np.arange(len(faces))
+    result[rows, axes] = np.where(faces % 2 == 0, 1.0, -1.0)
+    result[rows, (axes + 1) % 3] = np.tan((pi / 4) * (-1 + 2 * (i + i_offsets) / side))
+    result[rows, (axes + 2) % 3] = np.tan((pi / 4) * (-1 + 2 * (j + j_offsets) / side))
+    return result / np.linalg.norm(result, axis=1)[:, np.newaxis]
+
+
+def _children(targets, cells, level):
+    """Replace each (target, cell) pair by the four pairs of the target with the cell's children."""
+    side = 1 << level
+    faces, i, j = cells // (side * side), (cells // side) % side, cells % side
+    children = [faces * (4 * side * side) + (2 * i + di) * (2 * side) + (2 * j + dj) for di in (0, 1) for dj in (0, 1)]
+    return np.repeat(targets, 4), np.stack(children, axis=1).ravel()
+
+
+def _angles(a, b):
+    return np.arccos(np.clip(np.einsum('ij,ij->i', a, b), -1.0, 1.0))
+
+
+class CubeSphereIndex:
+    """Cube-sphere cells on levels 0 to level, with the near and far interaction lists of each leaf cell.
+    Cells are numbered face * 4^l + i * 2^l + j within level l, and levels are concatenated,
+    coarsest first, into global cell numbers. With an opening_angle of None, the interaction lists
+    are not built, and the index serves only for binning and neighbour queries."""
+
+    def __init__(self, level, opening_angle=DEFAULT_OPENING_ANGLE):
+        self.level = level
+        self.opening_angle = opening_angle
+        self.level_offsets = np.cumsum([0] + [6 * 4 ** l for l in range(level + 1)])
+        self.centers = []
+        self.radii = []
+        for l in range(level + 1):
+            centers = _cell_directions(l, 0.5, 0.5)
+            corners = [_cell_directions(l, di, dj) for di in (0, 1) for dj in (0, 1)]
+            self.centers.append(centers)
+            self.radii.append(np.max([_angles(centers, corner) for corner in corners], axis=0))
+        if opening_angle is not None:
+            self._build_interactions()
+        self.order = None
+
+    def _build_interactions(self):
+        """Walk the quadtree once for all leaf cells at a time, sorting (leaf, cell) pairs into far and near."""
+        leaf_centers = self.centers[-1]
+        leaf_radii = self.radii[-1]
+        leaf_count = len(leaf_centers)
+        targets = np.repeat(np.arange(leaf_count), 6)
+        cells = np.tile(np.arange(6), leaf_count)
+        far_targets, far_cells = [], []
+        for l in range(self.level + 1):
+            distances = _angles(leaf_centers[targets], self.centers[l][cells])
+            distances = np.minimum(distances, pi - distances)  # Stay clear of the antipode, too
+            far = self.radii[l][cells] < self.opening_angle * (distances - leaf_radii[targets])
+            far_targets.append(targets[far])
+            far_cells.append(self.level_offsets[l] + cells[far])
+            targets, cells = targets[~far], cells[~far]
+            if l < self.level:
+                targets, cells = _children(targets, cells, l)
+        self.far_targets = np.concatenate(far_targets)
+        self.far_cells = np.concatenate(far_cells)
+        self.near_targets = targets
+        self.near_sources = cells
+
+    def neighbour_leaves(self, radius):
+        """Return (targets, sources): every pair of leaf cells holding points that may lie within radius
+        (an angle) of each other, including each leaf paired with itself. Found by a walk down the quadtree
+        like the one that builds the interaction lists, so it costs O(leaves) for small radii."""
+        leaf_centers = self.centers[-1]
+        leaf_radii = self.radii[-1]
+        leaf_count = len(leaf_centers)
+        targets = np.repeat(np.arange(leaf_count), 6)
+        cells = np.tile(np.arange(6), leaf_count)
+        for l in range(self.level + 1):
+            near = _angles(leaf_centers[targets], self.centers[l][cells]) <= radius + leaf_radii[targets] + self.radii[l][cells]
+            targets, cells = targets[near], cells[near]
+            if l < self.level:
+                targets, cells = _children(targets, cells, l)
+        return targets, cells
+
+    def update(self, units):
+        """Bin the unit vectors into cells, and sum the cells' point counts and directions.
+        The previous sort order is reused as a starting point, so small moves are cheap."""
+        faces, i, j = _face_coordinates(units, self.level)
+        leaf_ids = (faces << (2 * self.level)) + (i << self.level) + j
+        if self.order is None or len(self.order) != len(units):
+            self.order = np.argsort(leaf_ids, kind='stable')
+        else:
+            self.order = self.order[np.argsort(leaf_ids[self.order], kind='stable')]
+        leaf_count = 6 * 4 ** self.level
+        self.leaf_counts = np.bincount(leaf_ids, minlength=leaf_count)
+        self.leaf_starts = np.cumsum(self.leaf_counts) - self.leaf_counts
+
+        counts, sums = [], []
+        for l in range(self.level + 1):
+            shift = self.level - l
+            ids = (faces << (2 * l)) + ((i >> shift) << l) + (j >> shift)
+            cell_count = 6 * 4 ** l
+            counts.append(np.bincount(ids, minlength=cell_count))
+            sums.append(np.stack([np.bincount(ids, units[:, k], minlength=cell_count) for k in range(3)], axis=1))
+        self.cell_counts = np.concatenate(counts)
+        sums = np.concatenate(sums)
+        sum_norms = np.linalg.norm(sums, axis=1)
+        self.cell_directions = np.divide(sums, sum_norms[:, np.newaxis], out=np.zeros_like(sums),
+                                         where=sum_norms[:, np.newaxis] > 0)
+
+    def _leaf_members(self, leaves, sizes):
+        """For each leaf in leaves, expand to the positions 0 to size-1 within it: return (pair index, local index)."""
+        pair_index = np.repeat(np.arange(len(leaves)), sizes)
+        local = np.arange(len(pair_index)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return pair_index, local
+
+    def point_pairs(self, targets, sources):
+        """Yield (n, m) arrays of sorted positions of the distinct pairs of points in each pair of leaf cells,
+        in chunks of at most PAIR_CHUNK_SIZE pairs (where the leaves allow); call update first."""
+        target_counts = self.leaf_counts[targets]
+        source_counts = self.leaf_counts[sources]
+        occupied = (target_counts > 0) & (source_counts > 0)
+        targets, sources = targets[occupied], sources[occupied]
+        target_counts, source_counts = target_counts[occupied], source_counts[occupied]
+        for chunk in _chunks(target_counts * source_counts):
+            chunk_targets, chunk_sources = targets[chunk], sources[chunk]
+            widths = source_counts[chunk]
+            pair_index, local = self._leaf_members(chunk_targets, target_counts[chunk] * widths)
+            n = self.leaf_starts[chunk_targets][pair_index] + local // widths[pair_index]
+            m = self.leaf_starts[chunk_sources][pair_index] + local % widths[pair_index]
+            distinct = n != m
+            yield n[distinct], m[distinct]
+
+    def drop_beyond(self, cutoff):
+        """Drop the interactions between cells too far apart for any of their points to be within cutoff (an angle)."""
+        leaf_centers, leaf_radii = self.centers[-1], self.radii[-1]
+        centers, radii = np.concatenate(self.centers), np.concatenate(self.radii)
+        targets, cells = self.far_targets, self.far_cells
+        keep = _angles(leaf_centers[targets], centers[cells]) - leaf_radii[targets] - radii[cells] <= cutoff
+        self.far_targets, self.far_cells = targets[keep], cells[keep]
+        targets, sources = self.near_targets, self.near_sources
+        keep = _angles(leaf_centers[targets], leaf_centers[sources]) - leaf_radii[targets] - leaf_radii[sources] <= cutoff
+        self.near_targets, self.near_sources = targets[keep], sources[keep]
+
+    def net_forces(self, alpha, units, out, kernel=DEFAULT_KERNEL):
+        """Add to out the (untangented) approximate net force on each unit vector; call update first."""
+        # Work in sorted order, where each leaf's points are contiguous, for locality.
+        sorted_units = units[self.order]
+        sorted_out = np.zeros_like(sorted_units)
+
+        far = (self.cell_counts[self.far_cells] > 0) & (self.leaf_counts[self.far_targets] > 0)
+        far_targets, far_cells = self.far_targets[far], self.far_cells[far]
+        for chunk in _chunks(self.leaf_counts[far_targets]):
+            targets, cells = far_targets[chunk], far_cells[chunk]
+            pair_index, local = self._leaf_members(targets, self.leaf_counts[targets])
+            n = self.leaf_starts[targets][pair_index] + local
+            forces = pair_forces(alpha, sorted_units[n], self.cell_directions[cells][pair_index], kernel)
+            forces *= self.cell_counts[cells][pair_index, np.newaxis]
+            _accumulate(sorted_out, n, forces)
+
+        for n, m in self.point_pairs(self.near_targets, self.near_sources):
+            _accumulate(sorted_out, n, pair_forces(alpha, sorted_units[n], sorted_units[m], kernel))
+
+        out[self.order] += sorted_out
+
+
+def _chunks(sizes, limit=PAIR_CHUNK_SIZE):
+    """Yield slices of consecutive items whose sizes sum to at most limit (or a single larger item)."""
+    ends = np.cumsum(sizes)
+    start = 0
+    while start < len(sizes):
+        base = ends[start - 1] if start > 0 else 0
+        stop = max(int(np.searchsorted(ends, base + limit, side='right')), start + 1)
+        yield slice(start, stop)
+        start = stop
+
+
+def _accumulate(out, indices, values):
+    for k in range(3):
+        out[:, k] += np.bincount(indices, values[:, k], minlength=len(out))
+
+
+class TreeForces:
+    """A drop-in replacement for sphere_springs.net_forces_array using a CubeSphereIndex.
+    The index and its interaction lists persist between calls. If the kernel has a cutoff,
+    cells beyond it are dropped from the interaction lists, so they cost nothing."""
+
+    def __init__(self, points_count, opening_angle=DEFAULT_OPENING_ANGLE, leaf_size=DEFAULT_LEAF_SIZE,
+                 kernel=DEFAULT_KERNEL):
+        self.index = CubeSphereIndex(level_for(points_count, leaf_size), opening_angle)
+        self.kernel = kernel
+        if kernel.cutoff is not None:
+            self.index.drop_beyond(kernel.cutoff)
+
+    def __call__(self, alpha, points):
+        units = points / np.sqrt(np.einsum('ij,ij->i', points, points))[:, np.newaxis]
+        self.index.update(units)
+        net_forces = np.zeros_like(points)
+        self.index.net_forces(alpha, units, net_forces, self.kernel)
+        net_forces -= np.einsum('ij,ij->i', net_forces, points)[:, np.newaxis] * points
+        return net_forces
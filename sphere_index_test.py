@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_index import CubeSphereIndex, TreeForces, level_for
+from sphere_springs import SphereSprings, array_to_points, net_forces_array, points_to_array
+
+
+class SphereIndexTest(unittest.TestCase):
+    def test_level_for(self):
+        self.assertEqual(0, level_for(1))
+        self.assertEqual(0, level_for(48, leaf_size=8))
+        self.assertEqual(1, level_for(49, leaf_size=8))
+        self.assertEqual(3, level_for(3000, leaf_size=8))
+
+    def test_update(self):
+        units = np.random.default_rng(4).normal(0, 1, (500, 3))
+        units /= np.linalg.norm(units, axis=1)[:, np.newaxis]
+        index = CubeSphereIndex(2)
+        index.update(units)
+        self.assertEqual(sorted(index.order), list(range(len(units))))
+        for l in range(index.level + 1):
+            counts = index.cell_counts[index.level_offsets[l]:index.level_offsets[l + 1]]
+            self.assertEqual(len(units), counts.sum())
+        # Every leaf sees every leaf, itself included, exactly once: either directly or through an ancestor.
+        leaf_count = 6 * 4 ** index.level
+        seen = np.zeros((leaf_count, leaf_count), dtype=int)
+        np.add.at(seen, (index.near_targets, index.near_sources), 1)
+        for target, cell in zip(index.far_targets, index.far_cells):
+            l = np.searchsorted(index.level_offsets, cell, side='right') - 1
+            shift = 2 * (index.level - l)
+            first = (cell - index.level_offsets[l]) << shift
+            seen[target, first:first + (1 << shift)] += 1
+        self.assertTrue(np.all(seen == 1))
+
+    def test_exact_without_opening(self):
+        points = np.random.default_rng(5).normal(0, 1, (400, 3))
+        points /= np.linalg.norm(points, axis=1)[:, np.newaxis]
+        expected = net_forces_array(0.25, points)
+        actual = TreeForces(len(points), opening_angle=0.0, leaf_size=4)(0.25, points)
+        self.assertTrue(np.allclose(expected, actual))
+
+    def test_approximation(self):
+        points = np.random.default_rng(6).normal(0, 1, (2000, 3))
+        points /= np.linalg.norm(points, axis=1)[:, np.newaxis]
+        expected = net_forces_array(0.25, points)
+        tree_forces = TreeForces(len(points), opening_angle=0.2)
+        for _ in range(2):  # The second call reuses the previous sort order
+            actual = tree_forces(0.25, points)
+            error = np.linalg.norm(actual - expected) / np.linalg.norm(expected)
+            self.assertLess(error, 0.05)
+
+    def test_stabilize(self):
+        points = array_to_points(np.random.default_rng(7).normal(0, 1, (300, 3)))
+        results = []
+        for engine in ('numpy', 'tree'):
+            springs = SphereSprings(list(points), engine=engine)
+            # A small step, so the positions differ by no more than the forces do.
+            with patch.object(SphereSprings, 'max_iter_count', 3), patch.object(SphereSprings, 'alpha', 0.001):
+                springs.stabilize()
+            results.append(points_to_array(springs.points))
+        self.assertLess(np.abs(results[0] - results[1]).max(), 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
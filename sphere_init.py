@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+"""Initial point sets for SphereSprings.
+
+Each initializer takes (points_count, seed=None) and returns an (N, 3)
+array of points on the unit sphere. All but 'random' are spread evenly,
+and all but 'random' and 'jittered' are deterministic (ignoring seed):
+
+  - random:      normally distributed directions, as in the original __main__
+  - fibonacci:   the Fibonacci (golden angle) spiral lattice
+  - icosahedral: the vertices of a subdivided icosahedron, evenly thinned
+  - jittered:    one random point in each of N equal-area bands, at jittered
+                 golden-angle longitudes
+
+The even starts begin with much smaller forces than 'random', and with the
+line-search solvers in sphere_solvers they save a fifth to a half of its
+iterations (see bench.py --iterations). With the fixed step they do not:
+no start converges within the default 100 iterations for N >= 50.
+
+Use SphereSprings.from_initializer(name, points_count, seed) to start from one.
+"""
+
+from math import pi, sqrt
+
+import numpy as np
+
+
+GOLDEN_ANGLE = pi * (3 - sqrt(5))
+
+
+def _normalized(points):
+    return points / np.sqrt(np.einsum('ij,ij->i', points, points))[:, np.newaxis]
+
+
+def _spiral(z, longitudes):
+    r = np.sqrt(np.maximum(1 - z * z, 0.0))
+    return np.stack([r * np.cos(longitudes), r * np.sin(longitudes), z], axis=1)
+
+
+def random_points(points_count, seed=None):
+    return _normalized(np.random.default_rng(seed).normal(0, 1, (points_count, 3)))
+
+
+def fibonacci_points(points_count, seed=None):
+    """Points at equal-area heights z, separated in longitude by the golden angle."""
+    i = np.arange(points_count) + 0.5
+    return _spiral(1 - 2 * i / points_count, GOLDEN_ANGLE * i)
+
+
+def jittered_points(points_count, seed=None):
+    """Stratified sampling: a uniformly random height within each of points_count equal-area bands,
+    at a longitude jittered by up to half the mean spacing from the Fibonacci lattice's."""
+    rng = np.random.default_rng(seed)
+    i = np.arange(points_count)
+    z = 1 - 2 * (i + rng.random(points_count)) / points_count
+    spacing = sqrt(4 * pi / points_count) if points_count else 0.0
+    return _spiral(z, GOLDEN_ANGLE * (i + 0.5) + spacing * (rng.random(points_count) - 0.5))
+
+
+def icosahedron():
+    """Return the 12 vertices and 20 faces (as vertex index triples) of a unit icosahedron."""
+    g = (1 + sqrt(5)) / 2
+    vertices = np.array([(-1, g, 0), (1, g, 0), (-1, -g, 0), (1, -g, 0),
+                         (0, -1, g), (0, 1, g), (0, -1, -g), (0, 1, -g),
+                         (g, 0, -1), (g, 0, 1), (-g, 0, -1), (-g, 0, 1)], dtype=np.float64)
+    faces = np.array([(0, 11, 5), (0, 5, 1), (0, 1, 7), (0, 7, 10), (0, 10, 11),
+                      (1, 5, 9), (5, 11, 4), (11, 10, 2), (10, 7, 6), (7, 1, 8),
+                      (3, 9, 4), (3, 4, 2), (3, 2, 6), (3, 6, 8), (3, 8, 9),
+                      (4, 9, 5), (2, 4, 11), (6, 2, 10), (8, 6, 7), (9, 8, 1)])
+    return _normalized(vertices), faces
+
+
+def geodesic_points(frequency):
+    """The 10 f^2 + 2 vertices of the icosahedron with each face subdivided f times along each edge."""
+    vertices, faces = icosahedron()
+    i, j = np.meshgrid(np.arange(frequency + 1), np.arange(frequency + 1), indexing='ij')
+    keep = i + j <= frequency
+    weights = np.stack([i[keep], j[keep], frequency - i[keep] - j[keep]], axis=1) / frequency
+    corners = vertices[faces]  # (20, 3 corners, 3)
+    points = _normalized(np.einsum('wc,fcx->fwx', weights, corners).reshape(-1, 3))
+    # Points on shared edges and corners appear once per face; merge them.
+    _, unique = np.unique(np.round(points, 9), axis=0, return_index=True)
+    return points[np.sort(unique)]
+
+
+def banded_subset(points, count):
+    """Choose count of the points, evenly spaced in their order by height and then longitude.
+    For points spread evenly over the sphere, the gaps left are spread evenly too."""
+    order = np.lexsort((np.arctan2(points[:, 1], points[:, 0]), np.round(points[:, 2], 9)))
+    return points[order[((np.arange(count) + 0.5) * len(points) / count).astype(np.int64)]]
+
+
+def icosahedral_points(points_count, seed=None):
+    """The vertices of the least subdivided icosahedron with at least points_count vertices,
+    thinned to points_count by banded_subset."""
+    frequency = 1
+    while 10 * frequency ** 2 + 2 < points_count:
+        frequency += 1
+    return banded_subset(geodesic_points(frequency), points_count)
+
+
+INITIALIZERS = {
+    'random': random_points,
+    'fibonacci': fibonacci_points,
+    'icosahedral': icosahedral_points,
+    'jittered': jittered_points,
+}
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from sphere_init import INITIALIZERS, banded_subset, geodesic_points
+from sphere_springs import SphereSprings, points_to_array
+
+
+class SphereInitTest(unittest.TestCase):
+    def test_on_sphere(self):
+        for name, initializer in INITIALIZERS.items():
+            for points_count in (0, 1, 12, 100):
+                points = initializer(points_count, seed=1)
+                self.assertEqual((points_count, 3), points.shape, name)
+                self.assertTrue(np.allclose(1.0, np.linalg.norm(points, axis=1)), name)
+
+    def test_deterministic(self):
+        for name, initializer in INITIALIZERS.items():
+            self.assertTrue(np.array_equal(initializer(50, seed=3), initializer(50, seed=3)), name)
+
+    def test_spread(self):
+        # The even initializers keep points apart; 100 random points are almost always closer than this.
+        for name in ('fibonacci', 'icosahedral', 'jittered'):
+            points = INITIALIZERS[name](100, seed=2)
+            cos_angles = points @ points.T
+            np.fill_diagonal(cos_angles, -1.0)
+            self.assertLess(cos_angles.max(), np.cos(0.1), name)
+
+    def test_geodesic_points(self):
+        for frequency in (1, 2, 5):
+            points = geodesic_points(frequency)
+            self.assertEqual(10 * frequency ** 2 + 2, len(points))
+        points = geodesic_points(3)
+        for count in (0, 12, 50, len(points)):
+            subset = banded_subset(points, count)
+            self.assertEqual(count, len(np.unique(np.round(subset, 9), axis=0)))
+            self.assertTrue(np.all(np.isin(np.round(subset, 9), np.round(points, 9)).all(axis=1)))
+
+    def test_from_initializer(self):
+        springs = SphereSprings.from_initializer('fibonacci', 20, engine='numpy')
+        self.assertEqual('numpy', springs.engine)
+        self.assertTrue(np.array_equal(INITIALIZERS['fibonacci'](20), points_to_array(springs.points)))
+        with self.assertRaises(ValueError):
+            SphereSprings.from_initializer('lattice', 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+"""Force laws for SphereSprings.
+
+A kernel gives the strength of the force between two points, and their
+energy, as vectorized functions of the angle a between them; every engine
+multiplies both by alpha. The force acts along the geodesic joining the two
+points, and stabilize moves points against it, so kernels whose energy falls
+as a grows push points apart. The built-in kernels, where r = 2 sin(a/2)
+is the chord between the points:
+
+  - SpringKernel:  the original law, alpha * a along the perpendicular to the
+                   source point, whose tangential part is alpha * a cos(a);
+                   energy -(a sin(a) + cos(a)), least at right angles
+  - RieszKernel:   energy r^(-s), force s cos(a/2) r^(-s-1)
+  - CoulombKernel: the Riesz kernel with s = 1
+  - LogKernel:     energy -log(r), force cos(a/2) / r
+
+Each takes an optional cutoff angle, beyond which pairs exert no force
+(and the energy is shifted to be zero there). Engines that can, such as
+'tree', skip such pairs altogether. Pass an instance as
+SphereSprings(points, kernel=...), or set SphereSprings.kernel.
+
+The forces of the kernels other than the springs are not on the springs'
+scale, so stabilize's fixed step moves points by fixed_step's step rather
+than alpha, with each point's angle capped at alpha times the mean spacing.
+"""
+
+import numpy as np
+
+
+class Kernel:
+    """A force law. Subclasses define _magnitudes and _energies of arrays (or floats) of angles."""
+
+    PARAMS = ('cutoff',)  # Attributes that determine the kernel's results
+    frame = 'target'  # 'target': the force lies along the geodesic at the point it acts on; 'source': see SpringKernel
+
+    def __init__(self, cutoff=None):
+        if cutoff is not None and not 0 < cutoff <= np.pi:
+            raise ValueError(f'Cutoff must be an angle in (0, pi]: {cutoff}')
+        self.cutoff = cutoff
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.params() == other.params()
+
+    def __hash__(self):
+        return hash((type(self).__name__, tuple(self.params().items())))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{k}={v!r}" for k, v in self.params().items())})'
+
+    def params(self):
+        return {name: getattr(self, name) for name in self.PARAMS}
+
+    def magnitudes(self, angles):
+        """The strength of the force between points at these angles, before alpha; zero beyond the cutoff."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            magnitudes = self._magnitudes(angles)
+        if self.cutoff is None:
+            return magnitudes
+        return np.where(angles <= self.cutoff, magnitudes, 0.0)
+
+    def energies(self, angles):
+        """The energy of pairs of points at these angles, before alpha; zero beyond the cutoff."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            energies = self._energies(angles)
+            if self.cutoff is None:
+                return energies
+            return np.where(angles <= self.cutoff, energies - self._energies(self.cutoff), 0.0)
+
+    def fixed_step(self, alpha, points_count):
+        """The step for moving points_count points through step * |force|, and the largest angle any one may move.
+        The step is alpha over the rate at which the force (ignoring the cutoff) changes with the angle at the mean
+        spacing of the points, so that pairs near that spacing do not overshoot; the cap keeps close pairs in check."""
+        spacing = min(np.sqrt(4 * np.pi / max(points_count, 1)), np.pi / 2)
+        delta = spacing * 1e-3
+        slope = (self._magnitudes(spacing - delta) - self._magnitudes(spacing + delta)) / (2 * delta)
+        return alpha / abs(float(slope)), alpha * float(spacing)
+
+
+class SpringKernel(Kernel):
+    """The original law, and the default. Its force on a point acts perpendicular to the other (source) point,
+    away from the point it acts on, so only cos(a) of it remains once projected onto the tangent plane."""
+
+    frame = 'source'
+
+    def _magnitudes(self, angles):
+        return angles
+
+    def _energies(self, angles):
+        return -(angles * np.sin(angles) + np.cos(angles))
+
+    def fixed_step(self, alpha, points_count):
+        return alpha, np.inf
+
+
+class RieszKernel(Kernel):
+    PARAMS = ('s', 'cutoff')
+
+    def __init__(self, s=2.0, cutoff=None):
+        if s <= 0:
+            raise ValueError(f'Riesz kernels need s > 0 (use LogKernel for s = 0): {s}')
+        super().__init__(cutoff)
+        self.s = s
+
+    def _magnitudes(self, angles):
+        half = np.asarray(angles) / 2
+        return self.s * np.cos(half) * (2 * np.sin(half)) ** (-self.s - 1)
+
+    def _energies(self, angles):
+        return (2 * np.sin(np.asarray(angles) / 2)) ** -self.s
+
+
+class CoulombKernel(RieszKernel):
+    PARAMS = ('cutoff',)
+
+    def __init__(self, cutoff=None):
+        super().__init__(1.0, cutoff)
+
+
+class LogKernel(Kernel):
+    def _magnitudes(self, angles):
+        half = np.asarray(angles) / 2
+        return np.cos(half) / (2 * np.sin(half))
+
+    def _energies(self, angles):
+        return -np.log(2 * np.sin(np.asarray(angles) / 2))
+
+
+DEFAULT_KERNEL = SpringKernel()
+
+KERNELS = {
+    'spring': SpringKernel,
+    'riesz': RieszKernel,
+    'coulomb': CoulombKernel,
+    'log': LogKernel,
+}
+
+
+def pair_weights(kernel, alpha, dots, row_norm2s, col_norm2s):
+    """Return the angles and the weights of the pairs (p, q) of a row and a column point, given their (..., R, C)
+    dot products and squared norms, such that the force on p from q is weight times its direction in the kernel's
+    frame: q |p|^2 - p (p.q), along the tangent at p toward q, or for the 'source' frame q (p.q) - p |q|^2,
+    perpendicular to q. Pairs with no direction, such as a point and itself, have weight zero."""
+    norm_products = np.sqrt(row_norm2s)[..., :, np.newaxis] * np.sqrt(col_norm2s)[..., np.newaxis, :]
+    angles = np.arccos(np.clip(dots / norm_products, -1.0, 1.0))
+    # The direction is p x (q x p) or q x (p x q) up to sign, whose squared norm is |p|^2 |p x q|^2 or |q|^2 |p x q|^2.
+    frame_norm2s = col_norm2s[..., np.newaxis, :] if kernel.frame == 'source' else row_norm2s[..., :, np.newaxis]
+    cross_norm2s = row_norm2s[..., :, np.newaxis] * col_norm2s[..., np.newaxis, :] - dots ** 2
+    dir_norms = np.sqrt(np.maximum(frame_norm2s * cross_norm2s, 0.0))
+    weights = np.divide(alpha * kernel.magnitudes(angles), dir_norms, out=np.zeros_like(angles), where=dir_norms > 0)
+    return angles, weights
+
+
+def weighted_forces(kernel, weights, dots, rows, cols, row_norm2s, col_norm2s):
+    """The summed force on each row point from the column points, before the tangential projection,
+    given the pair_weights of (..., R, C) pairs."""
+    if kernel.frame == 'source':
+        return (weights * dots) @ cols - (weights @ col_norm2s[..., np.newaxis]) * rows
+    return (weights @ cols) * row_norm2s[..., np.newaxis] - (weights * dots).sum(axis=-1)[..., np.newaxis] * rows
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_batch import BatchSphereSprings, batch_net_forces
+from sphere_index import TreeForces
+from sphere_init import fibonacci_points, random_points
+from sphere_kernels import CoulombKernel, LogKernel, RieszKernel, SpringKernel
+from sphere_metrics import coulomb_energy
+from sphere_parallel import tile_net_forces
+from sphere_solvers import LBFGSSolver
+from sphere_springs import (SphereSprings, array_to_points, net_forces_array, new_point_locations, pair_energy,
+                            pair_force_sums, points_to_array)
+
+
+KERNELS = (SpringKernel(), CoulombKernel(), RieszKernel(3.0), LogKernel(), CoulombKernel(cutoff=1.0),
+           SpringKernel(cutoff=2.0))
+
+
+class SphereKernelsTest(unittest.TestCase):
+    def setUp(self):
+        self.points = random_points(30, seed=3)
+
+    def test_magnitudes_are_energy_slopes(self):
+        angles = np.linspace(0.1, 3.0, 30)
+        h = 1e-6
+        for kernel in KERNELS:
+            slopes = (kernel.energies(angles + h) - kernel.energies(angles - h)) / (2 * h)
+            # Spring forces lose a factor of cos(a) to the tangential projection.
+            magnitudes = kernel.magnitudes(angles) * (np.cos(angles) if kernel.frame == 'source' else 1.0)
+            away = np.abs(angles - (kernel.cutoff or np.inf)) > h
+            self.assertTrue(np.allclose(-slopes[away], magnitudes[away]), kernel)
+            if kernel.cutoff is not None:
+                self.assertTrue(np.all(kernel.magnitudes(angles[angles > kernel.cutoff]) == 0.0))
+                self.assertTrue(np.all(kernel.energies(angles[angles > kernel.cutoff]) == 0.0))
+
+    def test_forces_are_energy_gradients(self):
+        directions = np.random.default_rng(4).normal(0, 1, self.points.shape)
+        directions -= np.einsum('ij,ij->i', directions, self.points)[:, np.newaxis] * self.points
+        h = 1e-6
+        for kernel in KERNELS:
+            net_forces = net_forces_array(0.25, self.points, kernel=kernel)
+            slope = (pair_energy(0.25, new_point_locations(h, self.points, -directions), kernel)
+                     - pair_energy(0.25, new_point_locations(h, self.points, directions), kernel)) / (2 * h)
+            self.assertAlmostEqual(slope / np.einsum('ij,ij->', net_forces, directions), 1.0, places=5)
+
+    def test_engines_agree(self):
+        points = self.points
+        ids = np.arange(len(points))
+        for kernel in KERNELS:
+            expected = net_forces_array(0.25, points, chunk_size=7, kernel=kernel)
+
+            def tangential(forces):
+                return forces - np.einsum('ij,ij->i', forces, points)[:, np.newaxis] * points
+
+            self.assertTrue(np.allclose(expected, tangential(pair_force_sums(0.25, points, points, 7, ids, ids, kernel))))
+            tiled = np.zeros_like(points)
+            tile_net_forces(0.25, points, 0, len(points), tiled, 7, kernel)
+            self.assertTrue(np.allclose(expected, tangential(tiled)))
+            self.assertTrue(np.allclose(expected, batch_net_forces(0.25, points[np.newaxis], kernel=kernel)[0]))
+            self.assertTrue(np.allclose(expected, TreeForces(len(points), 0.0, 2, kernel)(0.25, points)))
+
+    def test_batch_padding(self):
+        # Padding points coincide, where singular kernels are infinite.
+        padded = np.concatenate([self.points, np.tile((1.0, 0.0, 0.0), (5, 1))])[np.newaxis]
+        forces = batch_net_forces(0.25, padded, [len(self.points)], CoulombKernel())[0]
+        self.assertTrue(np.allclose(net_forces_array(0.25, self.points, kernel=CoulombKernel()), forces[:len(self.points)]))
+        self.assertTrue(np.all(forces[len(self.points):] == 0.0))
+
+    def test_scalar_engine(self):
+        with patch.object(SphereSprings, 'max_iter_count', 3), patch.object(SphereSprings, 'alpha', 0.01):
+            for kernel in (CoulombKernel(cutoff=1.0), LogKernel()):
+                scalar = SphereSprings(array_to_points(self.points), kernel=kernel)
+                scalar.stabilize()
+                vectorized = SphereSprings(array_to_points(self.points), engine='numpy', kernel=kernel)
+                vectorized.stabilize()
+                self.assertTrue(np.allclose(points_to_array(scalar.points), points_to_array(vectorized.points)))
+
+    def test_fixed_step_lowers_energy(self):
+        # Under the default settings, without a solver, every engine moves points downhill.
+        self.assertEqual((0.25, np.inf), SpringKernel().fixed_step(0.25, 30))
+        points = np.concatenate([self.points, fibonacci_points(30)])
+        with patch.object(SphereSprings, 'max_iter_count', 10):
+            for kernel in (CoulombKernel(), RieszKernel(3.0), LogKernel(), CoulombKernel(cutoff=1.0)):
+                initial_energy = pair_energy(0.25, points, kernel)
+                initial_force = np.linalg.norm(net_forces_array(0.25, points, kernel=kernel), axis=1).max()
+                results = []
+                for engine in ('numpy', 'parallel', 'tree'):
+                    springs = SphereSprings(array_to_points(points), engine=engine, kernel=kernel)
+                    springs.stabilize()
+                    results.append(points_to_array(springs.points))
+                with patch.object(SphereSprings, 'kernel', kernel):
+                    batch = BatchSphereSprings(points[np.newaxis])
+                    batch.stabilize()
+                results.append(batch.points[0])
+                for result in results:
+                    self.assertTrue(np.allclose(results[0], result, atol=1e-3), kernel)
+                    self.assertLess(pair_energy(0.25, result, kernel), initial_energy, kernel)
+                    forces = net_forces_array(0.25, result, kernel=kernel)
+                    self.assertLess(np.linalg.norm(forces, axis=1).max(), initial_force, kernel)
+            with patch.object(SphereSprings, 'max_iter_count', 3):
+                scalar = SphereSprings(array_to_points(self.points[:12]), engine='scalar', kernel=CoulombKernel())
+                scalar.stabilize()
+            self.assertLess(pair_energy(0.25, points_to_array(scalar.points), CoulombKernel()),
+                            pair_energy(0.25, self.points[:12], CoulombKernel()))
+
+    def test_isolated_point(self):
+        # The third point is beyond the cutoff of the others, so it feels no force and must stay put.
+        points = np.array([(1.0, 0.0, 0.0), (np.cos(0.3), np.sin(0.3), 0.0), (0.0, 0.0, 1.0)])
+        kernel = CoulombKernel(cutoff=0.5)
+        with patch.object(SphereSprings, 'max_iter_count', 3), patch.object(SphereSprings, 'alpha', 0.01):
+            scalar = SphereSprings(array_to_points(points), engine='scalar', kernel=kernel)
+            scalar.stabilize()
+            vectorized = SphereSprings(array_to_points(points), engine='numpy', kernel=kernel)
+            vectorized.stabilize()
+        self.assertTrue(np.allclose(points_to_array(scalar.points), points_to_array(vectorized.points)))
+        self.assertTrue(np.array_equal((0.0, 0.0, 1.0), points_to_array(scalar.points)[2]))
+
+    def test_tree_cutoff(self):
+        kernel = CoulombKernel(cutoff=0.4)
+        points = random_points(500, seed=5)
+        tree = TreeForces(len(points), kernel=kernel)
+        full = TreeForces(len(points), kernel=CoulombKernel())
+        self.assertLess(len(tree.index.far_cells), len(full.index.far_cells))
+        self.assertLess(len(tree.index.near_sources), len(full.index.near_sources))
+        exact = TreeForces(len(points), 0.0, kernel=kernel)
+        self.assertTrue(np.allclose(net_forces_array(0.25, points, kernel=kernel), exact(0.25, points)))
+
+    def test_thomson(self):
+        # Twelve charges settle at the vertices of an icosahedron.
+        springs = SphereSprings.from_initializer('random', 12, seed=1, engine='numpy', kernel=CoulombKernel(),
+                                                 solver=LBFGSSolver())
+        springs.stabilize()
+        self.assertAlmostEqual(49.165253058, coulomb_energy(points_to_array(springs.points)), places=4)
+
+    def test_cache_params(self):
+        springs = SphereSprings(array_to_points(self.points), engine='numpy')
+        self.assertNotIn('kernel', springs._cache_params())
+        springs.kernel = RieszKernel(1.5, cutoff=0.5)
+        params = springs._cache_params()
+        self.assertEqual(('RieszKernel', 1.5, 0.5), (params['kernel'], params['kernel.s'], params['kernel.cutoff']))
+
+    def test_bad_parameters(self):
+        with self.assertRaises(ValueError):
+            CoulombKernel(cutoff=0.0)
+        with self.assertRaises(ValueError):
+            RieszKernel(-1.0)
+        self.assertEqual(CoulombKernel(cutoff=1.0), CoulombKernel(cutoff=1.0))
+        self.assertNotEqual(CoulombKernel(), RieszKernel(1.0, cutoff=1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+
+"""Quality metrics for point configurations on the sphere, such as SphereSprings produces.
+
+Nearest-neighbour statistics use a CubeSphereIndex: each point is compared
+only with the points in leaf cells that could hold a point within a search
+radius of it, so they cost O(N log N) rather than O(N^2). The few points
+with no neighbour inside the radius are compared with every point, so the
+results are exact. Distances are angles, in radians.
+
+Energies are inherently O(N^2), and are summed over blocks of rows of the
+pairwise distance matrix, with Euclidean (chord) distances r:
+the Riesz s-energy is the sum over pairs of r^(-s), of which s = 1 is
+the Coulomb energy, and the logarithmic energy is the sum of -log(r).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from sphere_index import DEFAULT_LEAF_SIZE, CubeSphereIndex, level_for
+
+
+ENERGY_CHUNK_SIZE = 256  # Rows of the pairwise distance matrix per block
+BRUTE_FORCE_ELEMENTS = 1 << 20  # Point pairs per block when searching all points
+
+SphereMetrics = namedtuple('SphereMetrics', ['points_count', 'min_separation', 'nearest_mean', 'nearest_std',
+                                             'nearest_max', 'riesz_energy', 'log_energy'])
+
+
+def _units(points):
+    points = np.asarray(points, dtype=np.float64)
+    return points / np.sqrt(np.einsum('ij,ij->i', points, points))[:, np.newaxis]
+
+
+def _chord_angles(chord2s):
+    return 2 * np.arcsin(np.minimum(np.sqrt(chord2s) / 2, 1.0))
+
+
+def _brute_force_nearest(units, rows):
+    """For each of the given rows of units, the index of its nearest other point and the squared chord to it."""
+    indices = np.empty(len(rows), dtype=np.int64)
+    chord2s = np.empty(len(rows))
+    step = max(1, BRUTE_FORCE_ELEMENTS // max(len(units), 1))
+    for start in range(0, len(rows), step):
+        block = rows[start:start + step]
+        diffs = units[np.newaxis, :, :] - units[block][:, np.newaxis, :]
+        block_chord2s = np.einsum('ijk,ijk->ij', diffs, diffs)
+        block_chord2s[np.arange(len(block)), block] = np.inf
+        indices[start:start + step] = np.argmin(block_chord2s, axis=1)
+        chord2s[start:start + step] = block_chord2s[np.arange(len(block)), indices[start:start + step]]
+    return indices, chord2s
+
+
+def nearest_neighbours(points, leaf_size=DEFAULT_LEAF_SIZE):
+    """Return (indices, angles): for each point, the index of its nearest other point and the angle to it.
+    Points need not be unit; only their directions count. With fewer than 2 points, there are no neighbours,
+    and the indices are -1 and the angles inf."""
+    units = _units(points)
+    points_count = len(units)
+    indices = np.full(points_count, -1, dtype=np.int64)
+    chord2s = np.full(points_count, np.inf)
+    if points_count < 2:
+        return indices, chord2s
+
+    index = CubeSphereIndex(level_for(points_count, leaf_size), opening_angle=None)
+    index.update(units)
+    sorted_units = units[index.order]
+    radius = float(index.radii[-1].max())  # About the size of a leaf cell, which holds leaf_size points
+    for n, m in index.point_pairs(*index.neighbour_leaves(radius)):
+        diffs = sorted_units[n] - sorted_units[m]
+        pair_chord2s = np.einsum('ij,ij->i', diffs, diffs)
+        np.minimum.at(chord2s, n, pair_chord2s)
+        nearest = pair_chord2s == chord2s[n]
+        indices[n[nearest]] = m[nearest]
+
+    # Back from sorted positions to the original order.
+    order = index.order
+    result_indices = np.empty(points_count, dtype=np.int64)
+    result_chord2s = np.empty(points_count)
+    result_indices[order] = order[np.maximum(indices, 0)]
+    result_chord2s[order] = chord2s
+    # Beyond the radius, a nearer point might lie in a leaf that was not searched.
+    unsure = np.flatnonzero(_chord_angles(result_chord2s) > radius)
+    if len(unsure) > 0:
+        result_indices[unsure], result_chord2s[unsure] = _brute_force_nearest(units, unsure)
+    return result_indices, _chord_angles(result_chord2s)
+
+
+def min_separation(points):
+    """Return the smallest angle between any two of the points."""
+    if len(points) < 2:
+        return np.inf
+    return float(nearest_neighbours(points)[1].min())
+
+
+def _pair_sums(points, pair_fn, chunk_size=ENERGY_CHUNK_SIZE):
+    """Sum pair_fn(squared chords) over all unordered pairs of distinct points, a block of rows at a time."""
+    units = _units(points)
+    points_count = len(units)
+    total = 0.0
+    for start in range(0, points_count, chunk_size):
+        stop = min(start + chunk_size, points_count)
+        # Only pairs (n, m) with n < m, so the block needs only the columns from start on.
+        chord2s = np.maximum(2 - 2 * (units[start:stop] @ units[start:].T), 0.0)
+        upper = np.arange(start, points_count)[np.newaxis, :] > np.arange(start, stop)[:, np.newaxis]
+        total += pair_fn(chord2s[upper]).sum()
+    return float(total)
+
+
+def riesz_energy(points, s=1.0, chunk_size=ENERGY_CHUNK_SIZE):
+    """The Riesz s-energy, the sum over pairs of r^(-s), where r is the chord between them."""
+    if s <= 0:
+        raise ValueError(f'Riesz energies need s > 0 (use log_energy for s = 0): {s}')
+    with np.errstate(divide='ignore'):
+        return _pair_sums(points, lambda chord2s: chord2s ** (-s / 2), chunk_size)
+
+
+def coulomb_energy(points, chunk_size=ENERGY_CHUNK_SIZE):
+    return riesz_energy(points, 1.0, chunk_size)
+
+
+def log_energy(points, chunk_size=ENERGY_CHUNK_SIZE):
+    """The logarithmic energy, the sum over pairs of -log(r), where r is the chord between them."""
+    with np.errstate(divide='ignore'):
+        return _pair_sums(points, lambda chord2s: -0.5 * np.log(chord2s), chunk_size)
+
+
+def sphere_metrics(points, s=1.0):
+    """Return the SphereMetrics of a configuration, given as an (N, 3) array."""
+    points = np.asarray(points, dtype=np.float64)
+    _, angles = nearest_neighbours(points)
+    if len(points) < 2:
+        nearest = (np.inf, np.nan, np.nan, np.nan)
+    else:
+        nearest = (float(angles.min()), float(angles.mean()), float(angles.std()), float(angles.max()))
+    return SphereMetrics(len(points), *nearest, riesz_energy(points, s), log_energy(points))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+import unittest
+from itertools import combinations
+from math import acos, log, sqrt
+from unittest.mock import patch
+
+import numpy as np
+
+import sphere_metrics
+from sphere_init import fibonacci_points, random_points
+from sphere_metrics import coulomb_energy, log_energy, min_separation, nearest_neighbours, riesz_energy
+
+
+class SphereMetricsTest(unittest.TestCase):
+    def brute_force(self, points):
+        """Nearest neighbour indices and angles, and pair chords, computed pair by pair."""
+        points_count = len(points)
+        angles = np.full((points_count, points_count), np.inf)
+        chords = []
+        for n, m in combinations(range(points_count), 2):
+            angles[n, m] = angles[m, n] = acos(min(max(float(points[n] @ points[m]), -1.0), 1.0))
+            chords.append(float(np.linalg.norm(points[n] - points[m])))
+        return np.argmin(angles, axis=1), angles.min(axis=1), chords
+
+    def test_nearest_neighbours(self):
+        for points in (random_points(300, seed=5), fibonacci_points(300), random_points(7, seed=6)):
+            expected_indices, expected_angles, _ = self.brute_force(points)
+            indices, angles = nearest_neighbours(points)
+            self.assertTrue(np.array_equal(expected_indices, indices))
+            self.assertTrue(np.allclose(expected_angles, angles, atol=1e-7))
+
+    def test_nearest_neighbours_far(self):
+        # Clustered points leave most neighbourhoods empty, so the exhaustive search must take over.
+        points = np.concatenate([random_points(200, seed=7) * 0.01 + (0, 0, 1), [(0.0, 0.0, -1.0)]])
+        expected_indices, expected_angles, _ = self.brute_force(points / np.linalg.norm(points, axis=1)[:, np.newaxis])
+        with patch.object(sphere_metrics, 'BRUTE_FORCE_ELEMENTS', 100):
+            indices, angles = nearest_neighbours(points)
+        self.assertTrue(np.array_equal(expected_indices, indices))
+        self.assertTrue(np.allclose(expected_angles, angles, atol=1e-7))
+
+    def test_few_points(self):
+        indices, angles = nearest_neighbours(np.array([(0.0, 0.0, 2.0)]))
+        self.assertEqual([-1], indices.tolist())
+        self.assertEqual([np.inf], angles.tolist())
+        self.assertEqual(np.inf, min_separation(np.array([(1.0, 0.0, 0.0)])))
+        self.assertEqual(0.0, coulomb_energy(np.empty((0, 3))))
+
+    def test_energies(self):
+        points = random_points(40, seed=8)
+        _, _, chords = self.brute_force(points)
+        self.assertAlmostEqual(sum(1 / c for c in chords), coulomb_energy(points, chunk_size=7))
+        self.assertAlmostEqual(sum(c ** -2.5 for c in chords), riesz_energy(points, 2.5, chunk_size=7))
+        self.assertAlmostEqual(sum(-log(c) for c in chords), log_energy(points, chunk_size=7))
+        with self.assertRaises(ValueError):
+            riesz_energy(points, 0.0)
+
+    def test_octahedron(self):
+        points = np.array([(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -2)], dtype=np.float64)
+        metrics = sphere_metrics.sphere_metrics(points)
+        self.assertEqual(6, metrics.points_count)
+        self.assertAlmostEqual(np.pi / 2, metrics.min_separation)
+        self.assertAlmostEqual(np.pi / 2, metrics.nearest_max)
+        self.assertAlmostEqual(0.0, metrics.nearest_std)
+        self.assertAlmostEqual(12 / sqrt(2) + 3 / 2, metrics.riesz_energy)
+        self.assertAlmostEqual(-12 * log(sqrt(2)) - 3 * log(2), metrics.log_energy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+"""Multi-process force computation for SphereSprings.
+
+The pairs (i, j > i) are split into tiles of contiguous rows holding
+roughly equal numbers of pairs. Worker processes read the points from
+shared memory, and each tile writes its partial net forces into its own
+slot of a shared (tile_count, N, 3) array. The parent sums the slots in
+tile order, so the result depends on tile_count but not on the number
+of workers. Only tile indices and settings are pickled per iteration.
+"""
+
+import os
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from backend import float_dtype
+from sphere_kernels import DEFAULT_KERNEL, pair_weights, weighted_forces
+
+
+DEFAULT_TILE_COUNT = 64
+
+
+def pair_tiles(points_count, tile_count):
+    """Split rows [0, points_count) into at most tile_count contiguous (start, stop) ranges,
+    balanced by the number of pairs (i, j > i) whose first index lies in each range."""
+    rows = np.arange(points_count + 1)
+    pairs_before = rows * (points_count - 1) - rows * (rows - 1) // 2  # Pairs in rows [0, row)
+    targets = np.linspace(0, pairs_before[-1], tile_count + 1)
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(pairs_before, targets[1:-1]), [points_count])))
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+def tile_net_forces(alpha, points, start, stop, out, chunk_size=256, kernel=DEFAULT_KERNEL):
+    """Add to out the forces from every pair (i, j > i) with start <= i < stop, on both i and j.
+    These are the forces of sphere_springs.net_forces_array before the tangential projection,
+    but each pair is visited once rather than twice."""
+    norm2s = np.einsum('ij,ij->i', points, points)
+    norms = np.sqrt(norm2s)
+    for a in range(start, stop, chunk_size):
+        b = min(a + chunk_size, stop)
+        rows, row_norm2s = points[a:b], norm2s[a:b]
+        cols, col_norm2s = points[a:], norm2s[a:]
+        dots = rows @ cols.T
+        _, weights = pair_weights(kernel, alpha, dots, row_norm2s, col_norm2s)
+        weights[np.arange(a, len(points))[np.newaxis, :] <= np.arange(a, b)[:, np.newaxis]] = 0.0
+        out[a:b] += weighted_forces(kernel, weights, dots, rows, cols, row_norm2s, col_norm2s)
+        # The weights divide by the norm of the source (or, in the target frame, the target) point,
+        # so rescale them for the forces on the columns.
+        ratios = norms[a:][np.newaxis, :] / norms[a:b, np.newaxis]
+        col_weights = (weights * ratios if kernel.frame == 'source' else weights / ratios).T
+        out[a:] += weighted_forces(kernel, col_weights, dots.T, cols, rows, col_norm2s, row_norm2s)
+
+
+# Per-process state of a pool worker, set by _init_worker.
+_worker = {}
+
+
+def _init_worker(points_name, out_name, points_count, tile_count, dtype):
+    points_shm = SharedMemory(name=points_name)
+    out_shm = SharedMemory(name=out_name)
+    _worker['shms'] = (points_shm, out_shm)  # Keep the mappings alive
+    _worker['points'] = np.ndarray((points_count, 3), dtype=dtype, buffer=points_shm.buf)
+    _worker['out'] = np.ndarray((tile_count, points_count, 3), dtype=dtype, buffer=out_shm.buf)
+
+
+def _run_tile(task):
+    tile_index, start, stop, alpha, chunk_size, kernel = task
+    out = _worker['out'][tile_index]
+    out[:] = 0.0
+    tile_net_forces(alpha, _worker['points'], start, stop, out, chunk_size, kernel)
+
+
+class ParallelForces:
+    """A drop-in replacement for sphere_springs.net_forces_array that shares the work
+    between worker processes. Use as a context manager, or call close(), to release
+    the pool and the shared memory."""
+
+    def __init__(self, points_count, workers=None, tile_count=DEFAULT_TILE_COUNT, chunk_size=256, kernel=DEFAULT_KERNEL):
+        self.points_count = points_count
+        self.tiles = pair_tiles(points_count, tile_count)
+        self.chunk_size = chunk_size
+        self.kernel = kernel
+        tile_count = max(len(self.tiles), 1)
+        dtype = float_dtype()  # Workers are told the dtype, since they do not share our backend
+        self._points_shm = SharedMemory(create=True, size=max(points_count * 3 * dtype.itemsize, 1))
+        self._out_shm = SharedMemory(create=True, size=max(tile_count * points_count * 3 * dtype.itemsize, 1))
+        self._points = np.ndarray((points_count, 3), dtype=dtype, buffer=self._points_shm.buf)
+        self._out = np.ndarray((tile_count, points_count, 3), dtype=dtype, buffer=self._out_shm.buf)
+        self._pool = get_context().Pool(
+            workers or os.cpu_count(), initializer=_init_worker,
+            initargs=(self._points_shm.name, self._out_shm.name, points_count, tile_count, dtype))
+
+    def __call__(self, alpha, points):
+        self._points[:] = points
+        tasks = [(k, start, stop, alpha, self.chunk_size, self.kernel) for k, (start, stop) in enumerate(self.tiles)]
+        self._pool.map(_run_tile, tasks, chunksize=1)
+        net_forces = self._out[:len(self.tiles)].sum(axis=0)
+        net_forces -= np.einsum('ij,ij->i', net_forces, points)[:, np.newaxis] * points
+        return net_forces
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        # Drop our views before closing, since the buffers cannot be released while exported.
+        self._points = self._out = None
+        for shm in (self._points_shm, self._out_shm):
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from sphere_parallel import ParallelForces, pair_tiles
+from sphere_springs import net_forces_array
+
+
+class SphereParallelTest(unittest.TestCase):
+    def test_pair_tiles(self):
+        for points_count, tile_count in ((1, 4), (2, 4), (10, 4), (100, 7), (57, 64)):
+            tiles = pair_tiles(points_count, tile_count)
+            self.assertLessEqual(len(tiles), tile_count)
+            self.assertEqual(0, tiles[0][0])
+            self.assertEqual(points_count, tiles[-1][1])
+            for (_, stop), (start, _) in zip(tiles[:-1], tiles[1:]):
+                self.assertEqual(stop, start)
+
+    def test_matches_numpy_engine(self):
+        points = np.random.default_rng(3).normal(0, 1, (101, 3))
+        expected = net_forces_array(0.25, points)
+        results = []
+        for workers in (1, 2):
+            with ParallelForces(len(points), workers, tile_count=8, chunk_size=16) as net_forces_fn:
+                results.append(net_forces_fn(0.25, points))
+        self.assertTrue(np.allclose(expected, results[0]))
+        # Results are independent of the worker count, bit for bit.
+        self.assertTrue(np.array_equal(results[0], results[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+
+"""Pluggable solvers for SphereSprings.stabilize.
+
+A solver decides where the points move on each iteration, given the net
+forces on them. Every solver moves points along geodesics, with the same
+update as new_point_location, and the stopping conditions are still those
+of SphereSprings. Pass an instance as SphereSprings(points, solver=...);
+solvers need one of the array engines ('numpy', 'parallel' or 'tree').
+
+The net forces are the gradient of an energy (sphere_springs.pair_energy, for the kernel in use),
+which the line-search solvers use to accept or shrink their steps.
+"""
+
+import numpy as np
+
+from sphere_springs import new_point_locations
+
+
+def tangent_projection(points, vectors):
+    """Remove from each vector its component along the corresponding point."""
+    units = points / np.sqrt(np.einsum('ij,ij->i', points, points))[:, np.newaxis]
+    return vectors - np.einsum('ij,ij->i', vectors, units)[:, np.newaxis] * units
+
+
+def move_along(points, directions):
+    """Move each point along the geodesic leaving it in the tangent direction given by directions,
+    through an angle equal to the norm of its direction."""
+    return new_point_locations(1.0, points, -directions)
+
+
+class FixedStepSolver:
+    """The classic update: move each point against its net force, through an angle of step times the force.
+    With the default step, the kernel's fixed_step, this is what stabilize does without a solver,
+    except that the angles are not capped."""
+
+    PARAMS = ('step_size',)  # Attributes that determine the solver's results
+
+    def __init__(self, step=None):
+        self.step_size = step
+
+    def reset(self, alpha, energy_fn):
+        """Called by stabilize before the first iteration."""
+        self._step = self.step_size if self.step_size is not None else alpha
+
+    def step(self, points, net_forces):
+        """Return the new point locations."""
+        return new_point_locations(self._step, points, net_forces)
+
+
+class _LineSearchSolver:
+    """Shared machinery for solvers that search for a step that sufficiently decreases the energy.
+    The energy of an accepted step is kept, so it is not recomputed on the next iteration."""
+
+    PARAMS = ('armijo', 'shrink', 'max_backtracks')
+
+    def __init__(self, armijo, shrink, max_backtracks):
+        self.armijo = armijo
+        self.shrink = shrink
+        self.max_backtracks = max_backtracks
+
+    def reset(self, alpha, energy_fn):
+        self._alpha = alpha
+        self._energy_fn = energy_fn
+        self._last_points = None
+        self._last_energy = None
+        self.energy_evaluation_count = 0
+
+    def _energy(self, points):
+        if points is self._last_points:
+            return self._last_energy
+        self.energy_evaluation_count += 1
+        return self._energy_fn(points)
+
+    def _line_search(self, points, gradient, directions, step):
+        """Backtrack from step until moving along step * directions satisfies the Armijo condition.
+        Return (new points, step), or (points, 0.0) if no step was accepted."""
+        energy = self._energy(points)
+        slope = -np.einsum('ij,ij->', gradient, directions)  # Rate of decrease of the energy along directions
+        for _ in range(self.max_backtracks):
+            candidate = move_along(points, step * directions)
+            self.energy_evaluation_count += 1
+            candidate_energy = self._energy_fn(candidate)
+            if candidate_energy <= energy - self.armijo * step * slope:
+                self._last_points = candidate
+                self._last_energy = candidate_energy
+                return candidate, step
+            step *= self.shrink
+        return points, 0.0
+
+
+class AdaptiveStepSolver(_LineSearchSolver):
+    """Steepest descent with a step size that adapts between iterations:
+    it backtracks (by shrink) until the energy decreases enough, and is allowed
+    to grow (by grow) after every accepted step."""
+
+    PARAMS = _LineSearchSolver.PARAMS + ('initial_step', 'grow')
+
+    def __init__(self, initial_step=None, grow=1.5, shrink=0.5, armijo=1e-4, max_backtracks=30):
+        super().__init__(armijo, shrink, max_backtracks)
+        self.initial_step = initial_step
+        self.grow = grow
+
+    def reset(self, alpha, energy_fn):
+        super().reset(alpha, energy_fn)
+        self._step = self.initial_step if self.initial_step is not None else alpha
+
+    def step(self, points, net_forces):
+        gradient = tangent_projection(points, net_forces)
+        new_points, step = self._line_search(points, gradient, -gradient, self._step)
+        if step > 0:
+            self._step = step * self.grow
+        return new_points
+
+
+class NesterovSolver(_LineSearchSolver):
+    """Nesterov's accelerated gradient, in the form that needs one force evaluation per iteration.
+    The velocity is carried between tangent spaces by projection. It is reset to zero whenever
+    it points uphill (gradient restart), and whenever a step fails to decrease the energy,
+    in which case a backtracking steepest-descent step is taken and the step size kept shrunk."""
+
+    PARAMS = _LineSearchSolver.PARAMS + ('step_size', 'momentum')
+
+    def __init__(self, step=None, momentum=0.9, shrink=0.5, armijo=1e-4, max_backtracks=30):
+        super().__init__(armijo, shrink, max_backtracks)
+        self.step_size = step
+        self.momentum = momentum
+
+    def reset(self, alpha, energy_fn):
+        super().reset(alpha, energy_fn)
+        self._step = self.step_size if self.step_size is not None else alpha
+        self._velocity = None
+
+    def step(self, points, net_forces):
+        gradient = tangent_projection(points, net_forces)
+        if self._velocity is None:
+            velocity = np.zeros_like(points)
+        else:
+            velocity = tangent_projection(points, self._velocity)
+            if np.einsum('ij,ij->', velocity, gradient) > 0:
+                velocity[:] = 0.0
+        velocity = self.momentum * velocity - self._step * gradient
+        candidate = move_along(points, self.momentum * velocity - self._step * gradient)
+        self.energy_evaluation_count += 1
+        candidate_energy = self._energy_fn(candidate)
+        if candidate_energy < self._energy(points):
+            self._velocity = velocity
+            self._last_points = candidate
+            self._last_energy = candidate_energy
+            return candidate
+
+        self._velocity = None
+        new_points, step = self._line_search(points, gradient, -gradient, self._step)
+        if step > 0:
+            self._step = step
+        return new_points
+
+
+class LBFGSSolver(_LineSearchSolver):
+    """Riemannian L-BFGS on the product of the points' spheres.
+    The last memory step and gradient-change pairs are carried to the current tangent space
+    by projection. The first step, and any step after the memory is discarded, is a
+    backtracking steepest-descent step starting from alpha."""
+
+    PARAMS = _LineSearchSolver.PARAMS + ('memory',)
+
+    def __init__(self, memory=8, shrink=0.5, armijo=1e-4, max_backtracks=30):
+        super().__init__(armijo, shrink, max_backtracks)
+        self.memory = memory
+
+    def reset(self, alpha, energy_fn):
+        super().reset(alpha, energy_fn)
+        self._steps = []
+        self._gradient_changes = []
+        self._last_step = None
+        self._last_gradient = None
+
+    def step(self, points, net_forces):
+        gradient = tangent_projection(points, net_forces)
+        if self._last_step is not None:
+            s = tangent_projection(points, self._last_step)
+            y = gradient - tangent_projection(points, self._last_gradient)
+            if np.einsum('ij,ij->', s, y) > 1e-12:
+                self._steps.append(s)
+                self._gradient_changes.append(y)
+                if len(self._steps) > self.memory:
+                    del self._steps[0]
+                    del self._gradient_changes[0]
+        self._steps = [tangent_projection(points, s) for s in self._steps]
+        self._gradient_changes = [tangent_projection(points, y) for y in self._gradient_changes]
+
+        directions = self._directions(gradient)
+        if self._steps and np.einsum('ij,ij->', directions, gradient) >= 0:
+            self._discard_memory()
+            directions = self._directions(gradient)
+        new_points, step = self._line_search(points, gradient, directions, 1.0)
+        if step == 0.0 and self._steps:
+            self._discard_memory()
+            directions = self._directions(gradient)
+            new_points, step = self._line_search(points, gradient, directions, 1.0)
+
+        self._last_step = step * directions
+        self._last_gradient = gradient
+        return new_points
+
+    def _directions(self, gradient):
+        """Two-loop recursion: return -H gradient for the inverse Hessian approximation H."""
+        if not self._steps:
+            return -self._alpha * gradient
+        q = gradient.copy()
+        coefficients = []
+        for s, y in zip(reversed(self._steps), reversed(self._gradient_changes)):
+            rho = 1 / np.einsum('ij,ij->', y, s)
+            a = rho * np.einsum('ij,ij->', s, q)
+            q -= a * y
+            coefficients.append((rho, a))
+        s, y = self._steps[-1], self._gradient_changes[-1]
+        r = (np.einsum('ij,ij->', s, y) / np.einsum('ij,ij->', y, y)) * q
+        for (s, y), (rho, a) in zip(zip(self._steps, self._gradient_changes), reversed(coefficients)):
+            b = rho * np.einsum('ij,ij->', y, r)
+            r += (a - b) * s
+        return -r
+
+    def _discard_memory(self):
+        self._steps = []
+        self._gradient_changes = []
+
+
+SOLVERS = {
+    'fixed': FixedStepSolver,
+    'adaptive': AdaptiveStepSolver,
+    'nesterov': NesterovSolver,
+    'lbfgs': LBFGSSolver,
+}
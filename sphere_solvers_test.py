@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_solvers import AdaptiveStepSolver, FixedStepSolver, LBFGSSolver, NesterovSolver
+from sphere_springs import STOP_FORCE_THRESHOLD, SphereSprings, array_to_points, points_to_array, spring_energy
+
+
+def unit_points(points_count, seed=2):
+    points = np.random.default_rng(seed).normal(0, 1, (points_count, 3))
+    return points / np.linalg.norm(points, axis=1)[:, np.newaxis]
+
+
+class SphereSolversTest(unittest.TestCase):
+    def test_fixed_step_is_default(self):
+        points = array_to_points(unit_points(20))
+        with patch.object(SphereSprings, 'max_iter_count', 5):
+            expected = SphereSprings(list(points), engine='numpy')
+            expected.stabilize()
+            actual = SphereSprings(list(points), engine='numpy', solver=FixedStepSolver())
+            actual.stabilize()
+        self.assertTrue(np.array_equal(points_to_array(expected.points), points_to_array(actual.points)))
+
+    def test_solvers_converge(self):
+        points = unit_points(30)
+        initial_energy = spring_energy(SphereSprings.alpha, points)
+        for solver in (AdaptiveStepSolver(), NesterovSolver(), LBFGSSolver()):
+            springs = SphereSprings(array_to_points(points), engine='numpy', solver=solver)
+            springs.stabilize()
+            self.assertEqual(STOP_FORCE_THRESHOLD, springs.stop_condition, type(solver).__name__)
+            self.assertLess(springs.iter_count, SphereSprings.max_iter_count)
+            self.assertLess(spring_energy(SphereSprings.alpha, points_to_array(springs.points)), initial_energy)
+
+    def test_scalar_engine_rejects_solver(self):
+        with self.assertRaises(ValueError):
+            SphereSprings(array_to_points(unit_points(3)), solver=LBFGSSolver()).stabilize()
+
+
+if __name__ == '__main__':
+    unittest.main()
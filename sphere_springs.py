@@ -1,52 +1,507 @@
 #!/usr/bin/env python
 
-from math import acos, cos, pi, sin
+"""Points on a sphere, pushed apart by springs until they settle.
 
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from numpy.random import normal
+Run as a script to stabilize many point sets in worker processes:
 
+    python sphere_springs.py --sizes 50 200 --seeds 0 1 2 --output-dir runs
+    python sphere_springs.py --sizes 50 --plot
+    python sphere_springs.py --sizes 200 --kernel coulomb --cutoff 0.5
+    python sphere_springs.py --sizes 200 --kernel riesz --riesz-s 3 --solver lbfgs
+    python sphere_springs.py --sizes 5000 --backend numpy32
+
+matplotlib is only imported for --plot (or by plot()).
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from math import acos, inf
+from time import perf_counter
+
+import numpy as np
+
+from backend import BACKENDS, DEFAULT_BACKEND, float_dtype, get_backend, tolerance, use_backend
 from rot3 import Rot3
+from sphere_index import DEFAULT_LEAF_SIZE, DEFAULT_OPENING_ANGLE, TreeForces
+from sphere_init import INITIALIZERS
+from sphere_kernels import DEFAULT_KERNEL, KERNELS, pair_weights, weighted_forces
+from sphere_metrics import sphere_metrics
+from sphere_parallel import DEFAULT_TILE_COUNT, ParallelForces
 from vec3 import Vec3
 
 
 VERBOSE = False
 
+STOP_MAX_ITER_COUNT = 'max_iter_count'
+STOP_FORCE_THRESHOLD = 'force_threshold'
+STOP_MOVEMENT_THRESHOLD = 'movement_threshold'
+
+# Passed to a SphereSprings observer once per stabilize iteration.
+#   iteration:      Iteration index, starting at 0
+#   max_force:      Largest net force on any point (None if the iteration cap was reached first)
+#   sum_movement:   Summed distance moved by all points (None if no move was made)
+#   stop_condition: One of the STOP_* values if stabilize stops after this iteration, else None
+#   force_time:     Seconds spent computing forces
+#   update_time:    Seconds spent moving the points
+IterationRecord = namedtuple('IterationRecord',
+                             ['iteration', 'max_force', 'sum_movement', 'stop_condition', 'force_time', 'update_time'])
+
+# Yielded by SphereSprings.stabilize_iter once per iteration, along with the observer's IterationRecord.
+#   points:     (N, 3) array of the points at the start of the iteration, which is not modified later
+#   net_forces: (N, 3) array of the net forces on them (None if the iteration cap was reached first)
+#   record:     The IterationRecord
+Frame = namedtuple('Frame', ['points', 'net_forces', 'record'])
+
 
 def clamp(minval, maxval, val):
     return minval if val < minval else (maxval if val > maxval else val)
 
 
-def new_point_location(alpha, point, net_force):
-    angle = alpha * net_force.norm()
-    axis = net_force.cross(point).normalized()
-    rot3 = Rot3(axis, angle)
+def new_point_location(alpha, point, net_force, max_angle=inf):
+    """Rotate point by alpha * |net_force|, or at most max_angle, about the axis net_force x point.
+    A point with no well-defined axis, such as one with no net force, is left where it is."""
+    angle = min(alpha * net_force.norm(), max_angle)
+    axis = net_force.cross(point)
+    if axis.norm() == 0:
+        return point
+    rot3 = Rot3(axis.normalized(), angle)
     result = rot3.rotate(point)
     if VERBOSE:
         print(f'    Moved point from {point} to {result}. Delta={result - point}')
     return result
 
 
+# ----------------------------------------
+# NumPy engine: points are held as an (N, 3) array of the backend's float_dtype.
+
+def points_to_array(points):
+    return np.array([(p.x, p.y, p.z) for p in points], dtype=float_dtype()).reshape(-1, 3)
+
+
+def array_to_points(arr):
+    return [Vec3(float(x), float(y), float(z)) for x, y, z in arr]
+
+
+def net_forces_array(alpha, points, chunk_size=256, kernel=DEFAULT_KERNEL):
+    """Vectorized equivalent of the force pass in SphereSprings.stabilize.
+    Returns an (N, 3) array holding the net force on each point, with the
+    component along the point removed, exactly as the scalar loop does.
+    Rows are processed in blocks of chunk_size, so temporaries are O(chunk_size * N).
+    kernel is the force law, one of those in sphere_kernels."""
+    points_count = len(points)
+    norm2s = np.einsum('ij,ij->i', points, points)
+    net_forces = np.empty_like(points)
+    for start in range(0, points_count, chunk_size):
+        stop = min(start + chunk_size, points_count)
+        block = points[start:stop]
+        dots = block @ points.T
+        _, weights = pair_weights(kernel, alpha, dots, norm2s[start:stop], norm2s)
+        weights[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        net_forces[start:stop] = weighted_forces(kernel, weights, dots, block, points, norm2s[start:stop], norm2s)
+    net_forces -= np.einsum('ij,ij->i', net_forces, points)[:, np.newaxis] * points
+    return net_forces
+
+
+def pair_force_sums(alpha, targets, sources, chunk_size=256, target_ids=None, source_ids=None, kernel=DEFAULT_KERNEL):
+    """The summed force on each point in targets from the points in sources, before the
+    tangential projection, as in net_forces_array. If target_ids and source_ids are given,
+    pairs with equal ids (a point and itself) are skipped."""
+    norm2s = np.einsum('ij,ij->i', sources, sources)
+    target_norm2s = np.einsum('ij,ij->i', targets, targets)
+    result = np.empty_like(targets)
+    for start in range(0, len(targets), chunk_size):
+        stop = min(start + chunk_size, len(targets))
+        block = targets[start:stop]
+        dots = block @ sources.T
+        _, weights = pair_weights(kernel, alpha, dots, target_norm2s[start:stop], norm2s)
+        if target_ids is not None:
+            weights[target_ids[start:stop, np.newaxis] == source_ids[np.newaxis, :]] = 0.0
+        result[start:stop] = weighted_forces(kernel, weights, dots, block, sources, target_norm2s[start:stop], norm2s)
+    return result
+
+
+def pair_energy(alpha, points, kernel=DEFAULT_KERNEL, chunk_size=256):
+    """The energy whose gradient is net_forces_array with the given kernel, for points on the unit sphere:
+    alpha times the sum over pairs of the kernel's energies."""
+    points_count = len(points)
+    norms = np.sqrt(np.einsum('ij,ij->i', points, points))
+    energy = 0.0
+    for start in range(0, points_count, chunk_size):
+        stop = min(start + chunk_size, points_count)
+        cos_angles = np.clip(points[start:stop] @ points.T / np.outer(norms[start:stop], norms), -1.0, 1.0)
+        pair_energies = kernel.energies(np.arccos(cos_angles))
+        pair_energies[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        energy += pair_energies.sum()
+    return alpha * energy / 2  # Each pair was counted twice
+
+
+def spring_energy(alpha, points, chunk_size=256):
+    """The energy whose gradient is net_forces_array, for points on the unit sphere.
+    After the tangential projection, the force on point n from point m is alpha * a * cos(a)
+    along the geodesic from n toward m, where a is the angle between them, so each pair
+    contributes -alpha * (a sin(a) + cos(a)), which is least at right angles.
+    Moving points against their net forces, as stabilize does, decreases it."""
+    return pair_energy(alpha, points, DEFAULT_KERNEL, chunk_size)
+
+
+def new_point_locations(alpha, points, net_forces, max_angle=inf):
+    """Vectorized new_point_location: rotate each point by alpha * |force|,
+    or at most max_angle, about the axis force x point (Rodrigues' formula).
+    alpha and max_angle may also be arrays, one per point. Points with no
+    well-defined axis are left where they are."""
+    angles = np.minimum(alpha * np.sqrt(np.einsum('ij,ij->i', net_forces, net_forces)), max_angle)
+    axes = np.cross(net_forces, points)
+    axis_norms = np.sqrt(np.einsum('ij,ij->i', axes, axes))
+    moving = axis_norms > 0
+    axes[moving] /= axis_norms[moving, np.newaxis]
+    angles[~moving] = 0.0
+    # The axis is perpendicular to the point, so the k (k . p) term of Rodrigues' formula vanishes.
+    return (np.cos(angles)[:, np.newaxis] * points
+            + np.sin(angles)[:, np.newaxis] * np.cross(axes, points))
+
+
 class SphereSprings:
     alpha = 0.25
     force_threshold = 10e-4
     movement_threshold = 10e-6
     radius = 1.0
     max_iter_count = 100
+    engine = None  # One of ENGINES; None means the backend's, 'scalar' for python and 'numpy' otherwise
+    chunk_size = 256  # Rows per block in the numpy and parallel engines
+    workers = None  # Processes used by the parallel engine; None means one per CPU
+    tile_count = DEFAULT_TILE_COUNT  # Units of work in the parallel engine; results depend on this, not on workers
+
+    opening_angle = DEFAULT_OPENING_ANGLE  # Accuracy of the tree engine; 0 is exact, larger is faster
+    leaf_size = DEFAULT_LEAF_SIZE  # Mean points per leaf cell in the tree engine
 
-    def __init__(self, points):
+    cache = None  # A sphere_cache.ResultCache consulted by stabilize, or None
+    neighbour_count = 16  # Nearest neighbours of each added or removed point relaxed by add_points and remove_points
+    kernel = DEFAULT_KERNEL  # The force law, one of those in sphere_kernels
+
+    ENGINES = ('scalar', 'numpy', 'parallel', 'tree')
+
+    def __init__(self, points, engine=None, observer=None, solver=None, kernel=None):
+        """observer, if given, is called with an IterationRecord after each stabilize iteration.
+        solver, if given, is one of the solvers in sphere_solvers, and decides how points move.
+        kernel, if given, is one of the force laws in sphere_kernels, in place of the springs."""
         self.points = points
+        self.observer = observer
+        self.solver = solver
+        self.iter_count = 0
+        self.stop_condition = None
+        self._force_cache = None
+        if engine is not None:
+            if engine not in SphereSprings.ENGINES:
+                raise ValueError(f'Unknown engine: {engine}')
+            self.engine = engine
+        elif self.engine is None:
+            self.engine = get_backend().engine
+        if kernel is not None:
+            self.kernel = kernel
+
+    @classmethod
+    def from_initializer(cls, name, points_count, seed=None, **kwargs):
+        """Start from points_count points made by one of the sphere_init.INITIALIZERS,
+        scaled to radius. Other keyword arguments are passed to the constructor."""
+        if name not in INITIALIZERS:
+            raise ValueError(f'Unknown initializer: {name}')
+        return cls(array_to_points(SphereSprings.radius * INITIALIZERS[name](points_count, seed)), **kwargs)
 
     def by_coords(self):
-        length = len(self.points)
-        return ([self.points[k].x for k in range(length)],
-                [self.points[k].y for k in range(length)],
-                [self.points[k].z for k in range(length)])
+        """Return the x, y and z coordinates of the points, as column views of one (N, 3) array."""
+        points = points_to_array(self.points)
+        return points[:, 0], points[:, 1], points[:, 2]
+
+    def stabilize(self, sink=None):
+        """Relax the points until one of the stopping conditions holds.
+        Afterwards, self.iter_count and self.stop_condition record how the run ended.
+        sink, if given, is passed to stabilize_iter.
+        If self.cache is set and there is no sink, a cached result of the same run is used instead,
+        in which case the observer is not called; otherwise the result is added to the cache."""
+        cache = self.cache if sink is None else None
+        if cache is not None:
+            key = cache.key(self._cache_params(), points_to_array(self.points))
+            cached = cache.get(key)
+            if cached is not None:
+                points, iter_count, stop_condition = cached
+                self.points = array_to_points(points)
+                self._stop(iter_count, stop_condition)
+                return
+        for _ in self._stabilize_iter(sink, frames=False):
+            pass
+        if cache is not None:
+            cache.put(key, points_to_array(self.points), self.iter_count, self.stop_condition)
+
+    def _cache_params(self):
+        """The settings that determine the result of stabilize, apart from the initial points."""
+        params = {name: getattr(SphereSprings, name)
+                  for name in ('alpha', 'force_threshold', 'movement_threshold', 'radius', 'max_iter_count')}
+        params['engine'] = self.engine
+        if self.engine != 'scalar':
+            params['chunk_size'] = self.chunk_size
+            if get_backend().name != DEFAULT_BACKEND:
+                params['backend'] = get_backend().name
+        if self.engine == 'parallel':
+            params['tile_count'] = self.tile_count  # The result does not depend on workers
+        if self.engine == 'tree':
+            params['opening_angle'] = self.opening_angle
+            params['leaf_size'] = self.leaf_size
+        if self.kernel != DEFAULT_KERNEL:
+            params['kernel'] = type(self.kernel).__name__
+            params.update({f'kernel.{name}': value for name, value in self.kernel.params().items()})
+        if self.solver is not None:
+            params['solver'] = type(self.solver).__name__
+            params.update({f'solver.{name}': getattr(self.solver, name) for name in self.solver.PARAMS})
+        return params
+
+    def stabilize_iter(self, sink=None):
+        """Return a generator that relaxes the points as stabilize does, yielding a Frame after each iteration.
+        If the generator is closed early, self.points holds the points reached, and self.stop_condition is None.
+        sink, if given, has an append method (such as trajectory.TrajectoryWriter.append) that is passed each
+        frame's points."""
+        return self._stabilize_iter(sink)
+
+    def _stabilize_iter(self, sink, frames=True):
+        """As stabilize_iter. If frames is false and there is no observer, it neither times the iterations nor
+        builds their records, and yields None in place of each Frame."""
+        if self.engine == 'scalar':
+            if self.solver is not None:
+                raise ValueError('Solvers require one of the array engines')
+            return self._stabilize_scalar(sink, frames)
+        return self._stabilize_numpy(sink, frames)
 
-    def stabilize(self):
+    def add_points(self, points):
+        """Add the given points, then relax them and their nearest neighbours.
+        The per-point forces are cached between calls, so each edit costs O(N k) for k moved points,
+        plus one full O(N^2) force pass whenever the points have changed otherwise (e.g. by stabilize)."""
+        positions, raw_forces = self._cached_forces()
+        added = points_to_array(points)
+        if len(added) == 0:
+            return
+        all_positions = np.concatenate([positions, added])
+        ids = np.arange(len(all_positions))
+        raw_forces = np.concatenate([
+            raw_forces + pair_force_sums(SphereSprings.alpha, positions, added, self.chunk_size, kernel=self.kernel),
+            pair_force_sums(SphereSprings.alpha, added, all_positions, self.chunk_size, ids[len(positions):], ids,
+                            self.kernel)])
+        active = self._neighbourhood(all_positions, ids[len(positions):])
+        self._relax(all_positions, raw_forces, active)
+
+    def remove_points(self, indices):
+        """Remove the points at the given indices, then relax the nearest neighbours of each.
+        As for lists, negative indices count from the end."""
+        positions, raw_forces = self._cached_forces()
+        removed = np.asarray(indices, dtype=np.int64).reshape(-1)
+        if len(removed) == 0:
+            return
+        if removed.min() < -len(positions) or removed.max() >= len(positions):
+            raise IndexError('Point index out of range')
+        removed = np.unique(removed % len(positions))
+        keep = np.ones(len(positions), dtype=bool)
+        keep[removed] = False
+        removed_positions = positions[removed]
+        positions = positions[keep]
+        raw_forces = raw_forces[keep] - pair_force_sums(SphereSprings.alpha, positions, removed_positions, self.chunk_size,
+                                                        kernel=self.kernel)
+        active = self._neighbourhood(positions, np.empty(0, dtype=np.int64), removed_positions)
+        self._relax(positions, raw_forces, active)
+
+    def _cached_forces(self):
+        """Return the points as an array and the summed forces on them before the tangential projection,
+        recomputing the forces if the points, alpha or the kernel have changed since they were cached.
+        The points are compared by value, so edits made in place to self.points are noticed too."""
+        positions = points_to_array(self.points)
+        cache = self._force_cache
+        if (cache is None or cache[0] != (SphereSprings.alpha, self.kernel) or cache[1].dtype != positions.dtype
+                or not np.array_equal(cache[1], positions)):
+            ids = np.arange(len(positions))
+            raw_forces = pair_force_sums(SphereSprings.alpha, positions, positions, self.chunk_size, ids, ids, self.kernel)
+            cache = ((SphereSprings.alpha, self.kernel), positions, raw_forces)
+            self._force_cache = cache
+        return cache[1], cache[2]
+
+    def _neighbourhood(self, positions, indices, centers=None):
+        """Return the sorted indices of the given points together with the neighbour_count points
+        nearest (by angle) to each center, where the centers default to the given points."""
+        if centers is None:
+            centers = positions[indices]
+        units = positions / np.sqrt(np.einsum('ij,ij->i', positions, positions))[:, np.newaxis]
+        nearest = [indices]
+        k = min(SphereSprings.neighbour_count, len(positions))
+        for center in centers:
+            if k > 0:
+                nearest.append(np.argpartition(-(units @ center), k - 1)[:k])
+        return np.unique(np.concatenate(nearest))
+
+    def _relax(self, positions, raw_forces, active):
+        """Move only the active points, with the same update and stopping conditions as stabilize,
+        keeping raw_forces up to date for every point as they move."""
+        iter_count = 0
+        observer = self.observer
+        alpha = SphereSprings.alpha
+        kernel = self.kernel
+        step, max_angle = kernel.fixed_step(alpha, len(positions))
+        others = np.ones(len(positions), dtype=bool)
+        others[active] = False
+        ids = np.arange(len(positions))
+        try:
+            while True:
+                if iter_count >= SphereSprings.max_iter_count:
+                    self._stop(iter_count, STOP_MAX_ITER_COUNT)
+                    if observer is not None:
+                        observer(IterationRecord(iter_count, None, None, STOP_MAX_ITER_COUNT, 0.0, 0.0))
+                    return
+
+                if observer is not None:
+                    start_time = perf_counter()
+                old = positions[active]
+                net_forces = raw_forces[active]
+                net_forces = net_forces - np.einsum('ij,ij->i', net_forces, old)[:, np.newaxis] * old
+                max_force = np.sqrt(np.einsum('ij,ij->i', net_forces, net_forces)).max(initial=0.0)
+                if observer is not None:
+                    force_time = perf_counter() - start_time
+                if max_force < tolerance(SphereSprings.force_threshold):
+                    self._stop(iter_count, STOP_FORCE_THRESHOLD)
+                    if observer is not None:
+                        observer(IterationRecord(iter_count, max_force, None, STOP_FORCE_THRESHOLD, force_time, 0.0))
+                    return
+
+                if observer is not None:
+                    start_time = perf_counter()
+                new = new_point_locations(step, old, net_forces, max_angle)
+                sum_movement_norms = np.linalg.norm(old - new, axis=1).sum()
+                still = sum_movement_norms < tolerance(SphereSprings.movement_threshold)
+                stop_condition = STOP_MOVEMENT_THRESHOLD if still else None
+                if stop_condition is None:
+                    new_positions = positions.copy()
+                    new_positions[active] = new
+                    new_raw_forces = raw_forces.copy()
+                    new_raw_forces[others] += (
+                        pair_force_sums(alpha, positions[others], new, self.chunk_size, kernel=kernel)
+                        - pair_force_sums(alpha, positions[others], old, self.chunk_size, kernel=kernel))
+                    new_raw_forces[active] = pair_force_sums(alpha, new, new_positions, self.chunk_size, active, ids,
+                                                             kernel)
+                if observer is not None:
+                    update_time = perf_counter() - start_time
+                    observer(IterationRecord(iter_count, max_force, sum_movement_norms, stop_condition,
+                                             force_time, update_time))
+                if stop_condition is not None:
+                    self._stop(iter_count, stop_condition)
+                    return
+
+                positions, raw_forces = new_positions, new_raw_forces
+                iter_count += 1
+        finally:
+            self.points = array_to_points(positions)
+            self._force_cache = ((alpha, kernel), positions, raw_forces)
+
+    def _stop(self, iter_count, stop_condition):
+        self.iter_count = iter_count
+        self.stop_condition = stop_condition
+
+    def _net_forces_engine(self, points_count):
+        """Return a context manager yielding a function (alpha, points) -> net forces."""
+        if self.engine == 'parallel':
+            return ParallelForces(points_count, self.workers, self.tile_count, self.chunk_size, self.kernel)
+        if self.engine == 'tree':
+            return nullcontext(TreeForces(points_count, self.opening_angle, self.leaf_size, self.kernel))
+        return nullcontext(partial(net_forces_array, chunk_size=self.chunk_size, kernel=self.kernel))
+
+    def _emit(self, timed, sink, points, net_forces, *record_fields):
+        """Pass an iteration's record to the observer and its points to the sink, and return its Frame.
+        Unless timed, no one wants the record, so it is not built and the result is None."""
+        if not timed:
+            if sink is not None:
+                sink.append(points)
+            return None
+        record = IterationRecord(*record_fields)
+        if self.observer is not None:
+            self.observer(record)
+        if sink is not None:
+            sink.append(points)
+        return Frame(points, net_forces, record)
+
+    def _stabilize_numpy(self, sink, frames=True):
+        iter_count = 0
+        timed = frames or self.observer is not None
+        force_time = update_time = 0.0
+        solver = self.solver
+        points = points_to_array(self.points)
+        force_threshold = tolerance(SphereSprings.force_threshold)
+        movement_threshold = tolerance(SphereSprings.movement_threshold)
+        step, max_angle = self.kernel.fixed_step(SphereSprings.alpha, len(points))
+        self._stop(0, None)
+        if solver is not None:
+            energy_fn = partial(pair_energy, SphereSprings.alpha, kernel=self.kernel, chunk_size=self.chunk_size)
+            solver.reset(step, energy_fn)
+        with self._net_forces_engine(len(points)) as net_forces_fn:
+            try:
+                while True:
+                    if iter_count >= SphereSprings.max_iter_count:
+                        if VERBOSE:
+                            print(f'stabilize: Exit condition 1: iter_count={iter_count} >= {SphereSprings.max_iter_count}')
+                        self._stop(iter_count, STOP_MAX_ITER_COUNT)
+                        yield self._emit(timed, sink, points, None, iter_count, None, None, STOP_MAX_ITER_COUNT,
+                                         0.0, 0.0)
+                        return  # Stopping condition #1
+
+                    if timed:
+                        start_time = perf_counter()
+                    net_forces = net_forces_fn(SphereSprings.alpha, points)
+                    max_force = np.sqrt(np.einsum('ij,ij->i', net_forces, net_forces)).max()
+                    if timed:
+                        force_time = perf_counter() - start_time
+                    if max_force < force_threshold:
+                        if VERBOSE:
+                            print(f'stabilize: Exit condition 2: max_force={max_force} < {force_threshold}')
+                        self._stop(iter_count, STOP_FORCE_THRESHOLD)
+                        yield self._emit(timed, sink, points, net_forces, iter_count, max_force, None, STOP_FORCE_THRESHOLD,
+                                         force_time, 0.0)
+                        return  # Stopping condition #2
+
+                    if timed:
+                        start_time = perf_counter()
+                    if solver is None:
+                        new_points = new_point_locations(step, points, net_forces, max_angle)
+                    else:
+                        new_points = solver.step(points, net_forces)
+                    sum_movement_norms = np.linalg.norm(points - new_points, axis=1).sum()
+                    stop_condition = STOP_MOVEMENT_THRESHOLD if sum_movement_norms < movement_threshold else None
+                    if timed:
+                        update_time = perf_counter() - start_time
+                    if stop_condition is not None:
+                        if VERBOSE:
+                            exit_expr = f'sum_movement_norms={sum_movement_norms} < {movement_threshold}'
+                            print(f'stabilize: Exit condition 3: {exit_expr}')
+                        self._stop(iter_count, stop_condition)
+                    yield self._emit(timed, sink, points, net_forces, iter_count, max_force, sum_movement_norms,
+                                     stop_condition, force_time, update_time)
+                    if stop_condition is not None:
+                        return  # Stopping condition #3
+
+                    points = new_points
+                    iter_count += 1
+                    self.iter_count = iter_count
+            finally:
+                self.points = array_to_points(points)
+
+    def _stabilize_scalar(self, sink, frames=True):
         iter_count = 0
+        timed = frames or self.observer is not None
+        arrays = frames or sink is not None  # Whether anyone wants the points and forces as arrays
+        force_time = update_time = 0.0
         points_count = len(self.points)
         radius = SphereSprings.radius
+        kernel = self.kernel
+        source_frame = kernel.frame == 'source'
+        step, max_angle = kernel.fixed_step(SphereSprings.alpha, points_count)
+        self._stop(0, None)
         while True:
             if VERBOSE:
                 print(f'stabilize loop iter count=({iter_count}): Sum of points = {Vec3.sum(self.points)}')
@@ -54,8 +509,13 @@ class SphereSprings:
                 if VERBOSE:
                     exit_expr = f'iter_count={iter_count} >= {SphereSprings.max_iter_count}'
                     print(f'stabilize: Exit condition 1: {exit_expr}')
+                self._stop(iter_count, STOP_MAX_ITER_COUNT)
+                yield self._emit(timed, sink, points_to_array(self.points) if arrays else None, None,
+                                 iter_count, None, None, STOP_MAX_ITER_COUNT, 0.0, 0.0)
                 return  # Stopping condition #1
 
+            if timed:
+                start_time = perf_counter()
             # Compute forces: key (i, j) references the force exerted by point i on point j
             forces: Map[Pair[Int], Vec3] = { (i, j) : Vec3() for i in range(points_count) for j in range(points_count) }
             for i in range(points_count):
@@ -67,8 +527,15 @@ class SphereSprings:
                     perp = pi.cross(pj)
                     dir_i = pi.cross(perp)
                     dir_j = perp.cross(pj)
-                    forces[(i, j)] += SphereSprings.alpha * angle_ij * dir_i.normalized()
-                    forces[(j, i)] += SphereSprings.alpha * angle_ij * dir_j.normalized()
+                    magnitude = SphereSprings.alpha * float(kernel.magnitudes(angle_ij))
+                    if magnitude == 0.0:
+                        continue
+                    if source_frame:
+                        forces[(i, j)] += magnitude * dir_i.normalized()
+                        forces[(j, i)] += magnitude * dir_j.normalized()
+                    else:  # Along the tangent at each point, toward the other
+                        forces[(i, j)] -= magnitude * dir_j.normalized()
+                        forces[(j, i)] -= magnitude * dir_i.normalized()
 
             def net_force(fs):
                 return Vec3.sum(fs)
@@ -87,35 +554,135 @@ class SphereSprings:
                 print()
 
             max_force = max([net_forces[k].norm() for k in range(points_count)])
+            if timed:
+                force_time = perf_counter() - start_time
             if max_force < SphereSprings.force_threshold:
                 if VERBOSE:
                     exit_expr = f'max_force={max_force} >= {SphereSprings.force_threshold}'
                     print(f'stabilize: Exit condition 2: {exit_expr}')
+                self._stop(iter_count, STOP_FORCE_THRESHOLD)
+                frame_points, frame_forces = ((points_to_array(self.points), points_to_array(net_forces)) if arrays
+                                              else (None, None))
+                yield self._emit(timed, sink, frame_points, frame_forces, iter_count, max_force, None,
+                                 STOP_FORCE_THRESHOLD, force_time, 0.0)
                 return  # Stopping condition #2
 
-            new_points = [new_point_location(SphereSprings.alpha, points[k], net_forces[k]) for k in range(len(self.points))]
+            if timed:
+                start_time = perf_counter()
+            new_points = [new_point_location(step, self.points[k], net_forces[k], max_angle) for k in range(len(self.points))]
             movement_norms = [(self.points[k] - new_points[k]).norm() for k in range(points_count)]
             sum_movement_norms = sum(movement_norms)
-            if sum_movement_norms < SphereSprings.movement_threshold:
+            stop_condition = STOP_MOVEMENT_THRESHOLD if sum_movement_norms < SphereSprings.movement_threshold else None
+            if timed:
+                update_time = perf_counter() - start_time
+            if stop_condition is not None:
                 if VERBOSE:
                     exit_expr = f'sum_movement_norms={sum_movement_norms} < {SphereSprings.movement_threshold}'
                     print(f'stabilize: Exit condition 3: {exit_expr}')
+                self._stop(iter_count, stop_condition)
+            frame_points, frame_forces = ((points_to_array(self.points), points_to_array(net_forces)) if arrays
+                                          else (None, None))
+            yield self._emit(timed, sink, frame_points, frame_forces, iter_count, max_force, sum_movement_norms,
+                             stop_condition, force_time, update_time)
+            if stop_condition is not None:
                 return  # Stopping condition #3
 
             self.points = new_points
             iter_count += 1
+            self.iter_count = iter_count
 
 
-if __name__ == '__main__':
-    points_count = 50
-    xs = normal(0, 1, points_count)
-    ys = normal(0, 1, points_count)
-    zs = normal(0, 1, points_count)
-    points = [Vec3(xs[k], ys[k], zs[k]) for k in range(points_count)]
-    springs = SphereSprings(points)
-    springs.stabilize()
-
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
-    ax.scatter(*springs.by_coords(), color='k')
+def plot(springs_list):
+    """Show each SphereSprings' points in its own 3D scatter plot."""
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D  # Registers the 3d projection
+
+    for springs in springs_list:
+        fig = plt.figure()
+        ax = fig.add_subplot(111, projection='3d')
+        ax.scatter(*springs.by_coords(), color='k')
     plt.show()
+
+
+def stabilize_one(points_count, seed, initializer, engine, kernel=DEFAULT_KERNEL, backend=DEFAULT_BACKEND,
+                  solver=None):
+    """Stabilize one point set; return (final points array, metrics dict).
+    The metrics are computed in float64 whatever the backend."""
+    start_time = perf_counter()
+    with use_backend(backend):
+        springs = SphereSprings.from_initializer(initializer, points_count, seed, engine=engine, kernel=kernel,
+                                                 solver=solver)
+        springs.stabilize()
+        points = points_to_array(springs.points)
+    net_forces = net_forces_array(SphereSprings.alpha, points.astype(np.float64), kernel=kernel)
+    quality = sphere_metrics(points)
+    metrics = {
+        'points_count': points_count,
+        'seed': seed,
+        'initializer': initializer,
+        'engine': engine,
+        'backend': backend,
+        'kernel': repr(kernel),
+        'solver': None if solver is None else type(solver).__name__,
+        'iter_count': springs.iter_count,
+        'stop_condition': springs.stop_condition,
+        'max_force': float(np.sqrt(np.einsum('ij,ij->i', net_forces, net_forces)).max(initial=0.0)),
+        'energy': float(pair_energy(SphereSprings.alpha, points.astype(np.float64), kernel)),
+        'min_separation': quality.min_separation,
+        'nearest_mean': quality.nearest_mean,
+        'nearest_std': quality.nearest_std,
+        'coulomb_energy': quality.riesz_energy,
+        'seconds': perf_counter() - start_time,
+    }
+    return points, metrics
+
+
+def main(argv=None):
+    from sphere_solvers import SOLVERS  # Imported here, since sphere_solvers imports this module
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50], help='Point counts to stabilize')
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0], help='Seeds for the initializer')
+    parser.add_argument('--initializer', choices=sorted(INITIALIZERS), default='random')
+    parser.add_argument('--engine', choices=SphereSprings.ENGINES, default='numpy')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=DEFAULT_BACKEND,
+                        help='Precision of the array engines (see backend)')
+    parser.add_argument('--kernel', choices=sorted(KERNELS), default='spring', help='Force law (see sphere_kernels)')
+    parser.add_argument('--riesz-s', type=float, default=2.0, help='Exponent s of the riesz kernel')
+    parser.add_argument('--cutoff', type=float, help='Angle (radians) beyond which points exert no force')
+    parser.add_argument('--solver', choices=sorted(SOLVERS),
+                        help='Solver for the array engines (see sphere_solvers; default: the fixed step)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU; 1 runs in this process)')
+    parser.add_argument('--output-dir', help='Write N<size>_seed<seed>.npy point arrays and metrics.jsonl here, '
+                                             'rather than metrics to stdout')
+    parser.add_argument('--plot', action='store_true', help='Plot the stabilized points')
+    args = parser.parse_args(argv)
+
+    kernel = (KERNELS[args.kernel](args.riesz_s, args.cutoff) if args.kernel == 'riesz'
+              else KERNELS[args.kernel](cutoff=args.cutoff))
+    solver = SOLVERS[args.solver]() if args.solver else None
+    tasks = [(points_count, seed, args.initializer, args.engine, kernel, args.backend, solver)
+             for points_count in args.sizes for seed in args.seeds]
+    if args.workers == 1:
+        results = [stabilize_one(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(args.workers) as executor:
+            results = list(executor.map(stabilize_one, *zip(*tasks)))
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        with open(os.path.join(args.output_dir, 'metrics.jsonl'), 'w') as f:
+            for points, metrics in results:
+                np.save(os.path.join(args.output_dir, f'N{metrics["points_count"]}_seed{metrics["seed"]}.npy'), points)
+                f.write(json.dumps(metrics) + '\n')
+    else:
+        for _, metrics in results:
+            print(json.dumps(metrics))
+
+    if args.plot:
+        plot([SphereSprings(array_to_points(points)) for points, _ in results])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_springs import (STOP_MAX_ITER_COUNT, SphereSprings, array_to_points, main, net_forces_array,
+                            pair_force_sums, points_to_array)
+from vec3 import Vec3
+
+
+def random_points(points_count, seed=1):
+    return array_to_points(np.random.default_rng(seed).normal(0, 1, (points_count, 3)))
+
+
+class SphereSpringsTest(unittest.TestCase):
+    def test_engines_agree(self):
+        # The relaxation is chaotic over long runs, so compare a short one.
+        points = random_points(12)
+        with patch.object(SphereSprings, 'max_iter_count', 10):
+            scalar = SphereSprings(list(points))
+            scalar.stabilize()
+            for engine in ('numpy', 'parallel'):
+                vectorized = SphereSprings(list(points), engine=engine)
+                vectorized.workers = 2
+                vectorized.stabilize()
+                self.assertTrue(np.allclose(points_to_array(scalar.points), points_to_array(vectorized.points)))
+
+    def test_by_coords(self):
+        points = random_points(5)
+        xs, ys, zs = SphereSprings(points).by_coords()
+        self.assertTrue(np.array_equal(points_to_array(points), np.stack([xs, ys, zs], axis=1)))
+        self.assertIs(xs.base, zs.base)
+
+    def test_chunking(self):
+        points = points_to_array(random_points(37))
+        expected = net_forces_array(SphereSprings.alpha, points, chunk_size=64)
+        actual = net_forces_array(SphereSprings.alpha, points, chunk_size=5)
+        self.assertTrue(np.allclose(expected, actual))
+
+    def test_observer(self):
+        for engine in SphereSprings.ENGINES:
+            records = []
+            springs = SphereSprings(random_points(8), engine=engine, observer=records.append)
+            with patch.object(SphereSprings, 'max_iter_count', 3):
+                springs.stabilize()
+            self.assertEqual([0, 1, 2, 3], [r.iteration for r in records])
+            self.assertEqual([None, None, None, STOP_MAX_ITER_COUNT], [r.stop_condition for r in records])
+            self.assertEqual(STOP_MAX_ITER_COUNT, springs.stop_condition)
+            self.assertEqual(3, springs.iter_count)
+            for r in records[:-1]:
+                self.assertGreater(r.max_force, 0.0)
+                self.assertGreater(r.sum_movement, 0.0)
+                self.assertGreaterEqual(r.force_time, 0.0)
+                self.assertGreaterEqual(r.update_time, 0.0)
+
+    def test_stabilize_iter(self):
+        for engine in ('scalar', 'numpy'):
+            springs = SphereSprings(random_points(8), engine=engine)
+            with patch.object(SphereSprings, 'max_iter_count', 10):
+                frames = springs.stabilize_iter()
+                for frame in frames:
+                    self.assertEqual((8, 3), frame.points.shape)
+                    self.assertEqual((8, 3), frame.net_forces.shape)
+                    if frame.record.iteration == 2:
+                        break
+                frames.close()
+            self.assertIsNone(springs.stop_condition)
+            self.assertEqual(2, springs.iter_count)
+            self.assertTrue(np.allclose(frame.points, points_to_array(springs.points)))
+
+    def test_scalar_frames_only_when_consumed(self):
+        # stabilize with no sink has no use for the frames' arrays, so the scalar engine does not build them.
+        springs = SphereSprings(random_points(8), engine='scalar', observer=lambda record: None)
+        to_array = patch('sphere_springs.points_to_array', side_effect=points_to_array)
+        with patch.object(SphereSprings, 'max_iter_count', 3), to_array as to_array:
+            springs.stabilize()
+            self.assertEqual(0, to_array.call_count)
+            springs.stabilize(sink=[])
+            self.assertGreater(to_array.call_count, 0)
+
+    def test_untimed_without_observer(self):
+        # With no observer, stabilize neither times the iterations nor builds their records.
+        clock = patch('sphere_springs.perf_counter', side_effect=AssertionError)
+        records = patch('sphere_springs.IterationRecord', side_effect=AssertionError)
+        with patch.object(SphereSprings, 'max_iter_count', 3), clock, records:
+            for engine in ('scalar', 'numpy'):
+                sink = []
+                SphereSprings(random_points(8), engine=engine).stabilize(sink)
+                self.assertEqual(4, len(sink))
+
+    def test_pair_force_sums(self):
+        points = points_to_array(random_points(20))
+        ids = np.arange(len(points))
+        raw_forces = pair_force_sums(SphereSprings.alpha, points, points, 7, ids, ids)
+        raw_forces -= np.einsum('ij,ij->i', raw_forces, points)[:, np.newaxis] * points
+        self.assertTrue(np.allclose(net_forces_array(SphereSprings.alpha, points), raw_forces))
+
+    def assert_cache_current(self, springs):
+        positions, raw_forces = springs._force_cache[1:]
+        ids = np.arange(len(positions))
+        self.assertTrue(np.array_equal(points_to_array(springs.points), positions))
+        self.assertTrue(np.allclose(pair_force_sums(SphereSprings.alpha, positions, positions, 256, ids, ids), raw_forces))
+
+    def test_add_points(self):
+        points = points_to_array(random_points(60))
+        points /= np.linalg.norm(points, axis=1)[:, np.newaxis]
+        springs = SphereSprings(array_to_points(points), engine='numpy')
+        with patch.object(SphereSprings, 'max_iter_count', 5), patch.object(SphereSprings, 'neighbour_count', 6):
+            springs.add_points([Vec3(0.0, 0.0, 1.0), Vec3(1.0, 0.0, 0.0)])
+        self.assertEqual(62, len(springs.points))
+        self.assert_cache_current(springs)
+        # Only the new points and their neighbours move.
+        moved = np.any(points_to_array(springs.points)[:60] != points, axis=1)
+        self.assertGreater(moved.sum(), 0)
+        self.assertLessEqual(moved.sum(), 12)
+
+    def test_remove_points(self):
+        springs = SphereSprings(random_points(30), engine='numpy')
+        with patch.object(SphereSprings, 'max_iter_count', 5):
+            springs.remove_points([3, 0, 29])
+            self.assert_cache_current(springs)
+            self.assertEqual(27, len(springs.points))
+            springs.add_points(random_points(2, seed=9))
+            self.assert_cache_current(springs)
+            self.assertEqual(29, len(springs.points))
+        with self.assertRaises(IndexError):
+            springs.remove_points([29])
+        with self.assertRaises(IndexError):
+            springs.remove_points([-30])
+        # Negative indices count from the end, and may name a point twice.
+        expected = points_to_array(springs.points)[[0, 2, 3]]
+        with patch.object(SphereSprings, 'max_iter_count', 0):
+            springs.remove_points([1, -1, 28])
+        self.assertEqual(27, len(springs.points))
+        self.assertTrue(np.array_equal(expected, points_to_array(springs.points)[:3]))
+
+    def test_points_edited_in_place(self):
+        springs = SphereSprings(random_points(30), engine='numpy')
+        with patch.object(SphereSprings, 'max_iter_count', 5):
+            springs.add_points(random_points(1, seed=9))
+            springs.points[4] = Vec3(0.0, 0.0, 1.0)
+            springs.points[5].x += 0.5
+            springs._cached_forces()
+            self.assert_cache_current(springs)
+            springs.remove_points([0])
+            self.assert_cache_current(springs)
+
+    def test_lightweight_import(self):
+        code = 'import sys, sphere_springs; print("matplotlib" in sys.modules)'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        self.assertEqual('False', output.strip())
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory, patch.object(SphereSprings, 'max_iter_count', 5):
+            self.assertEqual(0, main(['--sizes', '6', '8', '--seeds', '0', '1', '--workers', '1',
+                                      '--output-dir', directory]))
+            with open(os.path.join(directory, 'metrics.jsonl')) as f:
+                metrics = [json.loads(line) for line in f]
+            self.assertEqual([(6, 0), (6, 1), (8, 0), (8, 1)], [(m['points_count'], m['seed']) for m in metrics])
+            self.assertEqual((8, 3), np.load(os.path.join(directory, 'N8_seed1.npy')).shape)
+            self.assertEqual(0, main(['--sizes', '6', '--workers', '1', '--kernel', 'coulomb', '--solver', 'lbfgs',
+                                      '--output-dir', directory]))
+            with open(os.path.join(directory, 'metrics.jsonl')) as f:
+                self.assertEqual('LBFGSSolver', json.loads(f.readline())['solver'])
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            SphereSprings([], engine='abacus')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,26 @@
 
 import unittest
 
+from backend_test import BackendTest
+from bench_test import BenchTest
+from geom_io_test import GeomIOTest
+from quat_array_test import QuatArrayTest
 from quat_test import QuatTest
+from rot3_array_test import Rot3ArrayTest
 from rot3_test import Rot3Test
+from rotation_track_test import RotationTrackTest
+from sphere_batch_test import SphereBatchTest
+from sphere_cache_test import SphereCacheTest
+from sphere_index_test import SphereIndexTest
+from sphere_init_test import SphereInitTest
+from sphere_kernels_test import SphereKernelsTest
+from sphere_metrics_test import SphereMetricsTest
+from sphere_parallel_test import SphereParallelTest
+from sphere_solvers_test import SphereSolversTest
+from sphere_springs_test import SphereSpringsTest
+from tolerance_test import ToleranceTest
+from trajectory_test import TrajectoryTest
+from vec3_array_test import Vec3ArrayTest
 from vec3_test import Vec3Test
 
 
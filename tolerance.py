@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+"""Approximate comparisons of scalars, vectors and quaternions, one at a time or in arrays.
+
+Values may be floats, Vec3s, Quats, Vec3Arrays, QuatArrays, lists of any of
+these, or NumPy arrays. Vectors and quaternions are compared by the norm of
+their difference, so comparing arrays of them gives one result per row;
+pass axis to treat an axis of a plain array as their components. A real
+number compared with a Quat is a quaternion with only a real part. Results are
+bools for single values and bool arrays otherwise:
+
+    eq_approx(Vec3(1, 0, 0), XHAT)                 # True
+    eq_approx(expected_vec3s, actual_vec3_array)    # array([ True,  True, ...])
+    eq_approx(a, b, eps=0.0, ulps=4)                # Within 4 units in the last place
+
+Two values are equal if any of the tests given holds: their difference is
+less than eps, at most rel times the larger of their norms, or (componentwise)
+at most ulps representable floats apart. eps defaults to EPSILON, scaled to
+the backend's precision. is_zero_approx only has eps, since zero has no ULPs.
+"""
+
+from math import fabs
+from numbers import Real
+from operator import attrgetter
+
+import numpy as np
+
+from backend import tolerance
+
+
+EPSILON = 10E-6  # Scaled to the backend's precision when eps is not given
+
+# The norm of a single value, by type. Vec3 and Quat are added by _add_geometry_types.
+_norms = {float: fabs, int: fabs}
+
+# Functions making a real number into a value of a type, by type, for types whose difference with a real number
+# changes only their real part. Quat is added by _add_geometry_types.
+_from_reals = {}
+
+# Functions returning a value's components as an array, and whether its last axis holds a vector or
+# quaternion, by type. The geometry types are added by _add_geometry_types.
+_components = {}
+
+
+def _add_geometry_types():
+    # Imported here, since quat imports this module.
+    from quat import Quat
+    from quat_array import QuatArray
+    from vec3 import Vec3
+    from vec3_array import Vec3Array
+
+    _norms.update({Vec3: Vec3.norm, Quat: Quat.norm})
+    _from_reals[Quat] = lambda r: Quat(float(r), 0.0, 0.0, 0.0)
+    _components.update({Vec3Array: lambda vs: (vs.data, True), QuatArray: lambda qs: (qs.data, True)})
+    for cls, fields in ((Vec3, Vec3.__slots__), (Quat, Quat.__slots__)):
+        get = attrgetter(*fields)
+        _components[cls] = lambda x, get=get: (np.array(get(x)), True)
+        _components[(list, cls)] = _components[(tuple, cls)] = lambda xs, get=get: (
+            np.array([get(x) for x in xs]), True)
+
+
+def _as_components(x, axis):
+    """Return x as an array, and the axis of its components, if any."""
+    key = type(x)
+    if key in (list, tuple) and len(x) > 0:
+        key = (key, type(x[0]))
+    to_components = _components.get(key)
+    if to_components is None:
+        return np.asarray(x), axis
+    values, has_components = to_components(x)
+    return values, (-1 if has_components else axis)
+
+
+def _promote(x, other):
+    """x as a value of other's type, if x is a real number and other's type has a real part; otherwise x."""
+    from_real = _from_reals.get(type(other))
+    return from_real(x) if from_real is not None and isinstance(x, Real) else x
+
+
+def _norm(values, axis):
+    return np.abs(values) if axis is None else np.sqrt(np.sum(values * values, axis=axis))
+
+
+def _result(matches):
+    return bool(matches) if np.ndim(matches) == 0 else matches
+
+
+def is_zero_approx(x, eps=None, axis=None):
+    """Whether x (or, for an array, each of its values) has norm less than eps."""
+    if eps is None:
+        eps = tolerance(EPSILON)
+    if not _components:
+        _add_geometry_types()
+    norm = _norms.get(type(x))
+    if norm is not None:
+        return norm(x) < eps
+    values, axis = _as_components(x, axis)
+    return _result(_norm(values, axis) < eps)
+
+
+def eq_approx(x, y, eps=None, rel=0.0, ulps=None, axis=None):
+    """Whether x and y (or, for arrays, each pair of their values, broadcast together) are approximately equal:
+    their difference is less than eps, or at most rel times the larger norm, or at most ulps ULPs in each component."""
+    if eps is None:
+        eps = tolerance(EPSILON)
+    if not _components:
+        _add_geometry_types()
+    x, y = _promote(x, y), _promote(y, x)
+    norm = _norms.get(type(x))
+    if norm is not None and type(y) is type(x) and not rel and ulps is None:
+        return norm(x - y) < eps
+    xs, x_axis = _as_components(x, axis)
+    ys, y_axis = _as_components(y, axis)
+    axis = x_axis if x_axis is not None else y_axis
+    with np.errstate(invalid='ignore'):
+        matches = _norm(xs - ys, axis) < eps
+        if rel:
+            matches |= _norm(xs - ys, axis) <= rel * np.maximum(_norm(xs, axis), _norm(ys, axis))
+    if ulps is not None:
+        within = ulp_distance(xs, ys) <= ulps
+        matches |= within if axis is None else np.all(within, axis=axis)
+    return _result(matches)
+
+
+_ORDERED_INTS = {np.dtype(np.float64): np.uint64, np.dtype(np.float32): np.uint32, np.dtype(np.float16): np.uint16}
+
+
+def ulp_distance(x, y):
+    """The number of representable floats from x to y, elementwise, in the precision of x and y together.
+    +0.0 and -0.0 are the same; NaNs are the largest distance from everything."""
+    dtype = np.result_type(np.asarray(x).dtype, np.asarray(y).dtype, np.float16)
+    uint = _ORDERED_INTS[dtype]
+    bits = np.iinfo(uint).bits
+    sign = uint(1 << (bits - 1))
+
+    def ordered(values):
+        # Reinterpret the floats as unsigned integers that increase with the floats: negative floats count down from
+        # the sign bit as their magnitude grows, and positive floats count up from it.
+        ints = np.asarray(values, dtype=dtype).view(uint)
+        magnitudes = ints & uint(sign - uint(1))
+        return np.where((ints & sign) != 0, sign - magnitudes, sign | magnitudes)
+
+    a, b = ordered(x), ordered(y)
+    nans = np.isnan(np.asarray(x, dtype=dtype)) | np.isnan(np.asarray(y, dtype=dtype))
+    return np.where(nans, np.iinfo(uint).max, np.where(a > b, a - b, b - a))
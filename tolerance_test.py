@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import unittest
+
+import numpy as np
+
+from backend import use_backend
+from quat import Quat, QIHAT, QRHAT
+from quat_array import QuatArray
+from tolerance import eq_approx, is_zero_approx, ulp_distance
+from vec3 import Vec3, XHAT, YHAT
+from vec3_array import Vec3Array
+
+
+class ToleranceTest(unittest.TestCase):
+    def test_single_values(self):
+        self.assertIs(True, eq_approx(1.0, 1.0 + 1e-7))
+        self.assertIs(False, eq_approx(1.0, 1.0 + 1e-4))
+        self.assertIs(True, eq_approx(XHAT, Vec3(1.0, 1e-7, 0.0)))
+        self.assertIs(True, eq_approx(QRHAT, Quat(1.0, 0.0, 0.0, 1e-7)))
+        self.assertIs(True, is_zero_approx(Vec3(1e-7, 0.0, 0.0)))
+        self.assertIs(True, is_zero_approx(np.float32(1e-7)))
+        # eps applies to vectors and quaternions too.
+        self.assertFalse(is_zero_approx(Vec3(1e-7, 0.0, 0.0), eps=1e-8))
+        self.assertFalse(eq_approx(QRHAT, Quat(1.0, 0.0, 0.0, 1e-7), eps=1e-8))
+        self.assertTrue(eq_approx(Vec3(1.0, 2.0, 3.0), Vec3(1.1, 2.0, 3.0), eps=0.2))
+
+    def test_quat_and_real(self):
+        # A real number is a quaternion with only a real part.
+        self.assertIs(True, eq_approx(Quat(2.0, 0.0, 0.0, 0.0), 2.0))
+        self.assertIs(True, eq_approx(2, Quat(2.0, 1e-7, 0.0, 0.0)))
+        self.assertIs(False, eq_approx(Quat(2.0, 1.0, 0.0, 0.0), 2.0))
+        self.assertIs(True, eq_approx(Quat(2.0, 0.0, 0.0, 0.0), np.float32(2.0), eps=0.0, ulps=1))
+
+    def test_arrays(self):
+        vs = [Vec3(1.0, 2.0, 3.0), XHAT, YHAT]
+        nudged = Vec3Array(vs) + Vec3Array([(0.0, 0.0, 0.0), (1e-7, 0.0, 0.0), (1e-3, 0.0, 0.0)])
+        self.assertEqual([True, True, False], eq_approx(vs, nudged).tolist())
+        self.assertEqual([True, True, False], eq_approx(nudged, vs).tolist())
+        self.assertEqual([True, False], eq_approx(QuatArray([QIHAT, QRHAT]), QIHAT).tolist())
+        self.assertEqual([True, False], is_zero_approx(QuatArray([Quat(1e-7, 0, 0, 0), QIHAT])).tolist())
+        # Plain arrays compare elementwise, or as rows of components along axis.
+        values = np.array([[0.0, 0.0], [8e-6, 8e-6]])
+        self.assertEqual([[True, True], [True, True]], is_zero_approx(values).tolist())
+        self.assertEqual([True, False], is_zero_approx(values, axis=1).tolist())
+        self.assertEqual([True, True], is_zero_approx(values, axis=0).tolist())
+
+    def test_sweep(self):
+        points = np.random.default_rng(6).normal(0, 1, (100000, 3))
+        self.assertTrue(np.all(eq_approx(points, points + 1e-7, axis=1)))
+        matches = eq_approx(points, points * (1 + 1e-5), axis=1)
+        self.assertTrue(np.array_equal(np.linalg.norm(points * 1e-5, axis=1) < 1e-5, matches))
+
+    def test_relative(self):
+        self.assertFalse(eq_approx(1e9, 1e9 + 1.0))
+        self.assertTrue(eq_approx(1e9, 1e9 + 1.0, rel=1e-8))
+        self.assertFalse(eq_approx(1e9, 1e9 + 100.0, rel=1e-8))
+        self.assertEqual([True, False], eq_approx(np.array([1e9, 1.0]), np.array([1e9 + 1.0, 1.1]), rel=1e-8).tolist())
+
+    def test_ulps(self):
+        one_up = np.nextafter(1.0, 2.0)
+        self.assertEqual(1, ulp_distance(1.0, one_up))
+        self.assertEqual(2, ulp_distance(np.nextafter(1.0, 0.0), one_up))
+        self.assertEqual(0, ulp_distance(-0.0, 0.0))
+        self.assertEqual(2, ulp_distance(-5e-324, 5e-324))
+        self.assertEqual(1, ulp_distance(np.float32(1.0), np.nextafter(np.float32(1.0), np.float32(2.0))))
+        self.assertEqual(np.iinfo(np.uint64).max, ulp_distance(np.nan, np.nan))
+        self.assertTrue(eq_approx(1.0, one_up, eps=0.0, ulps=1))
+        self.assertFalse(eq_approx(1e-300, 2e-300, eps=0.0, ulps=4))
+        self.assertFalse(eq_approx(np.nan, np.nan, ulps=4))
+        # Vectors match when every component does.
+        self.assertTrue(eq_approx(Vec3(1.0, 2.0, 3.0), Vec3(one_up, 2.0, 3.0), eps=0.0, ulps=1))
+        rows = np.array([[1.0, 1.0], [1.0, 1.1]])
+        self.assertEqual([True, False], eq_approx(rows, np.array([[one_up, 1.0], [1.0, 1.0]]), eps=0.0, ulps=1, axis=1).tolist())
+
+    def test_backend_precision(self):
+        with use_backend('numpy32'):
+            self.assertTrue(eq_approx(1.0, 1.0 + 1e-4))
+            self.assertTrue(np.all(eq_approx(Vec3Array([XHAT]), Vec3Array([(1.0, 1e-4, 0.0)]))))
+        self.assertFalse(eq_approx(1.0, 1.0 + 1e-4))
+
+
+if __name__ == '__main__':
+    unittest.main()
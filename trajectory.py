@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+
+"""Memory-mapped trajectories of SphereSprings runs.
+
+A trajectory file holds a 24-byte header (the magic number, the number
+of points N and the number of frames, as little-endian uint64s) followed
+by the frames, each an N by 3 array of little-endian float64s. Frames
+are appended through a memory map that grows geometrically, so long runs
+need no more RAM than one frame, and read_trajectory maps the file
+without copying it:
+
+    with TrajectoryWriter('run.traj', len(springs.points)) as writer:
+        springs.stabilize(sink=writer)
+    frames = read_trajectory('run.traj')  # Shape (frame count, N, 3)
+"""
+
+import os
+
+import numpy as np
+
+
+MAGIC = int.from_bytes(b'SPHTRAJ1', 'little')
+HEADER_DTYPE = np.dtype('<u8')
+HEADER_SIZE = 3 * HEADER_DTYPE.itemsize
+FRAME_DTYPE = np.dtype('<f8')
+INITIAL_CAPACITY = 16  # Frames allocated when a file is created; doubled whenever it fills
+
+
+class TrajectoryWriter:
+    """Append (N, 3) frames to a trajectory file. The frame count in the header is updated
+    with every append, so the file is readable while it is written, and after a crash.
+    Use as a context manager, or call close(), to trim the file to its frames."""
+
+    def __init__(self, path, points_count):
+        self.path = path
+        self.points_count = points_count
+        self.frame_count = 0
+        with open(path, 'wb') as f:
+            f.write(np.array([MAGIC, points_count, 0], dtype=HEADER_DTYPE).tobytes())
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(3,))
+        self._frames = None
+        self._map_frames(INITIAL_CAPACITY)
+
+    def _map_frames(self, capacity):
+        if self._frames is not None:
+            self._frames.flush()
+            self._frames = None
+        frame_bytes = self.points_count * 3 * FRAME_DTYPE.itemsize
+        os.truncate(self.path, HEADER_SIZE + capacity * frame_bytes)
+        if capacity * frame_bytes > 0:
+            self._frames = np.memmap(self.path, dtype=FRAME_DTYPE, mode='r+', offset=HEADER_SIZE,
+                                     shape=(capacity, self.points_count, 3))
+        self._capacity = capacity
+
+    def append(self, points):
+        """Append one frame, an (N, 3) array."""
+        points = np.asarray(points, dtype=np.float64)
+        if points.shape != (self.points_count, 3):
+            raise ValueError(f'Expected a frame of shape {(self.points_count, 3)}, got {points.shape}')
+        if self.frame_count == self._capacity:
+            self._map_frames(2 * self._capacity)
+        if self._frames is not None:
+            self._frames[self.frame_count] = points
+        self.frame_count += 1
+        self._header[2] = self.frame_count
+
+    def flush(self):
+        if self._frames is not None:
+            self._frames.flush()
+        self._header.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._header is None:
+            return
+        self.flush()
+        self._frames = self._header = None
+        os.truncate(self.path, HEADER_SIZE + self.frame_count * self.points_count * 3 * FRAME_DTYPE.itemsize)
+
+
+def read_trajectory(path):
+    """Return a read-only (frame count, N, 3) memory map of the frames in a trajectory file."""
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=3)
+    if len(header) < 3 or header[0] != MAGIC:
+        raise ValueError(f'Not a trajectory file: {path}')
+    points_count, frame_count = int(header[1]), int(header[2])
+    if frame_count * points_count == 0:
+        return np.zeros((frame_count, points_count, 3))
+    return np.memmap(path, dtype=FRAME_DTYPE, mode='r', offset=HEADER_SIZE, shape=(frame_count, points_count, 3))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from sphere_springs import SphereSprings, array_to_points
+from trajectory import INITIAL_CAPACITY, TrajectoryWriter, read_trajectory
+
+
+class TrajectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'run.traj')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        frames = np.random.default_rng(2).normal(0, 1, (2 * INITIAL_CAPACITY + 3, 5, 3))
+        with TrajectoryWriter(self.path, 5) as writer:
+            for frame in frames[:INITIAL_CAPACITY + 1]:
+                writer.append(frame)
+            # Readable while still being written
+            self.assertTrue(np.array_equal(frames[:INITIAL_CAPACITY + 1], read_trajectory(self.path)))
+            for frame in frames[INITIAL_CAPACITY + 1:]:
+                writer.append(frame)
+            with self.assertRaises(ValueError):
+                writer.append(frames[0][:4])
+        self.assertTrue(np.array_equal(frames, read_trajectory(self.path)))
+        self.assertEqual(24 + frames.nbytes, os.path.getsize(self.path))
+
+    def test_empty(self):
+        with TrajectoryWriter(self.path, 0) as writer:
+            writer.append(np.zeros((0, 3)))
+        self.assertEqual((1, 0, 3), read_trajectory(self.path).shape)
+
+    def test_not_a_trajectory(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a trajectory file')
+        with self.assertRaises(ValueError):
+            read_trajectory(self.path)
+
+    def test_stabilize_sink(self):
+        points = array_to_points(np.random.default_rng(3).normal(0, 1, (10, 3)))
+        springs = SphereSprings(points, engine='numpy')
+        with TrajectoryWriter(self.path, len(points)) as writer, patch.object(SphereSprings, 'max_iter_count', 20):
+            frames = [frame.points for frame in springs.stabilize_iter(sink=writer)]
+        self.assertEqual(21, len(frames))
+        self.assertTrue(np.array_equal(np.array(frames), read_trajectory(self.path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
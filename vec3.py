@@ -3,12 +3,16 @@
 import unittest
 
 from math import sqrt
+from numbers import Number, Real
 
 
 class Vec3:
+    __slots__ = ('x', 'y', 'z')
+    __array_ufunc__ = None  # Make ndarray operands defer to our operators, which reject them
+
     @staticmethod
     def cross_product(a, b):
-        result = Vec3(
+        result = _vec3(
             a.y * b.z - a.z * b.y,
             a.z * b.x - a.x * b.z,
             a.x * b.y - a.y * b.x )
@@ -20,11 +24,20 @@ class Vec3:
 
     @staticmethod
     def sum(vs):
-        result = Vec3()
+        result = _vec3(0.0, 0.0, 0.0)
         for v in vs:
             result += v
         return result
 
+    @classmethod
+    def from_xyz(cls, x, y, z):
+        """Construct from coordinates without the argument dispatch done by __init__."""
+        result = _new(cls)
+        result.x = x
+        result.y = y
+        result.z = z
+        return result
+
     def __init__(self, *args):
         if len(args) == 0:
             self.x = self.y = self.z = 0.0
@@ -40,45 +53,116 @@ class Vec3:
             raise ValueError('Vec3() requires 0, 1, or 3 arguments')
 
     def __add__(self, other):
-        return Vec3(self.x + other.x, self.y + other.y, self.z + other.z)
+        if not isinstance(other, Vec3):
+            return NotImplemented
+        return _vec3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __iadd__(self, other):
+        """Note: In-place operators mutate self, so never apply them to shared constants like XHAT."""
+        if not isinstance(other, Vec3):
+            return NotImplemented
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __imul__(self, other):
+        other = as_real(other)
+        if other is None:
+            return NotImplemented
+        self.x *= other
+        self.y *= other
+        self.z *= other
+        return self
+
+    def __isub__(self, other):
+        if not isinstance(other, Vec3):
+            return NotImplemented
+        self.x -= other.x
+        self.y -= other.y
+        self.z -= other.z
+        return self
 
     def __mul__(self, other):
-        return Vec3(other * self.x, other * self.y, other * self.z)
+        other = as_real(other)
+        if other is None:
+            return NotImplemented
+        return _vec3(other * self.x, other * self.y, other * self.z)
+
+    def __neg__(self):
+        return _vec3(-self.x, -self.y, -self.z)
 
     def __rmul__(self, other):
-        return Vec3(other * self.x, other * self.y, other * self.z)
+        other = as_real(other)
+        if other is None:
+            return NotImplemented
+        return _vec3(other * self.x, other * self.y, other * self.z)
 
-    def __rep__(self):
+    def __repr__(self):
         return self.__str__()
 
     def __str__(self):
         return '({0:f}, {1:f}, {2:f})'.format(self.x, self.y, self.z)
 
     def __sub__(self, other):
-        assert(isinstance(other, Vec3))
-        return Vec3(self.x - other.x, self.y - other.y, self.z - other.z)
+        if not isinstance(other, Vec3):
+            return NotImplemented
+        return _vec3(self.x - other.x, self.y - other.y, self.z - other.z)
 
     def __truediv__(self, other):
-        return Vec3(self.x / other, self.y / other, self.z / other)
+        other = as_real(other)
+        if other is None:
+            return NotImplemented
+        return _vec3(self.x / other, self.y / other, self.z / other)
 
     def cross(self, b):
-        return Vec3.cross_product(self, b)
+        return _vec3(
+            self.y * b.z - self.z * b.y,
+            self.z * b.x - self.x * b.z,
+            self.x * b.y - self.y * b.x)
 
     def dot(self, b):
-        return Vec3.dot_product(self, b)
+        return self.x * b.x + self.y * b.y + self.z * b.z
 
     def interpolate(a, b, t):
-        return (1 - t) * a + t * b
+        s = 1 - t
+        return _vec3(s * a.x + t * b.x, s * a.y + t * b.y, s * a.z + t * b.z)
 
     def norm(self):
-        return sqrt(self.norm2())
+        return sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
 
     def norm2(self):
-        return self.x ** 2 + self.y ** 2 +  self.z ** 2
+        return self.x * self.x + self.y * self.y + self.z * self.z
 
     def normalized(self):
-        n = self.norm()
-        return Vec3((1/n) * self.x, (1/n) * self.y, (1/n) * self.z)
+        inv_n = 1 / sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+        return _vec3(inv_n * self.x, inv_n * self.y, inv_n * self.z)
+
+
+_new = object.__new__
+
+
+def as_real(x):
+    """x if it is a real number, such as a float or a NumPy scalar; float(x) for other numbers that convert,
+    such as Decimal; otherwise None, so that operators return NotImplemented (e.g. for an array)."""
+    if isinstance(x, (float, int, Real)):
+        return x
+    if isinstance(x, Number):
+        try:
+            return float(x)
+        except TypeError:
+            return None
+    return None
+
+
+def _vec3(x, y, z):
+    """Fast internal constructor used on hot paths."""
+    result = _new(Vec3)
+    result.x = x
+    result.y = y
+    result.z = z
+    return result
+
 
 ZERO = Vec3(0.0, 0.0, 0.0)
 XHAT = Vec3(1.0, 0.0, 0.0)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+import array
+import mmap
+
+import numpy as np
+
+from backend import float_dtype
+from vec3 import Vec3
+
+
+class Vec3Array:
+    """A batch of 3D vectors stored as one contiguous (N, 3) array of the backend's float_dtype.
+    Arithmetic broadcasts against a single Vec3, a scalar, or an (N,) array of scalars."""
+    __array_ufunc__ = None  # Make ndarray operands defer to our reflected operators
+
+    @staticmethod
+    def cross_product(a, b):
+        return Vec3Array(np.cross(_as_array(a), _as_array(b)))
+
+    @staticmethod
+    def dot_product(a, b):
+        a, b = np.broadcast_arrays(_as_array(a), _as_array(b))
+        return np.einsum('ij,ij->i', a, b)
+
+    @staticmethod
+    def from_buffer(buffer, offset=0, count=-1):
+        """View count vectors of native float64s in buffer, starting offset bytes in, without copying.
+        buffer is anything supporting the buffer protocol: bytes, bytearray, memoryview, array.array('d'),
+        mmap or ndarray; the result is read-only if the buffer is. count=-1 reads to the end.
+        The view stays float64 whatever the backend."""
+        result = Vec3Array()
+        result.data = rows_from_buffer(buffer, 3, offset, count)
+        return result
+
+    @staticmethod
+    def from_vec3s(vs):
+        return Vec3Array(np.array([(v.x, v.y, v.z) for v in vs], dtype=float_dtype()).reshape(-1, 3))
+
+    @staticmethod
+    def sum(vs):
+        x, y, z = _as_array(vs).sum(axis=0)
+        return Vec3(float(x), float(y), float(z))
+
+    def __init__(self, *args):
+        if len(args) == 0:
+            self.data = np.empty((0, 3), dtype=float_dtype())
+        elif len(args) == 1:
+            arg0 = args[0]
+            if isinstance(arg0, Vec3Array):
+                self.data = arg0.data.copy()
+            elif isinstance(arg0, (list, tuple)) and len(arg0) > 0 and isinstance(arg0[0], Vec3):
+                self.data = Vec3Array.from_vec3s(arg0).data
+            elif is_raw_buffer(arg0):
+                self.data = rows_from_buffer(arg0, 3)
+            else:
+                self.data = np.ascontiguousarray(arg0, dtype=float_dtype()).reshape(-1, 3)
+        elif len(args) == 3:
+            self.data = np.ascontiguousarray(np.stack(np.broadcast_arrays(*args), axis=-1), dtype=float_dtype())
+        else:
+            raise ValueError('Vec3Array() requires 0, 1, or 3 arguments')
+
+    def __add__(self, other):
+        return Vec3Array(self.data + _as_array(other))
+
+    def __array__(self, dtype=None, copy=None):
+        """np.asarray(vs) is the underlying (N, 3) array, not a copy."""
+        if dtype is not None and np.dtype(dtype) != self.data.dtype:
+            return self.data.astype(dtype)
+        return self.data.copy() if copy else self.data
+
+    def __buffer__(self, flags):
+        """memoryview(vs) exports the underlying array (Python 3.12 and later; see as_memoryview)."""
+        return memoryview(self.data)
+
+    def __radd__(self, other):
+        return Vec3Array(_as_array(other) + self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            x, y, z = self.data[index]
+            return Vec3(float(x), float(y), float(z))
+        return Vec3Array(self.data[index])
+
+    def __iter__(self):
+        for x, y, z in self.data.tolist():
+            yield Vec3(x, y, z)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __mul__(self, other):
+        return Vec3Array(self.data * as_scalars(other))
+
+    def __neg__(self):
+        return Vec3Array(-self.data)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __rmul__(self, other):
+        return Vec3Array(as_scalars(other) * self.data)
+
+    def __rsub__(self, other):
+        return Vec3Array(_as_array(other) - self.data)
+
+    def __str__(self):
+        return '[' + ', '.join(str(v) for v in self) + ']'
+
+    def __sub__(self, other):
+        return Vec3Array(self.data - _as_array(other))
+
+    def __truediv__(self, other):
+        return Vec3Array(self.data / as_scalars(other))
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    @property
+    def z(self):
+        return self.data[:, 2]
+
+    def as_memoryview(self):
+        """A memoryview of the underlying (N, 3) array, sharing its memory."""
+        return memoryview(self.data)
+
+    def cross(self, b):
+        return Vec3Array.cross_product(self, b)
+
+    def dot(self, b):
+        return Vec3Array.dot_product(self, b)
+
+    def interpolate(a, b, t):
+        t = as_scalars(t)
+        return Vec3Array((1 - t) * _as_array(a) + t * _as_array(b))
+
+    def norm(self):
+        return np.sqrt(self.norm2())
+
+    def norm2(self):
+        return np.einsum('ij,ij->i', self.data, self.data)
+
+    def normalized(self):
+        """Zero vectors normalize to NaN, where Vec3.normalized would raise."""
+        return Vec3Array(self.data / self.norm()[:, np.newaxis])
+
+    def to_vec3s(self):
+        return list(self)
+
+
+def is_raw_buffer(obj):
+    """Whether obj is a buffer whose bytes, rather than its items, should be read as float64s."""
+    return isinstance(obj, (bytes, bytearray, memoryview, mmap.mmap)) or (
+        isinstance(obj, array.array) and obj.typecode == 'd')
+
+
+def rows_from_buffer(buffer, width, offset=0, count=-1):
+    """View count rows of width native float64s in buffer, starting offset bytes in, without copying."""
+    return np.frombuffer(buffer, dtype=np.float64, count=count * width if count >= 0 else -1,
+                         offset=offset).reshape(-1, width)
+
+
+def _as_array(v):
+    """Return an (N, 3) or (3,) array view of a Vec3Array, Vec3, list of Vec3s, or array-like."""
+    if isinstance(v, Vec3Array):
+        return v.data
+    if isinstance(v, Vec3):
+        return np.array((v.x, v.y, v.z), dtype=float_dtype())
+    if isinstance(v, (list, tuple)) and len(v) > 0 and isinstance(v[0], Vec3):
+        return Vec3Array.from_vec3s(v).data
+    return np.asarray(v, dtype=float_dtype())
+
+
+def as_scalars(s):
+    """Scalars pass through; an (N,) array of scalars becomes (N, 1) so it scales rows."""
+    s = np.asarray(s, dtype=float_dtype())
+    return s[:, np.newaxis] if s.ndim == 1 else s
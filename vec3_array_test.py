@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+import array
+import mmap
+import unittest
+
+import numpy as np
+
+from tolerance import eq_approx
+from vec3 import Vec3, XHAT, YHAT, ZHAT
+from vec3_array import Vec3Array
+
+
+class Vec3ArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.vs = [Vec3(1.0, 2.0, 3.0), Vec3(-4.0, 0.5, 2.0), Vec3(0.0, -1.0, 7.0)]
+        self.va = Vec3Array(self.vs)
+
+    def assert_matches(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        self.assertTrue(np.all(eq_approx(expected, actual)))
+
+    def test_add(self):
+        self.assert_matches([v + XHAT for v in self.vs], self.va + XHAT)
+        self.assert_matches([XHAT + v for v in self.vs], XHAT + self.va)
+        self.assert_matches([v + v for v in self.vs], self.va + self.va)
+
+    def test_conversions(self):
+        self.assert_matches(self.vs, Vec3Array.from_vec3s(self.vs).to_vec3s())
+        self.assertTrue(eq_approx(self.vs[1], self.va[1]))
+        self.assertEqual((3, 3), self.va.data.shape)
+        self.assertEqual((0, 3), Vec3Array().data.shape)
+
+    def test_buffers(self):
+        values = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        raw = np.array(values).tobytes()
+        for buffer in (raw, bytearray(raw), memoryview(raw), array.array('d', values)):
+            self.assertTrue(np.array_equal(np.reshape(values, (2, 3)), Vec3Array(buffer).data))
+        self.assertFalse(Vec3Array(raw).data.flags.writeable)
+        self.assertTrue(np.array_equal([[4.0, 5.0, 6.0]], Vec3Array.from_buffer(raw, offset=24, count=1).data))
+
+        # No copies: writes through the buffer are seen by the array, and the array exports the same memory.
+        shared = bytearray(raw)
+        va = Vec3Array.from_buffer(shared)
+        shared[0:8] = np.array([9.0]).tobytes()
+        self.assertEqual(9.0, va.data[0, 0])
+        self.assertIs(va.data, np.asarray(va))
+        view = va.as_memoryview()
+        self.assertEqual((2, 3), view.shape)
+        self.assertTrue(np.shares_memory(np.asarray(view), va.data))
+
+        mapped = mmap.mmap(-1, len(raw))
+        mapped[:] = raw
+        self.assertTrue(np.array_equal(np.reshape(values, (2, 3)), Vec3Array(mapped).data))
+
+    def test_cross(self):
+        self.assert_matches([v.cross(YHAT) for v in self.vs], self.va.cross(YHAT))
+        self.assert_matches([v.cross(v) for v in self.vs], self.va.cross(self.va))
+
+    def test_dot(self):
+        expected = [v.dot(ZHAT) for v in self.vs]
+        self.assertTrue(np.allclose(expected, self.va.dot(ZHAT)))
+
+    def test_interpolate(self):
+        self.assert_matches([v.interpolate(XHAT, 0.25) for v in self.vs], self.va.interpolate(XHAT, 0.25))
+
+    def test_mul(self):
+        self.assert_matches([5 * v for v in self.vs], 5 * self.va)
+        self.assert_matches([k * v for k, v in enumerate(self.vs)], self.va * np.arange(3))
+
+    def test_norm(self):
+        self.assertTrue(np.allclose([v.norm() for v in self.vs], self.va.norm()))
+        self.assertTrue(np.allclose([v.norm2() for v in self.vs], self.va.norm2()))
+        self.assert_matches([v.normalized() for v in self.vs], self.va.normalized())
+
+    def test_sub(self):
+        self.assert_matches([v - YHAT for v in self.vs], self.va - YHAT)
+        self.assert_matches([YHAT - v for v in self.vs], YHAT - self.va)
+
+    def test_sum(self):
+        self.assertTrue(eq_approx(Vec3.sum(self.vs), Vec3Array.sum(self.va)))
+
+    def test_truediv(self):
+        self.assert_matches([v / 2 for v in self.vs], self.va / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
 #!/usr/bin/env python
 
 import unittest
+from decimal import Decimal
+
+import numpy as np
 
 from util import eq_approx
 from vec3 import Vec3, XHAT, YHAT, ZHAT
+from vec3_array import Vec3Array
 
 
 class Vec3Test(unittest.TestCase):
@@ -12,11 +16,36 @@ class Vec3Test(unittest.TestCase):
         actual = XHAT + YHAT
         self.assertTrue(eq_approx(expected, actual))
 
+    def test_from_xyz(self):
+        self.assertTrue(eq_approx(Vec3(1.0, 2.0, 3.0), Vec3.from_xyz(1.0, 2.0, 3.0)))
+
+    def test_in_place(self):
+        v = Vec3(XHAT)
+        alias = v
+        v += YHAT
+        v -= ZHAT
+        v *= 2.0
+        self.assertIs(alias, v)
+        self.assertTrue(eq_approx(Vec3(2.0, 2.0, -2.0), v))
+        self.assertTrue(eq_approx(Vec3(1.0, 0.0, 0.0), XHAT))
+
     def test_mul(self):
         expected = Vec3(5.0, 0.0, 0.0)
         actual = 5 * XHAT
         self.assertTrue(eq_approx(expected, actual))
 
+    def test_mul_non_reals(self):
+        # Arrays are not scalars: Vec3 leaves them to the array's operators, or raises.
+        self.assertTrue(eq_approx(Vec3(2.0, 0.0, 0.0), XHAT * np.float32(2.0)))
+        self.assertTrue(eq_approx(Vec3(1.5, 0.0, 0.0), Decimal('1.5') * XHAT))
+        for operand in (np.ones(3), Vec3Array([YHAT]), 'x'):
+            with self.assertRaises(TypeError):
+                XHAT * operand
+            with self.assertRaises(TypeError):
+                operand * XHAT
+            with self.assertRaises(TypeError):
+                XHAT / operand
+
     def test_sub(self):
         expected = Vec3(1.0, -1.0, 0.0)
         actual = XHAT - YHAT